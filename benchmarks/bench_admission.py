@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Runs a bulk job against a fake device that rejects commands once its queue fills up, with and without the adaptive
+admission controller, and reports throughput and how many commands failed.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.admission import AdmissionController
+from pytheos.networking.connection import Connection
+from tests.fake_device import FakeHEOSDevice
+
+COMMAND_COUNT = 2000
+DEVICE_LATENCY = 0.001
+DEVICE_QUEUE_LIMITS = (2, 8, 32)
+
+
+async def _run(queue_limit: int, adaptive: bool):
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY) as device:
+        device.queue_limit = queue_limit
+        device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+
+        connection = Connection()
+        if not adaptive:    # Everything goes out at once and nothing is retried
+            connection.admission = AdmissionController(COMMAND_COUNT, COMMAND_COUNT, COMMAND_COUNT)
+            connection.admission.MAX_RETRIES = 0
+
+        await connection.connect(device.host, device.port)
+        try:
+            started = time.perf_counter()
+            results = await asyncio.gather(*[connection.player.get_volume(1) for _ in range(COMMAND_COUNT)],
+                                           return_exceptions=True)
+            elapsed = time.perf_counter() - started
+        finally:
+            connection.close()
+
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    print(f'queue_limit={queue_limit:>2} {"adaptive" if adaptive else "unlimited":>9}: '
+          f'{COMMAND_COUNT - failed} ok, {failed} failed in {elapsed:.3f}s - '
+          f'{(COMMAND_COUNT - failed) / elapsed:,.0f} commands/s, {device.rejected} rejected by the device, '
+          f'final limit {connection.admission.limit:.1f}')
+
+
+async def main():
+    for queue_limit in DEVICE_QUEUE_LIMITS:
+        for adaptive in (False, True):
+            await _run(queue_limit, adaptive)
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Compares decode throughput of the available JSON codecs on representative browse, queue and event messages.
+"""
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.codec import CODECS, get_codec
+
+ITERATIONS = 2000
+
+
+def _browse_message() -> bytes:
+    return json.dumps({
+        'heos': {'command': 'browse/browse', 'result': 'success',
+                 'message': 'sid=1340337940&cid=4c07e4537a6772cb2675&range=0,49&returned=50&count=6000'},
+        'payload': [{'container': 'no', 'mid': f'36fad30531d3e5bc{i:04d}', 'type': 'song', 'playable': 'yes',
+                     'name': f'Track number {i}', 'artist': 'Some Artist', 'album': 'Some Album',
+                     'image_url': f'http://10.10.0.7:32469/proxy/{i:020d}/albumart.jpg'} for i in range(50)]
+    }).encode('utf-8')
+
+
+def _queue_message() -> bytes:
+    return json.dumps({
+        'heos': {'command': 'player/get_queue', 'result': 'success',
+                 'message': 'pid=12345678&range=0,99&returned=100&count=100'},
+        'payload': [{'song': f'Song {i}', 'album': 'Morningrise', 'artist': 'Opeth', 'qid': i + 1,
+                     'image_url': f'http://10.10.0.7:32469/proxy/{i:020d}/albumart.jpg',
+                     'mid': f'f82aa0f7d4f58546{i:04d}', 'album_id': 'd51c42cba3d68cd59cc4'} for i in range(100)]
+    }).encode('utf-8')
+
+
+def _event_message() -> bytes:
+    return json.dumps({
+        'heos': {'command': 'event/player_now_playing_progress',
+                 'message': 'pid=12345678&cur_pos=123000&duration=300000'}
+    }).encode('utf-8')
+
+
+def main():
+    messages = {
+        'browse': _browse_message(),
+        'queue': _queue_message(),
+        'event': _event_message(),
+    }
+
+    for name, codec_class in CODECS.items():
+        if not codec_class.available():
+            print(f'{name:>8}: not installed')
+            continue
+
+        codec = get_codec(name)
+        for kind, message in messages.items():
+            iterations = ITERATIONS * (50 if kind == 'event' else 1)
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                codec.loads(message)
+            elapsed = time.perf_counter() - started
+
+            print(f'{name:>8} {kind:>6}: {iterations / elapsed:>10,.0f} msgs/s '
+                  f'{len(message) * iterations / elapsed / 1024 / 1024:>8,.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Measures sustained event throughput through the Pytheos event pipeline against a local fake event source.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytheos
+from tests.fake_device import FakeHEOSDevice
+
+EVENT_COUNT = 50000
+
+
+async def _run(events: list, title: str):
+    async with FakeHEOSDevice() as device:
+        p = pytheos.Pytheos('127.0.0.1', device.port, coalesce_events=True)
+        await p.connect(refresh=False)
+
+        dispatched = 0
+
+        async def _on_event(event):
+            nonlocal dispatched
+            dispatched += 1
+
+        for command in {event for event, _ in events}:
+            p.subscribe(f'event/{command}', _on_event)
+
+        stats = p.event_stats
+        started = time.perf_counter()
+        await device.emit_events(events)
+        while stats.dispatch.processed + stats.coalesced < len(events):
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0)
+
+        p.close()
+
+    print(f'{title}:')
+    print(f'  {len(events)} events in {elapsed:.3f}s - {len(events) / elapsed:,.0f} events/s')
+    print(f'  dispatched={stats.dispatch.processed} coalesced={stats.coalesced} batches={stats.batches} '
+          f'callbacks={dispatched}')
+    print(f'  receive: max_depth={stats.receive.max_depth} mean={stats.receive.latency.mean * 1000:.3f}ms '
+          f'max={stats.receive.latency.max * 1000:.3f}ms')
+    print(f'  dispatch: max_depth={stats.dispatch.max_depth} mean={stats.dispatch.latency.mean * 1000:.3f}ms '
+          f'max={stats.dispatch.latency.max * 1000:.3f}ms')
+
+
+async def main():
+    await _run([('player_state_changed', {'pid': i % 50, 'state': 'play' if i % 2 else 'pause'})
+                for i in range(EVENT_COUNT)], 'player_state_changed burst')
+    await _run([('player_now_playing_progress', {'pid': i % 10, 'cur_pos': i, 'duration': EVENT_COUNT})
+                for i in range(EVENT_COUNT)], 'player_now_playing_progress burst (coalesced)')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
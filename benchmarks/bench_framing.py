@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Microbenchmark for the message framing layer - how many messages per second can be split out of the byte stream.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest.mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.framing import HEOSProtocol
+
+MESSAGE_COUNT = 200000
+CHUNK_SIZES = (64, 1460, 16384, 65536)
+
+
+def _build_stream() -> bytes:
+    message = json.dumps({
+        'heos': {
+            'command': 'event/player_now_playing_progress',
+            'message': 'pid=12345678&cur_pos=1000&duration=300000'
+        }
+    }).encode('utf-8') + b'\r\n'
+
+    return message * MESSAGE_COUNT
+
+
+async def _run(stream: bytes, chunk_size: int):
+    protocol = HEOSProtocol()
+    protocol.connection_made(unittest.mock.MagicMock())
+    protocol.MAX_BUFFERED_FRAMES = MESSAGE_COUNT + 1
+
+    started = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        protocol.data_received(stream[offset:offset + chunk_size])
+
+    count = 0
+    while protocol.buffered:
+        await protocol.read_frame(0)
+        count += 1
+    elapsed = time.perf_counter() - started
+
+    print(f'chunk={chunk_size:>6}: {count} messages in {elapsed:.3f}s - {count / elapsed:,.0f} messages/s')
+
+
+async def main():
+    stream = _build_stream()
+    for chunk_size in CHUNK_SIZES:
+        await _run(stream, chunk_size)
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
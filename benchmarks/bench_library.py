@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Measures how long it takes to browse a large container against a fake device with simulated network latency, starting
+with an empty library store, again from a fresh process's point of view with the store filled, and once everything
+stored has grown old and is checked against the device again.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.api.library import LibraryStore
+from pytheos.networking.connection import Connection
+from tests.fake_device import FakeHEOSDevice
+
+CONTAINER_SIZE = 6000
+PAGE_SIZE = 50
+NETWORK_LATENCY = 0.01
+DEVICE_LATENCY = 0.001
+
+
+async def _browse(device: FakeHEOSDevice, path: str, expire: bool=False) -> tuple:
+    connection = Connection()
+    connection.browse.library = LibraryStore(path)
+    await connection.connect(device.host, device.port)
+    try:
+        if expire:
+            connection.browse.library.expire()
+
+        device.commands.clear()
+        started = time.perf_counter()
+        results = await connection.browse.browse_source_container(1024, 'plex')
+        return time.perf_counter() - started, len(results), len(device.commands)
+    finally:
+        connection.browse.library.close()
+        connection.close()
+
+
+async def main():
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY, network_latency=NETWORK_LATENCY) as device:
+        device.containers[('1024', 'plex')] = [
+            {'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'Track {i}',
+             'image_url': ''} for i in range(CONTAINER_SIZE)]
+        device.page_size = PAGE_SIZE
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'library.db')
+            for label, expire in (('empty store', False), ('filled store', False), ('stale store', True)):
+                elapsed, count, commands = await _browse(device, path, expire)
+                print(f'{label:>12}: {count} items in {elapsed * 1000:7.1f}ms, {commands} commands')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Measures how long it takes to browse a large container against a fake device with simulated network latency that
+returns at most 50 items per request, requesting one page at a time and several pages at once.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.connection import Connection
+from tests.fake_device import FakeHEOSDevice
+
+CONTAINER_SIZE = 6000
+PAGE_SIZE = 50
+NETWORK_LATENCY = 0.01
+DEVICE_LATENCY = 0.001
+CONCURRENCY = (1, 2, 4, 8, 16)
+
+
+async def _browse(device: FakeHEOSDevice, concurrency: int) -> tuple:
+    connection = Connection()
+    await connection.connect(device.host, device.port)
+    try:
+        started = time.perf_counter()
+        results = await connection.browse.browse_source_container(1024, 'plex', concurrency=concurrency)
+        return time.perf_counter() - started, len(results)
+    finally:
+        connection.close()
+
+
+async def main():
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY, network_latency=NETWORK_LATENCY) as device:
+        device.containers[('1024', 'plex')] = [
+            {'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'Track {i}',
+             'image_url': ''} for i in range(CONTAINER_SIZE)]
+        device.page_size = PAGE_SIZE
+
+        baseline = None
+        for concurrency in CONCURRENCY:
+            elapsed, count = await _browse(device, concurrency)
+            baseline = baseline or elapsed
+            print(f'concurrency {concurrency:>2}: {count} items in {elapsed * 1000:7.1f}ms '
+                  f'({baseline / elapsed:.1f}x)')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
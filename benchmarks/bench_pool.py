@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Sends a burst of read-only commands to a household whose entry point is a slow speaker, once through that speaker
+alone and once through a device pool that also has connections to two faster speakers.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.connection import Connection
+from pytheos.networking.pool import DevicePool
+from tests.fake_device import FakeHEOSDevice
+
+COMMAND_COUNT = 1000
+SLOW_LATENCY = 0.02
+FAST_LATENCY = 0.002
+
+
+async def _run(channel, commands: int) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*[channel.player.get_volume(1) for _ in range(commands)])
+    return time.perf_counter() - started
+
+
+async def main():
+    devices = [FakeHEOSDevice(latency=SLOW_LATENCY), FakeHEOSDevice(latency=FAST_LATENCY),
+               FakeHEOSDevice(latency=FAST_LATENCY)]
+    for device in devices:
+        device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+        await device.start()
+
+    try:
+        connection = Connection()
+        await connection.connect(devices[0].host, devices[0].port)
+        try:
+            elapsed = await _run(connection, COMMAND_COUNT)
+        finally:
+            connection.close()
+        print(f'slow entry point only: {COMMAND_COUNT / elapsed:,.0f} commands/s')
+
+        pool = DevicePool()
+        await pool.connect(devices[0].host, devices[0].port)
+        try:
+            await pool.add_hosts([(device.host, device.port) for device in devices[1:]])
+            elapsed = await _run(pool, COMMAND_COUNT)
+        finally:
+            pool.close()
+        routed = ', '.join(f'{member.port}={member.stats.routed}' for member in pool.members)
+        print(f'device pool:           {COMMAND_COUNT / elapsed:,.0f} commands/s (routed: {routed})')
+    finally:
+        for device in devices:
+            await device.stop()
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
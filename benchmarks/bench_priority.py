@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Measures how long volume changes take while a library crawl is saturating the command channel, with the crawl tagged
+as background work and with every command at the same priority.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pytheos.networking.connection import Connection
+from pytheos.networking.priority import CommandPriority, command_priority
+from tests.fake_device import FakeHEOSDevice
+
+CRAWL_PAGES = 1000
+VOLUME_CHANGES = 20
+DEVICE_LATENCY = 0.002
+
+
+async def _crawl(connection: Connection, priority: CommandPriority):
+    with command_priority(priority):
+        await asyncio.gather(*[connection.call('browse', 'browse', sid=1024, cid='library', range=f'{page},{page}')
+                               for page in range(CRAWL_PAGES)])
+
+
+async def _run(crawl_priority: CommandPriority, volume_priority: CommandPriority):
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY) as device:
+        connection = Connection()
+        await connection.connect(device.host, device.port)
+        try:
+            crawl = asyncio.ensure_future(_crawl(connection, crawl_priority))
+            await asyncio.sleep(0.05)
+
+            latencies = []
+            for level in range(VOLUME_CHANGES):
+                started = time.perf_counter()
+                await connection.call('player', 'set_volume', pid=1, level=level, priority=volume_priority)
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+            await crawl
+        finally:
+            connection.close()
+
+    print(f'crawl={crawl_priority!s:>10} volume={volume_priority!s:>11}: '
+          f'volume change median {statistics.median(latencies) * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms')
+
+
+async def main():
+    await _run(CommandPriority.Normal, CommandPriority.Normal)
+    await _run(CommandPriority.Background, CommandPriority.Interactive)
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Measures the time from calling connect() to having the account, players, groups, and sources in hand against a fake
+device with simulated network latency, doing every step one after another (as connect() used to) and with the
+independent steps overlapped.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytheos
+from tests.fake_device import FakeHEOSDevice
+
+NETWORK_LATENCIES = (0.005, 0.02, 0.05)
+DEVICE_LATENCY = 0.001
+RUNS = 5
+
+
+async def _sequential(conn: pytheos.Pytheos):
+    await conn._command_channel.connect(conn.server, conn.port)
+    await conn._event_channel.connect(conn.server, conn.port, deduplicate=True)
+    await conn.enable_event_reception(True)
+    await conn.check_account()
+    await conn.get_players()
+    await conn.get_groups()
+    await conn.get_sources()
+
+
+async def _run(network_latency: float, concurrent: bool) -> tuple:
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY, network_latency=network_latency) as device:
+        elapsed = []
+        for _ in range(RUNS):
+            conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+            started = time.perf_counter()
+            if concurrent:
+                await conn.connect()
+            else:
+                await _sequential(conn)
+            elapsed.append(time.perf_counter() - started)
+            conn.close()
+
+    return min(elapsed), conn.startup_stats
+
+
+async def main():
+    for network_latency in NETWORK_LATENCIES:
+        sequential, _ = await _run(network_latency, False)
+        concurrent, stats = await _run(network_latency, True)
+        print(f'network latency {network_latency * 1000:>4.0f}ms: sequential {sequential * 1000:6.1f}ms, '
+              f'concurrent {concurrent * 1000:6.1f}ms ({sequential / concurrent:.1f}x)')
+        print(f'    {stats!r}')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
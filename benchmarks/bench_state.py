@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measures a dashboard that polls the volume, mute, and play state of a household of players against a fake device,
+asking the players every time (without change events) and answering from the state kept current by change events.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytheos
+from tests.fake_device import FakeHEOSDevice
+
+PLAYERS = 24
+POLLS = 20
+DEVICE_LATENCY = 0.001
+
+
+def _add_players(device: FakeHEOSDevice):
+    device.players = [
+        {'name': f'Player {pid}', 'pid': pid, 'model': 'HEOS 1', 'version': '1.0', 'ip': device.host,
+         'network': 'wired', 'lineout': 0, 'serial': f'SN{pid:04}'}
+        for pid in range(1, PLAYERS + 1)
+    ]
+    device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+    device.set_handler('player/get_mute', lambda params: (f'pid={params["pid"]}&state=off', None))
+    device.set_handler('player/get_play_state', lambda params: (f'pid={params["pid"]}&state=play', None))
+
+
+async def _run(events: bool) -> tuple:
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY) as device:
+        _add_players(device)
+
+        conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+        await conn.connect(enable_event_connection=events)
+        device.commands.clear()
+
+        started = time.perf_counter()
+        for _ in range(POLLS):
+            await asyncio.gather(*[
+                asyncio.gather(player.get_volume(), player.get_mute(), player.get_play_state())
+                for player in conn._players
+            ])
+        elapsed = time.perf_counter() - started
+
+        conn.close()
+
+    return elapsed, len(device.commands)
+
+
+async def main():
+    for events in (False, True):
+        elapsed, commands = await _run(events)
+        label = 'state from events' if events else 'asking every time'
+        print(f'{label:>18}: {POLLS} polls of {PLAYERS} players in {elapsed * 1000:7.1f}ms, '
+              f'{commands} commands sent to the device')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Crawls a large container, a long queue, and every player's info against a fake device using 1, 2, 4, and 8 command
+connections and reports how throughput scales with the number of connections.  The fake device answers the commands
+on each connection one at a time, so a single connection is bound by the device's per-command latency.
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytheos
+from tests.fake_device import FakeHEOSDevice
+
+CONTAINER_SIZE = 5000
+PAGE_SIZE = 50
+PLAYER_COUNT = 50
+DEVICE_LATENCY = 0.002
+CONNECTION_COUNTS = (1, 2, 4, 8)
+
+
+async def _run(connection_count: int):
+    async with FakeHEOSDevice(latency=DEVICE_LATENCY) as device:
+        device.containers[('1024', 'library')] = [
+            {'container': 'no', 'type': 'song', 'name': f'Song {index}', 'mid': str(index)}
+            for index in range(CONTAINER_SIZE)
+        ]
+        device.set_handler('player/get_queue', lambda params: (
+            FakeHEOSDevice._var_string(params), [{'song': 'Song', 'qid': params['range']}] * PAGE_SIZE))
+        device.set_handler('player/get_player_info', lambda params: (
+            FakeHEOSDevice._var_string(params), {'name': f'Player {params["pid"]}', 'pid': params['pid']}))
+
+        conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None,
+                               command_connections=connection_count)
+        await conn.connect(enable_event_connection=False, refresh=False)
+        try:
+            started = time.perf_counter()
+            commands = [
+                conn.api.call('browse', 'browse', sid=1024, cid='library', range=f'{start},{start + PAGE_SIZE - 1}')
+                for start in range(0, CONTAINER_SIZE, PAGE_SIZE)
+            ]
+            commands += [
+                conn.api.player.get_queue(1, start, PAGE_SIZE) for start in range(0, CONTAINER_SIZE, PAGE_SIZE)
+            ]
+            commands += [conn.api.player.get_player_info(pid) for pid in range(PLAYER_COUNT)]
+            await asyncio.gather(*commands)
+            elapsed = time.perf_counter() - started
+        finally:
+            conn.close()
+
+    return len(commands), elapsed
+
+
+async def main():
+    baseline = None
+    for connection_count in CONNECTION_COUNTS:
+        count, elapsed = await _run(connection_count)
+        baseline = baseline or elapsed
+        print(f'{connection_count} connection(s): {count} commands in {elapsed:.3f}s - '
+              f'{count / elapsed:,.0f} commands/s ({baseline / elapsed:.1f}x)')
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 from .pytheos import Pytheos, connect
 from .networking.discovery import discover
+from .networking.priority import CommandPriority, command_priority
 from .logger import Logger
 
 
@@ -10,4 +11,4 @@ def set_log_level(level: int):
         handler.setLevel(level)
 
 
-__all__ = ['Pytheos', 'connect', 'discover']
+__all__ = ['Pytheos', 'connect', 'discover', 'CommandPriority', 'command_priority']
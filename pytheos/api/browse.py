@@ -1,11 +1,16 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import asyncio
 from collections import OrderedDict
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Optional
 import logging
 
+from .cache import BrowseCache
+from .library import LibraryStore
 from .. import models
+from ..models.heos import ResponseShape
+from ..networking.errors import ChannelUnavailableError, CommandTimeoutError
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +19,16 @@ class BrowseAPI:
     MAX_QUERY_RESULTS = 50
     MAX_SEARCH_LENGTH = 128
 
-    def __init__(self, conn):
+    def __init__(self, conn, cache: Optional[BrowseCache]=None, library: Optional[LibraryStore]=None):
+        """ Constructor
+
+        :param conn: Channel commands are sent on
+        :param cache: Cache for browse results or None to always ask the system
+        :param library: On-disk store for browse results or None to not keep them
+        """
         self._api = conn
+        self.cache: Optional[BrowseCache] = cache
+        self.library: Optional[LibraryStore] = library
 
     async def add_to_queue(self, player_id: str, source_id: str, container_id: str, media_id: Optional[str]=None,
                            add_type: models.browse.AddToQueueType=models.browse.AddToQueueType.PlayNow):
@@ -33,7 +46,8 @@ class BrowseAPI:
         if media_id is not None:
             kwargs['mid'] = media_id
 
-        await self._api.call('browse', 'add_to_queue', pid=player_id, sid=source_id, cid=container_id, aid=add_type, **kwargs)
+        await self._api.call('browse', 'add_to_queue', shape=ResponseShape.Header,
+                             pid=player_id, sid=source_id, cid=container_id, aid=add_type, **kwargs)
 
     async def browse_source(self,
                             source_id: int,
@@ -68,30 +82,157 @@ class BrowseAPI:
     async def browse_source_container(self,
                                       source_id: Optional[int]=None,
                                       container_id: Optional[str]=None,
-                                      item_range: Optional[tuple]=None) -> list:
+                                      item_range: Optional[tuple]=None,
+                                      concurrency: int=1) -> list:
         """ Browses the specified Container on the specified Source.
 
         :param source_id: Source ID
         :param container_id: Container ID
         :param item_range: Tuple specifying the start and end range to query
+        :param concurrency: Number of pages to request at once once the size of the container is known
         :return: list of SourceMedia
         """
-        results = []
+        async def get_page(page_range: Optional[tuple]) -> tuple:
+            return await self._get_source_container_results(source_id, container_id, page_range)
 
-        while True:
-            total_count, res = await self._get_source_container_results(source_id, container_id, item_range)
-            results.extend(res)
+        return await self._get_all_pages(get_page, item_range, concurrency)
 
-            # Unknown container size - reached the end
-            if total_count == 0 and len(res.payload) == 0:
-                break
+    async def browse_page(self, source_id: int, container_id: Optional[str], item_range: tuple,
+                          use_cache: bool=True) -> tuple:
+        """ Retrieves a single range of items from a Source or a Container on it.
+
+        :param source_id: Source ID
+        :param container_id: Container ID or None to browse the top level of the source
+        :param item_range: Tuple specifying the start and end range to query
+        :param use_cache: Answer from the browse cache, if there is one; the result is cached either way
+        :return: (total number of items, list of SourceMedia)
+        """
+        return await self._get_source_container_results(source_id, container_id, item_range, use_cache)
+
+    async def iter_source_container(self,
+                                    source_id: Optional[int]=None,
+                                    container_id: Optional[str]=None,
+                                    item_range: Optional[tuple]=None) -> AsyncIterator[models.Source]:
+        """ Browses the specified Container on the specified Source, yielding each item as soon as the page it is on
+        has arrived.  See browse_source_container().
 
-            current_count = len(results)
-            # Known container size - reached the end
-            if current_count >= total_count:
+        :param source_id: Source ID
+        :param container_id: Container ID
+        :param item_range: Tuple specifying the start and end range to query
+        :return: Async iterator of SourceMedia
+        """
+        async def get_page(page_range: Optional[tuple]) -> tuple:
+            return await self._get_source_container_results(source_id, container_id, page_range)
+
+        pages = self._iter_pages(get_page, item_range)
+        try:
+            async for item in pages:
+                yield item
+        finally:
+            await pages.aclose()    # Cancels the prefetch now rather than whenever the generator is finalized
+
+    async def _iter_pages(self, get_page: Callable[[Optional[tuple]], Awaitable[tuple]],
+                          item_range: Optional[tuple]) -> AsyncIterator:
+        """ Yields every item from the first range to the end of a paged result.  The next page is requested while the
+        items of the current one are being yielded, and each page is let go of once its items have been yielded.
+
+        :param get_page: Callable that retrieves a range, or the default range given None, and returns a (total count,
+                         list of items) tuple
+        :param item_range: Tuple specifying the start and end of the first range to query or None for the default
+        :return: Async iterator of items
+        """
+        total, page = await get_page(item_range)
+        position = int(item_range[0]) if item_range else 0
+
+        prefetch = None
+        try:
+            while page:
+                position += len(page)
+                if position < total:
+                    page_range = position, min(position + self.MAX_QUERY_RESULTS, total) - 1
+                    prefetch = asyncio.ensure_future(get_page(page_range))
+
+                for item in page:
+                    yield item
+                page = None
+
+                if prefetch is None:
+                    break
+
+                total, page = await prefetch
+                prefetch = None
+                page = page[:max(total - position, 0)]  # The count may have shrunk since the page was requested
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+
+    async def _get_all_pages(self, get_page: Callable[[Optional[tuple]], Awaitable[tuple]],
+                             item_range: Optional[tuple], concurrency: int) -> list:
+        """ Retrieves every item from the first range to the end of a paged result.  The first page tells us how many
+        items there are, so up to `concurrency` of the remaining pages are then requested at once and put back in
+        order as they arrive.
+
+        A page that comes back short has the rest of its range requested again, a page that comes back empty marks
+        the end of the results, and if the total count changes while we're retrieving pages the latest one is used.
+
+        :param get_page: Callable that retrieves a range, or the default range given None, and returns a (total count,
+                         list of items) tuple
+        :param item_range: Tuple specifying the start and end of the first range to query or None for the default
+        :param concurrency: Number of pages to request at once
+        :return: list of items
+        """
+        total, first_page = await get_page(item_range)
+        offset = int(item_range[0]) if item_range else 0
+
+        if not first_page:
+            return first_page
+
+        pages = {offset: first_page}    # Start index -> items
+        next_start = offset + len(first_page)
+
+        pending = {}    # Task -> (start, end) of the range it is retrieving
+        try:
+            while pending or next_start < total:
+                while len(pending) < max(concurrency, 1) and next_start < total:
+                    page_range = next_start, min(next_start + self.MAX_QUERY_RESULTS, total) - 1
+                    pending[asyncio.ensure_future(get_page(page_range))] = page_range
+                    next_start = page_range[1] + 1
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start, end = pending.pop(task)
+                    count, items = task.result()
+
+                    if count != total:
+                        logger.debug(f'Result count changed from {total} to {count} while retrieving pages')
+                        total = count
+                        next_start = min(next_start, total)
+
+                    if start >= total:
+                        continue
+
+                    pages[start] = items
+                    if not items:
+                        total = start   # The results ended early
+                    elif len(items) < end - start + 1 and start + len(items) < total:
+                        # Short page - request the rest of its range on its own
+                        rest = start + len(items), end
+                        pending[asyncio.ensure_future(get_page(rest))] = rest
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        results = []
+        position = offset
+        while position in pages:
+            items = pages[position] if position == offset else pages[position][:total - position]
+            if not items:
                 break
 
-            item_range = current_count, current_count + self.MAX_QUERY_RESULTS
+            results.extend(items)
+            position += len(items)
 
         return results
 
@@ -102,10 +243,22 @@ class BrowseAPI:
         :param container_id: Container ID
         :return: None
         """
-        await self._api.call('browse', 'delete_playlist', sid=source_id, cid=container_id)
+        await self._api.call('browse', 'delete_playlist', shape=ResponseShape.Header, sid=source_id, cid=container_id)
+        await self._invalidate(source_id)
 
     # FIXME: Can this just be replaced with browse.browse above?
-    async def _get_source_container_results(self, source_id: int, container_id: str, item_range: tuple) -> tuple:
+    async def _get_source_container_results(self, source_id: int, container_id: str, item_range: tuple,
+                                            use_cache: bool=True) -> tuple:
+        if use_cache:
+            cached = await self._get_cached_results(source_id, container_id, item_range)
+            if cached is not None:
+                return cached
+
+        if self.library is not None and not self._api.connected:
+            stored = await self.library.get_async(source_id, container_id, item_range, stale=True)
+            if stored is not None:
+                return stored
+
         kwargs = {}
 
         if source_id is not None:
@@ -117,8 +270,65 @@ class BrowseAPI:
         if item_range is not None:
             kwargs['range'] = ','.join([str(itm) for itm in item_range])
 
-        results = await self._api.call('browse', 'browse', **kwargs)
-        return int(results.header.vars.get('count', 0)), [models.Source(media, parent_source_id=source_id, parent_container_id=container_id) for media in results.payload]
+        try:
+            results = await self._api.call('browse', 'browse', **kwargs)
+        except (ChannelUnavailableError, CommandTimeoutError, OSError):
+            if self.library is None:
+                raise
+
+            stored = await self.library.get_async(source_id, container_id, item_range, stale=True)
+            if stored is None:
+                raise
+
+            logger.debug(f'Answering browse of {source_id}/{container_id} from the library store while offline')
+            return stored
+
+        count = int(results.header.vars.get('count', 0))
+        items = [models.Source(media, parent_source_id=source_id, parent_container_id=container_id)
+                 for media in results.payload]
+
+        if self.cache is not None:
+            self.cache.put(source_id, container_id, item_range, count, items)
+
+        if self.library is not None:
+            await self.library.put_async(source_id, container_id, item_range, count, items)
+
+        return count, items
+
+    async def _get_cached_results(self, source_id: int, container_id: str, item_range: tuple) -> Optional[tuple]:
+        """ Looks for a browse result in the cache, and then in the library store.
+
+        :param source_id: Source ID
+        :param container_id: Container ID
+        :param item_range: Tuple specifying the start and end range or None for the default
+        :return: (total count, list of items) or None if neither has a usable result
+        """
+        if self.cache is not None:
+            cached = self.cache.get(source_id, container_id, item_range)
+            if cached is not None:
+                return cached
+
+        if self.library is not None:
+            stored = await self.library.get_async(source_id, container_id, item_range)
+            if stored is not None:
+                if self.cache is not None:
+                    self.cache.put(source_id, container_id, item_range, *stored)
+
+                return stored
+
+        return None
+
+    async def _invalidate(self, source_id: int):
+        """ Drops cached results for a source and marks its stored ones as needing to be checked again.
+
+        :param source_id: Source ID
+        :return: None
+        """
+        if self.cache is not None:
+            self.cache.invalidate(source_id)
+
+        if self.library is not None:
+            await self.library.expire_async(source_id)
 
     async def get_music_sources(self) -> list:
         """ Retrieve a list of music sources.
@@ -128,6 +338,16 @@ class BrowseAPI:
         results = await self._api.call('browse', 'get_music_sources')
         return [models.Source(source) for source in results.payload]
 
+    async def iter_music_sources(self) -> AsyncIterator[models.Source]:
+        """ Retrieves the music sources, yielding each one.  HEOS returns them all in one response, so this is mostly
+        for symmetry with iter_source_container() and iter_search().
+
+        :return: Async iterator of Sources
+        """
+        results = await self._api.call('browse', 'get_music_sources')
+        for source in results.payload:
+            yield models.Source(source)
+
     async def get_search_criteria(self, source_id: int) -> list:
         """ Retrieves the search criteria settings for the specified music source.
 
@@ -158,7 +378,8 @@ class BrowseAPI:
         :param name: Station name returned by browse
         :return: None
         """
-        await self._api.call('browse', 'play_stream', pid=player_id, sid=source_id, cid=container_id, mid=media_id, name=name)
+        await self._api.call('browse', 'play_stream', shape=ResponseShape.Header,
+                             pid=player_id, sid=source_id, cid=container_id, mid=media_id, name=name)
 
     async def play_preset(self, player_id: int, preset: int):
         """ Plays one of the configured presets/favorites.
@@ -170,7 +391,7 @@ class BrowseAPI:
         if preset <= 0:
             raise ValueError('Preset must be greater than zero.')
 
-        await self._api.call('browse', 'play_preset', pid=player_id, preset=preset)
+        await self._api.call('browse', 'play_preset', shape=ResponseShape.Header, pid=player_id, preset=preset)
 
     async def play_input(self, player_id: int, input_name: str, source_player_id: Optional[int]=None):
         """ Plays the specified input source on the provided Player ID.  Other speakers can be targeted if the optional
@@ -185,7 +406,7 @@ class BrowseAPI:
         if source_player_id is not None:
             kwargs['spid'] = source_player_id
 
-        await self._api.call('browse', 'play_input', pid=player_id, input=input_name, **kwargs)
+        await self._api.call('browse', 'play_input', shape=ResponseShape.Header, pid=player_id, input=input_name, **kwargs)
 
     async def play_url(self, player_id: str, url: str):
         """ Play the specified URL
@@ -198,7 +419,7 @@ class BrowseAPI:
         kwargs['pid'] = player_id
         kwargs['url'] = url         # 'url' must be the last parameter in this command.
 
-        await self._api.call('browse', 'play_stream', **kwargs)
+        await self._api.call('browse', 'play_stream', shape=ResponseShape.Header, **kwargs)
 
     async def rename_playlist(self, source_id: int, container_id: int, name: str):
         """ Renames a playlist container.
@@ -208,7 +429,9 @@ class BrowseAPI:
         :param name: New playlist name
         :return: None
         """
-        await self._api.call('browse', 'rename_playlist', sid=source_id, cid=container_id, name=name)
+        await self._api.call('browse', 'rename_playlist', shape=ResponseShape.Header,
+                             sid=source_id, cid=container_id, name=name)
+        await self._invalidate(source_id)
 
     async def retrieve_metadata(self, source_id: int, container_id: int) -> list:
         """ Retrieves image data for a specific container.  This only applies to Rhapsody and Napster.
@@ -221,7 +444,7 @@ class BrowseAPI:
 
         return [models.browse.AlbumMetadata(itm) for itm in results.payload]
 
-    async def search(self, source_id: int, query: str, search_criteria_id: int) -> list:
+    async def search(self, source_id: int, query: str, search_criteria_id: int, concurrency: int=1) -> list:
         """ Search the source for a given string using the specified search criteria ID.
 
         FIXME: Can't get this working with my current setup - keep getting a -10 system error when searching Plex.
@@ -229,30 +452,38 @@ class BrowseAPI:
         :param source_id: Source ID
         :param query: String to search for.  May include wildcards if the search criteria does.
         :param search_criteria_id: Search Criteria ID
+        :param concurrency: Number of pages to request at once once the number of results is known
         :return: list of SourceMedia
         """
         if len(query) > self.MAX_SEARCH_LENGTH:
             raise ValueError(f"Query must be no longer than {self.MAX_SEARCH_LENGTH} characters.")
 
-        results = []
-        item_range = None
+        async def get_page(page_range: Optional[tuple]) -> tuple:
+            return await self._get_search_results(source_id, query, search_criteria_id, page_range)
 
-        while True:
-            total_count, res = await self._get_search_results(source_id, query, search_criteria_id, item_range)
-            results.extend(res)
+        return await self._get_all_pages(get_page, None, concurrency)
 
-            # Unknown container size - reached the end
-            if total_count == 0 and len(res.payload) == 0:
-                break
+    async def iter_search(self, source_id: int, query: str, search_criteria_id: int) -> AsyncIterator[models.Source]:
+        """ Search the source for a given string using the specified search criteria ID, yielding each result as soon
+        as the page it is on has arrived.  See search().
 
-            current_count = len(results)
-            # Known container size - reached the end
-            if current_count >= total_count:
-                break
+        :param source_id: Source ID
+        :param query: String to search for.  May include wildcards if the search criteria does.
+        :param search_criteria_id: Search Criteria ID
+        :return: Async iterator of SourceMedia
+        """
+        if len(query) > self.MAX_SEARCH_LENGTH:
+            raise ValueError(f"Query must be no longer than {self.MAX_SEARCH_LENGTH} characters.")
 
-            item_range = current_count, current_count + self.MAX_QUERY_RESULTS
+        async def get_page(page_range: Optional[tuple]) -> tuple:
+            return await self._get_search_results(source_id, query, search_criteria_id, page_range)
 
-        return results
+        pages = self._iter_pages(get_page, None)
+        try:
+            async for item in pages:
+                yield item
+        finally:
+            await pages.aclose()    # Cancels the prefetch now rather than whenever the generator is finalized
 
     async def _get_search_results(self, source_id: int, query: str, search_criteria_id: int, item_range: tuple) -> tuple:
         """ Retrieves the results for a given range in a search request
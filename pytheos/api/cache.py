@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+""" Caches the results of browsing music sources """
+
+from __future__ import annotations
+
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+from ..stats import CacheStats
+
+logger = logging.getLogger(__name__)
+
+
+class BrowseCache:
+    """ Least recently used cache of browse results, keyed by source ID, container ID, and range.  Entries expire after
+    a time to live that depends on the source, since a local music library changes far less often than a list of live
+    radio stations.  One cache may be shared by every BrowseAPI talking to the same system (see shared()), so separate
+    controllers, or separate Pytheos instances, don't retrieve the same pages twice.  Results aren't keyed by system,
+    so a cache must not be shared by instances talking to different ones. """
+
+    MAX_ENTRIES = 1000
+    MAX_BYTES = 16 * 1024 * 1024    # Rough upper bound on the memory used by cached items
+    DEFAULT_TTL = 300               # Seconds a result is kept for sources without a TTL of their own
+    SOURCE_TTLS = {                 # Source ID -> seconds a result is kept; zero disables caching
+        3: 60,          # TuneIn - live stations come and go
+        1024: 3600,     # Local music servers
+        1025: 300,      # HEOS playlists
+        1026: 0,        # HEOS history - changes with everything that is played
+        1027: 3600,     # AUX inputs
+        1028: 60,       # HEOS favorites
+    }
+    ITEM_OVERHEAD = 200             # Estimated bytes used by each cached item on top of its values
+
+    _shared: weakref.WeakValueDictionary = weakref.WeakValueDictionary()   # System -> BrowseCache while it's in use
+
+    @classmethod
+    def shared(cls, system=None) -> BrowseCache:
+        """ Retrieves the cache shared by everything in this process that asks for one for the same system, so
+        results from different systems are never mixed and a change on one doesn't drop what is cached for another.
+
+        A system's cache is dropped once nothing refers to it any more.
+
+        :param system: Anything identifying the system, e.g. the (host, port) it is reached at
+        :return: BrowseCache
+        """
+        cache = cls._shared.get(system)
+        if cache is None:
+            cache = cls._shared[system] = cls()
+
+        return cache
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __init__(self, max_entries: int=MAX_ENTRIES, max_bytes: int=MAX_BYTES, default_ttl: float=DEFAULT_TTL,
+                 ttls: Optional[dict]=None):
+        """ Constructor
+
+        :param max_entries: Most results kept
+        :param max_bytes: Most (estimated) bytes used by the items of the results kept
+        :param default_ttl: Seconds a result is kept for sources without a TTL of their own
+        :param ttls: Mapping of source IDs to the seconds their results are kept, replacing SOURCE_TTLS
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls: dict = dict(self.SOURCE_TTLS if ttls is None else ttls)
+        self.stats = CacheStats()
+
+        self._entries: OrderedDict = OrderedDict()     # Key -> (expiry time, count, items, size), oldest use first
+        self._size: int = 0
+
+    def __repr__(self):
+        return f'<BrowseCache(entries={len(self._entries)}, size={self._size}, stats={self.stats!r})>'
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl(self, source_id) -> float:
+        """ Retrieves how long the results for a source are kept.
+
+        :param source_id: Source ID
+        :return: Seconds
+        """
+        return self.ttls.get(self._normalize_source_id(source_id), self.default_ttl)
+
+    def set_ttl(self, source_id: int, ttl: float):
+        """ Sets how long the results for a source are kept.
+
+        :param source_id: Source ID
+        :param ttl: Seconds; zero disables caching for the source
+        :return: None
+        """
+        self.ttls[self._normalize_source_id(source_id)] = ttl
+
+    def get(self, source_id, container_id: Optional[str], item_range: Optional[tuple]) -> Optional[tuple]:
+        """ Retrieves a cached browse result.
+
+        :param source_id: Source ID
+        :param container_id: Container ID or None for the top level of the source
+        :param item_range: Tuple specifying the start and end range or None for the default
+        :return: (total count, list of items) or None if there is no usable result
+        """
+        key = self._key(source_id, container_id, item_range)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires, count, items, _ = entry
+        if time.monotonic() >= expires:
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+
+        return count, list(items)
+
+    def put(self, source_id, container_id: Optional[str], item_range: Optional[tuple], count: int, items: list):
+        """ Caches a browse result.
+
+        :param source_id: Source ID
+        :param container_id: Container ID or None for the top level of the source
+        :param item_range: Tuple specifying the start and end range or None for the default
+        :param count: Total number of items in the source or container
+        :param items: Items in the range
+        :return: None
+        """
+        ttl = self.ttl(source_id)
+        if ttl <= 0:
+            return
+
+        key = self._key(source_id, container_id, item_range)
+        if key in self._entries:
+            self._remove(key)
+
+        size = self._estimate_size(items)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, count, list(items), size)
+        self._size += size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def invalidate(self, source_id=None, container_id: Optional[str]=None):
+        """ Drops cached results that may be outdated.
+
+        :param source_id: Source ID or None to drop everything
+        :param container_id: Container ID or None to drop everything from the source
+        :return: None
+        """
+        source_id = self._normalize_source_id(source_id)
+        keys = [key for key in self._entries
+                if source_id is None or (key[0] == source_id and (container_id is None or key[1] == container_id))]
+
+        for key in keys:
+            self._remove(key)
+
+        self.stats.invalidations += len(keys)
+        if keys:
+            logger.debug(f'Invalidated {len(keys)} cached browse results')
+
+    def clear(self):
+        """ Drops every cached result without counting them as invalidated.
+
+        :return: None
+        """
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: tuple):
+        self._size -= self._entries.pop(key)[3]
+
+    def _key(self, source_id, container_id: Optional[str], item_range: Optional[tuple]) -> tuple:
+        if item_range is not None:
+            item_range = tuple(int(itm) for itm in item_range)
+
+        return self._normalize_source_id(source_id), container_id, item_range
+
+    @staticmethod
+    def _normalize_source_id(source_id):
+        """ Source IDs are given as both integers and strings, so use integers wherever we can.
+
+        :param source_id: Source ID
+        :return: Source ID
+        """
+        try:
+            return int(source_id)
+        except (TypeError, ValueError):
+            return source_id
+
+    def _estimate_size(self, items: list) -> int:
+        """ Estimates the memory used by a list of items from the length of their values.
+
+        :param items: List of models
+        :return: Bytes
+        """
+        return sum(self.ITEM_OVERHEAD + sum(len(str(value)) for value in vars(item).values() if value is not None)
+                   for item in items)
@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import Optional
 
 from .. import models
+from ..models.heos import ResponseShape
 
 
 class GroupAPI:
@@ -40,7 +41,7 @@ class GroupAPI:
         :param group_id: Group ID
         :return: bool
         """
-        results = await self._api.call('group', 'get_mute', gid=group_id)
+        results = await self._api.call('group', 'get_mute', shape=ResponseShape.Header, gid=group_id)
         return results.header.vars.get('state') == 'on'
 
     async def get_volume(self, group_id: int) -> int:
@@ -49,7 +50,7 @@ class GroupAPI:
         :param group_id: Group ID
         :return: int
         """
-        results = await self._api.call('group', 'get_volume', gid=group_id)
+        results = await self._api.call('group', 'get_volume', shape=ResponseShape.Header, gid=group_id)
         return int(results.header.vars.get('level'))
 
     async def set_group(self, leader_id: int, member_ids=None) -> Optional[models.Group]:
@@ -63,7 +64,8 @@ class GroupAPI:
         if member_ids:
             player_ids += member_ids
 
-        results = await self._api.call('group', 'set_group', pid=','.join([str(pid) for pid in player_ids]))
+        results = await self._api.call('group', 'set_group', shape=ResponseShape.Header,
+                                       pid=','.join([str(pid) for pid in player_ids]))
 
         if results.header.vars.get('gid') is not None:
             return models.Group(results.header.vars)
@@ -77,7 +79,8 @@ class GroupAPI:
         :param enable: True or False
         :return: None
         """
-        await self._api.call('group', 'set_mute', gid=group_id, state=models.player.Mute.On if enable else models.player.Mute.Off)
+        await self._api.call('group', 'set_mute', shape=ResponseShape.Header,
+                             gid=group_id, state=models.player.Mute.On if enable else models.player.Mute.Off)
 
     async def set_volume(self, group_id: int, level: int) -> None:
         """ Sets the volume level on the group
@@ -90,7 +93,7 @@ class GroupAPI:
         if not self.VOLUME_MIN <= level <= self.VOLUME_MAX:
             raise ValueError(f'Level must be between {self.VOLUME_MIN} and {self.VOLUME_MAX}')
 
-        await self._api.call('group', 'set_volume', gid=group_id, level=level)
+        await self._api.call('group', 'set_volume', shape=ResponseShape.Header, gid=group_id, level=level)
 
     async def toggle_mute(self, group_id: int) -> None:
         """ Toggles mute on the group
@@ -98,7 +101,7 @@ class GroupAPI:
         :param group_id: Group ID
         :return: None
         """
-        await self._api.call('group', 'toggle_mute', gid=group_id)
+        await self._api.call('group', 'toggle_mute', shape=ResponseShape.Header, gid=group_id)
 
     async def volume_up(self, group_id: int, step_level: int=5) -> None:
         """ Turn the volume up by the specified step level.
@@ -111,7 +114,7 @@ class GroupAPI:
         if not self.VOLUME_STEP_MIN < step_level <= self.VOLUME_STEP_MAX:
             raise ValueError(f'Step level must be between {self.VOLUME_STEP_MIN} and {self.VOLUME_STEP_MAX}')
 
-        await self._api.call('group', 'volume_up', gid=group_id, step=step_level)
+        await self._api.call('group', 'volume_up', shape=ResponseShape.Header, gid=group_id, step=step_level)
 
     async def volume_down(self, group_id: int, step_level: int = 5) -> None:
         """ Turn the volume down by the specified step level.
@@ -124,4 +127,4 @@ class GroupAPI:
         if not self.VOLUME_STEP_MIN < step_level <= self.VOLUME_STEP_MAX:
             raise ValueError(f'Step level must be between {self.VOLUME_STEP_MIN} and {self.VOLUME_STEP_MAX}')
 
-        await self._api.call('group', 'volume_down', gid=group_id, step=step_level)
+        await self._api.call('group', 'volume_down', shape=ResponseShape.Header, gid=group_id, step=step_level)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+""" Keeps browse results on disk so that music libraries can be browsed without waiting on (or reaching) the system """
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .. import models
+from ..stats import CacheStats
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_VERSION = 1     # Increment whenever the layout of the database changes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    sid TEXT NOT NULL,
+    cid TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    refreshed REAL NOT NULL,
+    PRIMARY KEY (sid, cid)
+);
+CREATE TABLE IF NOT EXISTS items (
+    sid TEXT NOT NULL,
+    cid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    container INTEGER NOT NULL,
+    item_cid TEXT,
+    mid TEXT,
+    name TEXT,
+    artist TEXT,
+    album TEXT,
+    image_url TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sid, cid, position)
+);
+CREATE INDEX IF NOT EXISTS items_by_container ON items (sid, item_cid);
+"""
+
+
+class LibraryStore:
+    """ SQLite database of browse results.  Each source and container is stored with the total number of items in it
+    and when it was last checked against the system, and each item with its position and a link to the container it
+    is in (and to the container it is, if it is one).
+
+    Results younger than their source's maximum age are answered from the store.  Older ones are retrieved again, and
+    if the total count and the items in the retrieved range are unchanged the container is considered current again
+    without retrieving the rest of it; otherwise everything stored for the container is dropped and retrieved again as
+    it is needed.  Whatever is stored can still be browsed when the system can't be reached.
+
+    The *_async methods run the queries on a thread of the store's own so that they don't hold up the event loop. """
+
+    MAX_AGE = 24 * 60 * 60      # Seconds a container is trusted for sources without a maximum age of their own
+    SOURCE_MAX_AGES = {         # Source ID -> seconds a container is trusted; zero keeps the source out of the store
+        3: 60 * 60,     # TuneIn - live stations come and go
+        1026: 0,        # HEOS history - changes with everything that is played
+        1028: 5 * 60,   # HEOS favorites
+    }
+    DEFAULT_RANGE_SIZE = 50     # Items HEOS returns when no range is given
+
+    def __init__(self, path: str, max_age: float=MAX_AGE, max_ages: Optional[dict]=None):
+        """ Constructor
+
+        :param path: Database file, created if it doesn't exist
+        :param max_age: Seconds a container is trusted for sources without a maximum age of their own
+        :param max_ages: Mapping of source IDs to the seconds their containers are trusted, replacing SOURCE_MAX_AGES
+        :raises: sqlite3.Error
+        """
+        self.path = path
+        self.max_age = max_age
+        self.max_ages: dict = dict(self.SOURCE_MAX_AGES if max_ages is None else max_ages)
+        self.stats = CacheStats()
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()      # Queries come from both the event loop and the executor's thread
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._open()
+
+    def __repr__(self):
+        return f'<LibraryStore(path={self.path}, stats={self.stats!r})>'
+
+    def __len__(self):
+        with self._lock:
+            return self._open().execute('SELECT COUNT(*) FROM containers').fetchone()[0]
+
+    def close(self):
+        """ Waits for any queries still running and closes the database.  It is opened again if the store is used
+        afterwards (e.g. when reconnecting).
+
+        :return: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    async def get_async(self, source_id, container_id: Optional[str], item_range: Optional[tuple],
+                        stale: bool=False) -> Optional[tuple]:
+        """ Retrieves a stored browse result without blocking the event loop.  See get().
+
+        :return: (total count, list of models.Source) or None if there is no usable result
+        """
+        return await self._run(self.get, source_id, container_id, item_range, stale=stale)
+
+    async def put_async(self, source_id, container_id: Optional[str], item_range: Optional[tuple], count: int,
+                        items: list):
+        """ Stores a browse result without blocking the event loop.  See put().
+
+        :return: None
+        """
+        await self._run(self.put, source_id, container_id, item_range, count, items)
+
+    async def expire_async(self, source_id=None, container_id: Optional[str]=None):
+        """ Marks stored containers as needing to be checked again without blocking the event loop.  See expire().
+
+        :return: None
+        """
+        await self._run(self.expire, source_id, container_id)
+
+    def max_age_of(self, source_id) -> float:
+        """ Retrieves how long the containers of a source are trusted.
+
+        :param source_id: Source ID
+        :return: Seconds
+        """
+        try:
+            source_id = int(source_id)
+        except (TypeError, ValueError):
+            pass
+
+        return self.max_ages.get(source_id, self.max_age)
+
+    def get(self, source_id, container_id: Optional[str], item_range: Optional[tuple],
+            stale: bool=False) -> Optional[tuple]:
+        """ Retrieves a stored browse result.
+
+        :param source_id: Source ID
+        :param container_id: Container ID or None for the top level of the source
+        :param item_range: Tuple specifying the start and end range or None for the default
+        :param stale: Return the result even if it is older than the source's maximum age (e.g. when offline).  Stale
+                      lookups aren't counted in the stats.
+        :return: (total count, list of models.Source) or None if there is no usable result
+        """
+        sid, cid = self._key(source_id, container_id)
+        with self._lock:
+            db = self._open()
+            container = db.execute(
+                'SELECT count, refreshed FROM containers WHERE sid = ? AND cid = ?', (sid, cid)).fetchone()
+
+            rows = None
+            if container is not None:
+                count, refreshed = container
+                start, end = self._range(item_range)
+                end = min(end, count - 1)
+
+                rows = db.execute(
+                    'SELECT data FROM items WHERE sid = ? AND cid = ? AND position BETWEEN ? AND ? ORDER BY position',
+                    (sid, cid, start, end)).fetchall()
+
+        items = None
+        if rows is not None:
+            if len(rows) == max(end - start + 1, 0):
+                if not stale and time.time() - refreshed >= self.max_age_of(source_id):
+                    self.stats.expirations += 1
+                else:
+                    items = [models.Source(json.loads(data), parent_source_id=source_id,
+                                           parent_container_id=container_id) for data, in rows]
+
+        if not stale:
+            if items is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+
+        return (count, items) if items is not None else None
+
+    def put(self, source_id, container_id: Optional[str], item_range: Optional[tuple], count: int, items: list):
+        """ Stores a browse result retrieved from the system.  If the container has changed since it was stored,
+        everything stored for it is dropped first.
+
+        :param source_id: Source ID
+        :param container_id: Container ID or None for the top level of the source
+        :param item_range: Tuple specifying the start and end range or None for the default
+        :param count: Total number of items in the source or container
+        :param items: Items in the range
+        :return: None
+        """
+        if self.max_age_of(source_id) <= 0:
+            return
+
+        sid, cid = self._key(source_id, container_id)
+        start, _ = self._range(item_range)
+        rows = [self._row(sid, cid, start + idx, item) for idx, item in enumerate(items)]
+
+        with self._lock, self._open() as db:
+            container = db.execute(
+                'SELECT count FROM containers WHERE sid = ? AND cid = ?', (sid, cid)).fetchone()
+
+            stored = db.execute(
+                'SELECT position, data FROM items WHERE sid = ? AND cid = ? AND position BETWEEN ? AND ?',
+                (sid, cid, start, start + len(rows) - 1)).fetchall()
+
+            changed = container is not None and (container[0] != count or any(
+                data != rows[position - start][-1] for position, data in stored))
+            if changed:
+                db.execute('DELETE FROM items WHERE sid = ? AND cid = ?', (sid, cid))
+                self.stats.invalidations += 1
+                logger.debug(f'Library container {sid}/{cid} changed, dropping what was stored for it')
+
+            db.executemany('INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+            # Finding nothing different in what we already had means the container is still current; items we
+            # hadn't stored before don't tell us anything about the rest of it
+            if container is None or changed or stored:
+                db.execute('INSERT OR REPLACE INTO containers VALUES (?, ?, ?, ?)', (sid, cid, count, time.time()))
+
+    def expire(self, source_id=None, container_id: Optional[str]=None):
+        """ Marks stored containers as needing to be checked against the system the next time they are browsed.  What
+        is stored is kept, so it can still be browsed offline.
+
+        :param source_id: Source ID or None for every source
+        :param container_id: Container ID or None for every container on the source; empty string for the top level
+        :return: None
+        """
+        query, params = 'UPDATE containers SET refreshed = 0', ()
+        if source_id is not None:
+            query, params = query + ' WHERE sid = ?', (str(source_id),)
+            if container_id is not None:
+                query, params = query + ' AND cid = ?', params + (container_id,)
+
+        with self._lock, self._open() as db:
+            db.execute(query, params)
+
+    def clear(self):
+        """ Drops everything stored.
+
+        :return: None
+        """
+        with self._lock, self._open() as db:
+            db.execute('DELETE FROM items')
+            db.execute('DELETE FROM containers')
+
+    def _open(self) -> sqlite3.Connection:
+        """ Opens the database unless it is already open.  Callers hold the lock.
+
+        :raises: sqlite3.Error
+        :return: sqlite3.Connection
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_schema()
+
+        return self._db
+
+    def _run(self, func, *args, **kwargs) -> asyncio.Future:
+        """ Runs a method on the store's thread.  A single thread keeps the queries in the order they were made.
+
+        :return: asyncio.Future
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pytheos-library')
+
+        return asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def _create_schema(self):
+        """ Creates the tables, replacing any written by a different version of the store.
+
+        :return: None
+        """
+        version = self._db.execute('PRAGMA user_version').fetchone()[0]
+        with self._db:
+            if version != LIBRARY_VERSION:
+                if version:
+                    logger.warning(f'Discarding library store {self.path} written by version {version}')
+
+                self._db.execute('DROP TABLE IF EXISTS items')
+                self._db.execute('DROP TABLE IF EXISTS containers')
+
+            for statement in _SCHEMA.split(';'):
+                if statement.strip():
+                    self._db.execute(statement)
+
+            self._db.execute(f'PRAGMA user_version = {LIBRARY_VERSION}')
+
+    def _range(self, item_range: Optional[tuple]) -> tuple:
+        if item_range is None:
+            return 0, self.DEFAULT_RANGE_SIZE - 1
+
+        return int(item_range[0]), int(item_range[1])
+
+    @staticmethod
+    def _key(source_id, container_id: Optional[str]) -> tuple:
+        return str(source_id), container_id if container_id is not None else ''
+
+    @staticmethod
+    def _row(sid: str, cid: str, position: int, item: models.Source) -> tuple:
+        return (sid, cid, position, item.container, item.container_id if item.container else None, item.media_id,
+                item.name, item.artist, item.album, item.image_url, json.dumps(item.to_dict(), sort_keys=True))
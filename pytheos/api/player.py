@@ -7,6 +7,7 @@ from typing import Optional, Union, List
 
 from .. import models
 from ..networking.errors import InvalidResponse
+from ..models.heos import ResponseShape
 
 
 class PlayerAPI:
@@ -34,7 +35,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: None
         """
-        await self._api.call('player', 'clear_queue', pid=player_id)
+        await self._api.call('player', 'clear_queue', shape=ResponseShape.Header, pid=player_id)
 
     async def get_mute(self, player_id: int) -> bool:
         """ Returns whether or not the player is currently muted
@@ -42,7 +43,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: bool
         """
-        results = await self._api.call('player', 'get_mute', pid=player_id)
+        results = await self._api.call('player', 'get_mute', shape=ResponseShape.Header, pid=player_id)
         return results.header.vars.get('state') == 'on'
 
     async def get_now_playing_media(self, player_id: int) -> models.media.MediaItem:
@@ -79,7 +80,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: PlayMode
         """
-        results = await self._api.call('player', 'get_play_mode', pid=player_id)
+        results = await self._api.call('player', 'get_play_mode', shape=ResponseShape.Header, pid=player_id)
 
         return models.player.PlayMode(
             repeat=models.player.RepeatMode(results.header.vars.get('repeat')),
@@ -93,7 +94,7 @@ class PlayerAPI:
         :raises: InvalidResponse
         :return: str
         """
-        results = await self._api.call('player', 'get_play_state', pid=player_id)
+        results = await self._api.call('player', 'get_play_state', shape=ResponseShape.Header, pid=player_id)
         if 'state' not in results.header.vars:
             raise InvalidResponse('Could not find "state" entry in response', results)
 
@@ -141,7 +142,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: int
         """
-        results = await self._api.call('player', 'get_volume', pid=player_id)
+        results = await self._api.call('player', 'get_volume', shape=ResponseShape.Header, pid=player_id)
         return int(results.header.vars.get('level'))
 
     async def move_queue_item(self, player_id: int, queue_ids: tuple, destination_queue_id: int):
@@ -163,7 +164,8 @@ class PlayerAPI:
         if destination_queue_id < 1:
             raise ValueError('Invalid Queue ID - must be between 1 and the size of the queue')
 
-        await self._api.call('player', 'move_queue_item', pid=player_id, sqid=','.join(quickselect_ids), dqid=destination_queue_id)
+        await self._api.call('player', 'move_queue_item', shape=ResponseShape.Header,
+                             pid=player_id, sqid=','.join(quickselect_ids), dqid=destination_queue_id)
 
     async def play_next(self, player_id: int) -> None:
         """ Plays the next item in the play queue
@@ -171,7 +173,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: None
         """
-        await self._api.call('player', 'play_next', pid=player_id)
+        await self._api.call('player', 'play_next', shape=ResponseShape.Header, pid=player_id)
 
     async def play_previous(self, player_id: int) -> None:
         """ Plays the previous item in the play queue
@@ -179,7 +181,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: None
         """
-        await self._api.call('player', 'play_previous', pid=player_id)
+        await self._api.call('player', 'play_previous', shape=ResponseShape.Header, pid=player_id)
 
     async def play_queue(self, player_id: int, queue_entry_id: int) -> None:
         """ Plays the specified queue item
@@ -188,7 +190,7 @@ class PlayerAPI:
         :param queue_entry_id: Queue entry ID
         :return: None
         """
-        await self._api.call('player', 'play_queue', pid=player_id, qid=queue_entry_id)
+        await self._api.call('player', 'play_queue', shape=ResponseShape.Header, pid=player_id, qid=queue_entry_id)
 
     async def play_quickselect(self, player_id: int, quick_select_id: int) -> None:
         """ Play the specified QuickSelect ID
@@ -201,7 +203,7 @@ class PlayerAPI:
         if not 1 <= quick_select_id <= 6:
             raise ValueError('Quick Select ID must be between 1 and 6')
 
-        await self._api.call('player', 'play_quickselect', pid=player_id, id=quick_select_id)
+        await self._api.call('player', 'play_quickselect', shape=ResponseShape.Header, pid=player_id, id=quick_select_id)
 
     async def remove_from_queue(self, player_id: int, queue_ids: Union[list, tuple, set]) -> None:
         """ Remove a set of items from the queue
@@ -210,7 +212,8 @@ class PlayerAPI:
         :param queue_ids: Queue IDs
         :return: None
         """
-        await self._api.call('player', 'remove_from_queue', pid=player_id, qid=','.join([str(qid) for qid in queue_ids]))
+        await self._api.call('player', 'remove_from_queue', shape=ResponseShape.Header,
+                             pid=player_id, qid=','.join([str(qid) for qid in queue_ids]))
 
     async def save_queue(self, player_id: int, playlist_name: str) -> None:
         """ Saves the current queue as a playlist
@@ -223,7 +226,7 @@ class PlayerAPI:
         if len(playlist_name) > 128:
             raise ValueError('Playlist name cannot exceed 128 characters')
 
-        await self._api.call('player', 'save_queue', pid=player_id, name=playlist_name)
+        await self._api.call('player', 'save_queue', shape=ResponseShape.Header, pid=player_id, name=playlist_name)
 
     async def set_mute(self, player_id: int, enable: bool) -> None:
         """ Enables or disables mute on the specified player
@@ -232,7 +235,8 @@ class PlayerAPI:
         :param enable: True or False
         :return: None
         """
-        await self._api.call('player', 'set_mute', pid=player_id, state=models.player.Mute.On if enable else models.player.Mute.Off)
+        await self._api.call('player', 'set_mute', shape=ResponseShape.Header,
+                             pid=player_id, state=models.player.Mute.On if enable else models.player.Mute.Off)
 
     async def set_play_mode(self, player_id: int, play_mode: models.player.PlayMode) -> None:
         """ Sets the play mode for the specified player - repeat & shuffle
@@ -241,7 +245,8 @@ class PlayerAPI:
         :param play_mode: PlayMode
         :return: None
         """
-        await self._api.call('player', 'set_play_mode', pid=player_id, repeat=play_mode.repeat, shuffle=play_mode.shuffle)
+        await self._api.call('player', 'set_play_mode', shape=ResponseShape.Header,
+                             pid=player_id, repeat=play_mode.repeat, shuffle=play_mode.shuffle)
 
     async def set_quickselect(self, player_id: int, quickselect_id: int) -> None:
         """ Selects the specified Quick Select
@@ -254,7 +259,7 @@ class PlayerAPI:
         if not 0 < quickselect_id <= 6:
             raise ValueError('Level must be between 1 and 6')
 
-        await self._api.call('player', 'set_quickselect', pid=player_id, id=quickselect_id)
+        await self._api.call('player', 'set_quickselect', shape=ResponseShape.Header, pid=player_id, id=quickselect_id)
 
     async def set_play_state(self, player_id: int, state: models.player.PlayState) -> None:
         """ Set the current playing state for the player
@@ -264,7 +269,8 @@ class PlayerAPI:
         :raises: ValueError
         :return: None
         """
-        await self._api.call('player', 'set_play_state', pid=player_id, state=models.player.PlayState(state))
+        await self._api.call('player', 'set_play_state', shape=ResponseShape.Header,
+                             pid=player_id, state=models.player.PlayState(state))
 
     async def set_volume(self, player_id: int, level: int) -> None:
         """ Sets the volume level on the player
@@ -277,7 +283,7 @@ class PlayerAPI:
         if not self.VOLUME_MIN <= level <= self.VOLUME_MAX:
             raise ValueError('Level must be between 0 and 100')
 
-        await self._api.call('player', 'set_volume', pid=player_id, level=level)
+        await self._api.call('player', 'set_volume', shape=ResponseShape.Header, pid=player_id, level=level)
 
     async def toggle_mute(self, player_id: int) -> None:
         """ Toggles mute on the player
@@ -285,7 +291,7 @@ class PlayerAPI:
         :param player_id: Player ID
         :return: None
         """
-        await self._api.call('player', 'toggle_mute', pid=player_id)
+        await self._api.call('player', 'toggle_mute', shape=ResponseShape.Header, pid=player_id)
 
     async def volume_up(self, player_id: int, step_level: int=VOLUME_DEFAULT_STEP) -> None:
         """ Turn the volume up by the specified step level.
@@ -298,7 +304,7 @@ class PlayerAPI:
         if not 0 < step_level <= 10:
             raise ValueError('Step level must be between 1 and 10')
 
-        await self._api.call('player', 'volume_up', pid=player_id, step=step_level)
+        await self._api.call('player', 'volume_up', shape=ResponseShape.Header, pid=player_id, step=step_level)
 
     async def volume_down(self, player_id: int, step_level: int=VOLUME_DEFAULT_STEP) -> None:
         """ Turn the volume down by the specified step level.
@@ -311,4 +317,4 @@ class PlayerAPI:
         if not 0 < step_level <= 10:
             raise ValueError('Step level must be between 1 and 10')
 
-        await self._api.call('player', 'volume_down', pid=player_id, step=step_level)
+        await self._api.call('player', 'volume_down', shape=ResponseShape.Header, pid=player_id, step=step_level)
@@ -3,8 +3,9 @@
 
 from __future__ import annotations
 
-from ..networking.errors import CommandFailedError, SignInFailedError
+from ..networking.errors import ChannelUnavailableError, CommandFailedError, CommandTimeoutError, SignInFailedError
 from ..models.system import AccountStatus
+from ..models.heos import ResponseShape
 
 
 class SystemAPI:
@@ -18,7 +19,7 @@ class SystemAPI:
 
         :return: (status, username)
         """
-        results = await self._api.call('system', 'check_account')
+        results = await self._api.call('system', 'check_account', shape=ResponseShape.Header)
 
         username = results.header.vars.get('un')
         result = results.header.vars.get('signed_out')
@@ -32,7 +33,7 @@ class SystemAPI:
 
         :return: None
         """
-        await self._api.call('system', 'heart_beat')
+        await self._api.call('system', 'heart_beat', shape=ResponseShape.Header)
 
     async def prettify_json_response(self, enable: bool) -> None:
         """ Enables or disables pretty JSON responses
@@ -40,14 +41,18 @@ class SystemAPI:
         :param enable: True or False
         :return: None
         """
-        await self._api.call('system', 'prettify_json_response', enable='on' if enable else 'off')
+        await self._api.call('system', 'prettify_json_response', shape=ResponseShape.Header, enable='on' if enable else 'off')
 
     async def reboot(self) -> None:
-        """ Forces the system to reboot
+        """ Forces the system to reboot.  The device may go down before it gets around to answering, so a missing
+        response is not an error.
 
         :return: None
         """
-        await self._api.call('system', 'reboot')
+        try:
+            await self._api.call('system', 'reboot', shape=ResponseShape.Header)
+        except (CommandTimeoutError, ChannelUnavailableError):
+            pass
 
     async def register_for_change_events(self, enable: bool) -> None:
         """ Registers the current connection to receive events from HEOS.
@@ -55,7 +60,8 @@ class SystemAPI:
         :param enable: True or False
         :return: None
         """
-        await self._api.call('system', 'register_for_change_events', enable='on' if enable else 'off')
+        await self._api.call('system', 'register_for_change_events', shape=ResponseShape.Header,
+                             enable='on' if enable else 'off')
 
     async def sign_in(self, username: str, password: str) -> None:
         """ Commands the system to sign-in to HEOS
@@ -66,7 +72,7 @@ class SystemAPI:
         :return: None
         """
         try:
-            await self._api.call('system', 'sign_in', un=username, pw=password)
+            await self._api.call('system', 'sign_in', shape=ResponseShape.Header, un=username, pw=password)
         except CommandFailedError as ex:
             raise SignInFailedError('HEOS sign-in failed', ex.result) from ex
 
@@ -75,4 +81,4 @@ class SystemAPI:
 
         :return: None
         """
-        await self._api.call('system', 'sign_out')
+        await self._api.call('system', 'sign_out', shape=ResponseShape.Header)
@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+from .paging import PagedItems, PagedSequence
 from .. import models
 
-from typing import TYPE_CHECKING, Sequence, Union, Optional
+from typing import TYPE_CHECKING, Union, Optional
 if TYPE_CHECKING:
     from pytheos import Pytheos
 
@@ -27,7 +28,7 @@ def create_media_leaf(item, parent, pytheos_obj):
     return item
 
 
-class MediaContainer(Sequence):
+class MediaContainer(PagedSequence):
     @property
     def id(self):
         return self._container.container_id
@@ -66,7 +67,9 @@ class MediaContainer(Sequence):
         self._nocache = False
         self._source_id = source_id
 
-        self._items: Optional[list] = None
+        self._items = PagedItems(
+            lambda item_range: pytheos.api.browse.browse_page(self._source_id, self.id, item_range, not self.nocache),
+            lambda item: create_media_leaf(item, self, self._pytheos))
 
     def __str__(self):
         return self.name
@@ -74,24 +77,6 @@ class MediaContainer(Sequence):
     def __repr__(self):
         return f"<HEOSContainer(id={self.id}, name={self.name})>"
 
-    def __getitem__(self, item):
-        return self._items[item]
-
-    def __len__(self):
-        return len(self._items)
-
-    def refresh(self, force: bool=False):
-        """ Refreshes the container if it is uninitialized, this call is forced, or if caching is disabled.
-
-        :param force: Force refresh
-        :return: None
-        """
-        if self._items is None or self.nocache or force:
-            items = self._pytheos.api.browse.browse_source_container(self._source_id, self.id)
-            self._items = [create_media_leaf(item, self, self._pytheos) for item in items]
-
-        return self._items
-
 
 class MediaItem:
     @property
@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 from .. import models
+from ..state import StateCache
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 if TYPE_CHECKING:
     from pytheos import Pytheos
     from .. import controllers
@@ -20,17 +21,37 @@ class Group:
     def members(self) -> tuple:
         return tuple(self._members)
 
+    @property
+    def state(self) -> StateCache:
+        return self._state
+
     def __contains__(self, player):
         return player.id == self._leader.id or any([p.id == player.id for p in self._members])
 
     def __init__(self, pytheos: 'Pytheos', group: models.Group):
         self._pytheos: 'Pytheos' = pytheos
+        self._state = StateCache()   # Volume and mute as last reported by the group
+        self._set_model(group)
+
+    def _set_model(self, group: models.Group):
         self._group: models.Group = group
 
         group_count = len(group.players)
         self._leader: 'controllers.Player' = group.players[0] if group_count > 0 else None
         self._members = group.players[1:] if group_count > 1 else []
 
+    def _update(self, group: models.Group) -> bool:
+        """ Replaces the Group information used by this class with a newer copy.
+
+        :param group: Group information
+        :return: True if anything changed
+        """
+        if group == self._group:
+            return False
+
+        self._set_model(group)
+        return True
+
     async def refresh(self, force=False):
         """ Refreshes the group information if leader is unset or force is specified.
 
@@ -81,14 +102,15 @@ class Group:
         self._leader = value
         await self._set_group()
 
-    async def get_muted(self) -> bool:
-        return await self._pytheos.api.group.get_mute(self._group.group_id)
+    async def get_muted(self, max_age: Optional[float]=None) -> bool:
+        return await self._get_state('mute', max_age, self._pytheos.api.group.get_mute)
 
     async def set_muted(self, value: bool):
         await self._pytheos.api.group.set_mute(self._group.group_id, value)
+        self._state.set('mute', value)
 
-    async def get_volume(self) -> int:
-        return await self._pytheos.api.group.get_volume(self._group.group_id)
+    async def get_volume(self, max_age: Optional[float]=None) -> int:
+        return await self._get_state('volume', max_age, self._pytheos.api.group.get_volume)
 
     async def set_volume(self, value: int):
         if value < self._pytheos.api.group.VOLUME_MIN:
@@ -97,6 +119,29 @@ class Group:
             value = self._pytheos.api.group.VOLUME_MAX
 
         await self._pytheos.api.group.set_volume(self._group.group_id, value)
+        self._state.set('volume', value)
+
+    async def _get_state(self, name: str, max_age: Optional[float], fetch: Callable[[int], Awaitable]):
+        """ Answers a question about the group's state from memory if we can, and asks the group otherwise.  See
+        Player._get_state().
+
+        :param name: State value name (e.g. volume)
+        :param max_age: Largest age (seconds) of a remembered value to accept, zero to always ask the group, or None
+                        to accept any age while change events are being received
+        :param fetch: API call that retrieves the value given the group ID
+        :return: The value
+        """
+        if max_age is None and not self._pytheos.tracking_state:
+            max_age = 0
+
+        value = self._state.get(name, max_age)
+        if value is None:
+            version = self._state.version
+            value = await fetch(self.id)
+            if not self._state.set(name, value, since=version) and name in self._state:
+                value = self._state.peek(name)      # An event brought newer news while we were waiting
+
+        return value
 
     async def _set_group(self):
         """ Send the new group details to HEOS.
@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+""" Retrieves the items of a source or container a page at a time, as they are needed """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Union
+
+from ..errors import ItemNotLoadedError
+
+logger = logging.getLogger('pytheos')
+
+
+class PagedItems:
+    """ The items of a source or container, retrieved a page at a time.  The first page tells us how many items there
+    are, and after that only the pages that are asked for are retrieved.  The most recently used pages are kept, and
+    when pages are asked for in order the ones after them are requested ahead of time. """
+
+    PAGE_SIZE = 50      # Items per page; HEOS returns no more than this per request
+    MAX_PAGES = 20      # Pages kept before the least recently used is let go of
+    READ_AHEAD = 2      # Pages requested ahead of time when pages are asked for in order
+
+    @property
+    def count(self) -> Optional[int]:
+        return self._count
+
+    @property
+    def resident_pages(self) -> int:
+        return len(self._pages)
+
+    @property
+    def loaded(self) -> bool:
+        # Every item has been retrieved and is still here
+        return self._count is not None and all(
+            page_number in self._pages for page_number in range(-(-self._count // self.page_size)))
+
+    def __init__(self, get_page: Callable[[tuple], Awaitable[tuple]], create_item: Callable[[Any], Any],
+                 page_size: int=PAGE_SIZE, max_pages: int=MAX_PAGES, read_ahead: int=READ_AHEAD):
+        """ Constructor
+
+        :param get_page: Callable that retrieves a (start, end) range and returns a (total count, list of items) tuple
+        :param create_item: Callable that converts each retrieved item into what is handed out (e.g. a controller)
+        :param page_size: Items per page
+        :param max_pages: Pages kept before the least recently used is let go of
+        :param read_ahead: Pages requested ahead of time when pages are asked for in order; zero disables it
+        """
+        self.page_size = page_size
+        self.max_pages = max(max_pages, 1)
+        self.read_ahead = read_ahead
+        self.pages_loaded: int = 0     # Pages retrieved, including those retrieved again after being let go of
+
+        self._get_page = get_page
+        self._create_item = create_item
+        self._count: Optional[int] = None
+        self._pages: OrderedDict = OrderedDict()    # Page number -> list of items, least recently used first
+        self._loading: dict = {}                    # Page number -> task retrieving it
+        self._last_page: Optional[int] = None
+        self._generation: int = 0
+        self._keep_all: bool = False                # Set by load_all(); pages aren't let go of until clear()
+
+    def __repr__(self):
+        return f'<PagedItems(count={self._count}, resident_pages={len(self._pages)})>'
+
+    def __len__(self):
+        if self._count is None:
+            raise ItemNotLoadedError('The number of items is not known until the first page has been retrieved')
+
+        return self._count
+
+    def __contains__(self, value) -> bool:
+        # Only the items that are here are looked at
+        return any(value is item or value == item for page in self._pages.values() for item in page)
+
+    def __getitem__(self, index: Union[int, slice]):
+        """ Retrieves items from the pages that have already been retrieved.
+
+        :param index: Index or slice
+        :raises: IndexError, ItemNotLoadedError
+        :return: Item or list of items
+        """
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+
+        index = self._normalize_index(index)
+        page = self._pages.get(index // self.page_size)
+        if page is None or index % self.page_size >= len(page):
+            raise ItemNotLoadedError(f'Item {index} has not been retrieved yet; use get(), "async for", or '
+                                     f'refresh(all_pages=True)')
+
+        return page[index % self.page_size]
+
+    async def __aiter__(self) -> AsyncIterator:
+        page_number = 0
+        while self._count is None or page_number * self.page_size < self._count:
+            page = await self.get_page(page_number)
+            if not page:
+                break
+
+            for item in page:
+                yield item
+
+            page_number += 1
+
+    async def get_count(self) -> int:
+        """ Retrieves the number of items, retrieving the first page if it hasn't been already.
+
+        :return: int
+        """
+        if self._count is None:
+            await self._load_page(0)
+
+        return self._count
+
+    async def get(self, index: Union[int, slice]):
+        """ Retrieves an item, or a list of items given a slice, retrieving only the pages that hold them.
+
+        :param index: Index or slice
+        :raises: IndexError
+        :return: Item or list of items
+        """
+        if isinstance(index, slice):
+            indices = range(*index.indices(await self.get_count()))
+            if not indices:
+                return []
+
+            first, last = sorted((indices[0] // self.page_size, indices[-1] // self.page_size))
+            sequential = self._last_page is not None and first == self._last_page + 1
+            self._last_page = last
+
+            # Use the pages as they come back; a slice over more than max_pages would let go of its own first pages
+            pages = dict(zip(range(first, last + 1), await asyncio.gather(
+                *[self._load_page(page_number) for page_number in range(first, last + 1)])))
+            if sequential:
+                self._read_ahead(last)
+
+            return [pages[idx // self.page_size][idx % self.page_size] for idx in indices]
+
+        await self.get_count()
+        index = self._normalize_index(index)
+
+        return (await self.get_page(index // self.page_size))[index % self.page_size]
+
+    async def get_page(self, page_number: int) -> list:
+        """ Retrieves a page of items, from memory if it is still there.  Asking for the page after the last one asked
+        for requests the following pages ahead of time.
+
+        :param page_number: Page number
+        :return: list of items
+        """
+        sequential = self._last_page is not None and page_number == self._last_page + 1
+        self._last_page = page_number
+
+        page = await self._load_page(page_number)
+        if sequential:
+            self._read_ahead(page_number)
+
+        return page
+
+    async def load_all(self):
+        """ Retrieves every page that isn't already here and keeps them all until the next clear().
+
+        :return: None
+        """
+        count = await self.get_count()
+        self._keep_all = True
+
+        await asyncio.gather(*[self._load_page(page_number) for page_number in range(-(-count // self.page_size))])
+
+    def _read_ahead(self, page_number: int):
+        """ Starts retrieving the pages after a page, unless they are already here or on their way.
+
+        :param page_number: Page number
+        :return: None
+        """
+        for ahead in range(page_number + 1, page_number + 1 + self.read_ahead):
+            if self._count is not None and ahead * self.page_size >= self._count:
+                break
+
+            if ahead not in self._pages and ahead not in self._loading:
+                self._start_loading(ahead).add_done_callback(self._read_ahead_done)
+
+    def clear(self):
+        """ Lets go of every page so that they are all retrieved again.
+
+        :return: None
+        """
+        self._generation += 1
+        self._count = None
+        self._pages.clear()
+        self._loading.clear()
+        self._last_page = None
+        self._keep_all = False
+
+    async def _load_page(self, page_number: int) -> list:
+        """ Retrieves a page from memory, from a request that is already under way, or from the HEOS system.
+
+        :param page_number: Page number
+        :return: list of items
+        """
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+
+        task = self._loading.get(page_number) or self._start_loading(page_number)
+
+        return await asyncio.shield(task)
+
+    def _start_loading(self, page_number: int) -> asyncio.Task:
+        """ Starts retrieving a page.
+
+        :param page_number: Page number
+        :return: Task retrieving the page
+        """
+        task = asyncio.get_running_loop().create_task(self._fetch_page(page_number, self._generation))
+        self._loading[page_number] = task
+
+        return task
+
+    async def _fetch_page(self, page_number: int, generation: int) -> list:
+        """ Retrieves a page from the HEOS system.  If fewer items come back than were asked for, the rest are asked
+        for again.
+
+        :param page_number: Page number
+        :param generation: Value of the generation counter when the request was made; pages retrieved before a
+                           clear() are not kept
+        :return: list of items
+        """
+        try:
+            start = page_number * self.page_size
+            end = start + self.page_size - 1
+
+            items = []
+            while True:
+                count, retrieved = await self._get_page((start + len(items), end))
+                items.extend(retrieved)
+                if not retrieved or len(items) >= self.page_size or start + len(items) >= count:
+                    break
+
+            page = [self._create_item(item) for item in items]
+            if generation == self._generation:
+                self._count = count
+                self._pages[page_number] = page
+                self.pages_loaded += 1
+                while not self._keep_all and len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+
+            return page
+        finally:
+            if generation == self._generation:
+                self._loading.pop(page_number, None)
+
+    @staticmethod
+    def _read_ahead_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f'Failed to read ahead: {task.exception()!r}')
+
+    def _normalize_index(self, index: int) -> int:
+        """ Converts a negative index into the matching positive one and checks that it is in range.
+
+        :param index: Index
+        :raises: IndexError
+        :return: int
+        """
+        count = len(self)
+        if index < 0:
+            index += count
+
+        if not 0 <= index < count:
+            raise IndexError('Index out of range')
+
+        return index
+
+
+class PagedSequence(Sequence):
+    """ Base for the controllers of sources and containers, whose items are held in a PagedItems.  Indexing, slicing,
+    len(), and iteration only look at pages that have already been retrieved - iterating before every item has been
+    retrieved raises an ItemNotLoadedError.  `in` only looks at the items that have been retrieved, and a source or
+    container is false until the number of items is known.  get_count(), get(), and async iteration retrieve the
+    pages they need, and refresh(all_pages=True) retrieves everything up front. """
+
+    _items: PagedItems
+    nocache: bool
+
+    def __getitem__(self, item):
+        return self._items[item]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items.count)
+
+    def __contains__(self, value) -> bool:
+        return value in self._items
+
+    def __iter__(self):
+        if not self._items.loaded:
+            raise ItemNotLoadedError('Not every item has been retrieved yet; use "async for" or '
+                                     'refresh(all_pages=True)')
+
+        return iter(self._items[:])
+
+    def __aiter__(self) -> AsyncIterator:
+        return self._items.__aiter__()
+
+    async def get_count(self) -> int:
+        """ Retrieves the number of items, retrieving the first page if it hasn't been already.
+
+        :return: int
+        """
+        return await self._items.get_count()
+
+    async def get(self, index: Union[int, slice]):
+        """ Retrieves an item, or a list of items given a slice, retrieving only the pages that hold them.
+
+        :param index: Index or slice
+        :raises: IndexError
+        :return: Item or list of items
+        """
+        return await self._items.get(index)
+
+    async def refresh(self, force: bool=False, all_pages: bool=False):
+        """ Retrieves the first page of items if it hasn't been already, this call is forced, or caching is disabled.
+        Any other pages are let go of and retrieved again when they are next needed.
+
+        :param force: Force refresh
+        :param all_pages: Also retrieve every other page and keep them all, so the items can be used like a list
+        :return: self
+        """
+        if self._items.count is None or self.nocache or force:
+            self._items.clear()
+            await self._items.get_count()
+
+        if all_pages:
+            await self._items.load_all()
+
+        return self
@@ -4,8 +4,9 @@
 from __future__ import annotations
 
 from .. import models, controllers
+from ..state import StateCache
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 if TYPE_CHECKING:
     from pytheos import Pytheos
 
@@ -53,18 +54,17 @@ class Player:
     def queue(self) -> controllers.Queue:
         return self._queue
 
+    @property
+    def state(self) -> StateCache:
+        return self._state
+
     def __init__(self, pytheos: 'Pytheos', player: models.Player):
         self._player = player
         self._pytheos = pytheos
 
-        self._mute: Optional[bool] = None
-        self._repeat: Optional[models.player.RepeatMode] = None
-        self._shuffle: Optional[models.player.ShuffleMode] = None
-        self._volume: Optional[int] = None
+        self._state = StateCache()   # Volume, mute, play state, etc. as last reported by the player
         self._quick_selects: Optional[dict] = None
-        self._play_state: Optional[models.player.PlayState] = None
         self._queue = controllers.Queue(pytheos, player)
-        self._now_playing: Optional[models.MediaItem] = None
 
     async def refresh(self, player_id=None):
         """ Retrieve and update the Player information used by this class.  Optionally, the ID already present on the
@@ -75,6 +75,18 @@ class Player:
         """
         self._player = await self._pytheos.api.player.get_player_info(player_id if player_id else self.id)
 
+    def _update(self, player: models.Player) -> bool:
+        """ Replaces the Player information used by this class with a newer copy.
+
+        :param player: Player information
+        :return: True if anything changed
+        """
+        if player == self._player:
+            return False
+
+        self._player = player
+        return True
+
     async def play_input(self, input_source: models.source.InputSource, source_player: Optional[models.Player]=None):
         """ Instructs the player to play the specified input source.  Optionally, this input source can live on another
         Player on the network, which can be specified with the source_player parameter.
@@ -158,12 +170,13 @@ class Player:
         """
         return await self._pytheos.api.player.check_update(self.id)
 
-    async def get_mute(self) -> bool:
+    async def get_mute(self, max_age: Optional[float]=None) -> bool:
         """ Determines if the player is muted
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: bool
         """
-        return await self._pytheos.api.player.get_mute(self.id)
+        return await self._get_state('mute', max_age, self._pytheos.api.player.get_mute)
 
     async def set_mute(self, value: bool):
         """ Sets the current mute status
@@ -172,49 +185,62 @@ class Player:
         :return: None
         """
         await self._pytheos.api.player.set_mute(self.id, value)
+        self._state.set('mute', value)
 
-    async def get_repeat(self) -> models.player.RepeatMode:
+    async def get_repeat(self, max_age: Optional[float]=None) -> models.player.RepeatMode:
         """ Retrieves the current repeat mode setting
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: Repeat mode
         """
-        repeat, _ = await self.get_play_mode()
+        repeat, _ = await self.get_play_mode(max_age)
         return repeat
 
     async def set_repeat(self, value: models.player.RepeatMode):
-        """ Sets the current repeat mode setting
+        """ Sets the current repeat mode setting.  The shuffle mode is sent along unchanged, so it is only requested
+        from the player if it is not already known.
 
         :param value: New repeat mode value
         :return: None
         """
         _, shuffle = await self.get_play_mode()
-        await self._pytheos.api.player.set_play_mode(self.id, models.player.PlayMode(repeat=value, shuffle=shuffle))
-        self._repeat = value
+        await self._set_play_mode(models.player.PlayMode(repeat=value, shuffle=shuffle))
 
-    async def get_shuffle(self) -> models.player.ShuffleMode:
+    async def get_shuffle(self, max_age: Optional[float]=None) -> models.player.ShuffleMode:
         """ Gets the current shuffle mode setting
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: Shuffle mode
         """
-        _, shuffle = await self.get_play_mode()
+        _, shuffle = await self.get_play_mode(max_age)
         return shuffle
 
     async def set_shuffle(self, value: models.player.ShuffleMode):
-        """ Sets the current shuffle mode setting
+        """ Sets the current shuffle mode setting.  The repeat mode is sent along unchanged, so it is only requested
+        from the player if it is not already known.
 
         :param value: New shuffle mode value
         :return: None
         """
         repeat, _ = await self.get_play_mode()
-        await self._pytheos.api.player.set_play_mode(self.id, models.player.PlayMode(repeat=repeat, shuffle=value))
-        self._shuffle = value
+        await self._set_play_mode(models.player.PlayMode(repeat=repeat, shuffle=value))
 
-    async def is_playing(self) -> bool:
+    async def _set_play_mode(self, play_mode: models.player.PlayMode):
+        """ Sets the repeat and shuffle modes and remembers them.
+
+        :param play_mode: New play mode
+        :return: None
+        """
+        await self._pytheos.api.player.set_play_mode(self.id, play_mode)
+        self._state.set('play_mode', play_mode)
+
+    async def is_playing(self, max_age: Optional[float]=None) -> bool:
         """ Retrieves the current playing status
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: bool
         """
-        play_state = await self.get_play_state()
+        play_state = await self.get_play_state(max_age)
         return play_state == models.player.PlayState.Playing
 
     async def set_playing(self, value: bool):
@@ -223,14 +249,15 @@ class Player:
         :param value: New value
         :return: None
         """
-        await self._pytheos.api.player.set_play_state(self.id, models.player.PlayState.Playing if value else models.player.PlayState.Stopped)
+        await self._set_play_state(models.player.PlayState.Playing if value else models.player.PlayState.Stopped)
 
-    async def get_paused(self) -> bool:
+    async def get_paused(self, max_age: Optional[float]=None) -> bool:
         """ Retrieves the current paused status
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: bool
         """
-        play_state = await self.get_play_state()
+        play_state = await self.get_play_state(max_age)
         return play_state == models.player.PlayState.Paused
 
     async def set_paused(self, value: bool):
@@ -239,14 +266,15 @@ class Player:
         :param value: New value
         :return: None
         """
-        await self._pytheos.api.player.set_play_state(self.id, models.player.PlayState.Paused if value else models.player.PlayState.Playing)
+        await self._set_play_state(models.player.PlayState.Paused if value else models.player.PlayState.Playing)
 
-    async def get_stopped(self) -> bool:
+    async def get_stopped(self, max_age: Optional[float]=None) -> bool:
         """ Gets the current stopped status
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: bool
         """
-        play_state = await self.get_play_state()
+        play_state = await self.get_play_state(max_age)
         return play_state == models.player.PlayState.Stopped
 
     async def set_stopped(self, value: bool):
@@ -255,14 +283,24 @@ class Player:
         :param value: New value
         :return: None
         """
-        await self._pytheos.api.player.set_play_state(self.id, models.player.PlayState.Stopped if value else models.player.PlayState.Playing)
+        await self._set_play_state(models.player.PlayState.Stopped if value else models.player.PlayState.Playing)
+
+    async def _set_play_state(self, play_state: models.player.PlayState):
+        """ Sets the play state and remembers it.
+
+        :param play_state: New play state
+        :return: None
+        """
+        await self._pytheos.api.player.set_play_state(self.id, play_state)
+        self._state.set('play_state', play_state)
 
-    async def get_volume(self) -> int:
+    async def get_volume(self, max_age: Optional[float]=None) -> int:
         """ Retrieves the current volume value
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: int
         """
-        return await self._pytheos.api.player.get_volume(self.id)
+        return await self._get_state('volume', max_age, self._pytheos.api.player.get_volume)
 
     async def set_volume(self, value: int):
         """ Sets the volume value.  The value is constrained to the player's minimum and maximum.
@@ -276,20 +314,24 @@ class Player:
             value = self._pytheos.api.player.VOLUME_MAX
 
         await self._pytheos.api.player.set_volume(self.id, value)
+        self._state.set('volume', value)
 
-    async def get_now_playing(self) -> models.MediaItem:     # FIXME: Maybe want to abstract MediaItem out
+    # FIXME: Maybe want to abstract MediaItem out
+    async def get_now_playing(self, max_age: Optional[float]=None) -> models.MediaItem:
         """ Retrieves the currently playing media
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: Current media item
         """
-        return await self._pytheos.api.player.get_now_playing_media(self.id)
+        return await self._get_state('now_playing', max_age, self._pytheos.api.player.get_now_playing_media)
 
-    async def get_play_state(self) -> models.player.PlayState:
+    async def get_play_state(self, max_age: Optional[float]=None) -> models.player.PlayState:
         """ Retrieves the current play state
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: Current play state
         """
-        return await self._pytheos.api.player.get_play_state(self.id)
+        return await self._get_state('play_state', max_age, self._pytheos.api.player.get_play_state)
 
     async def get_quick_selects(self) -> dict:
         """ Retrieves a dictionary of all quick select entries
@@ -298,13 +340,40 @@ class Player:
         """
         return {qs.id: qs for qs in await self._pytheos.api.player.get_quickselects(self.id)}
 
-    async def get_play_mode(self) -> tuple:
+    async def get_play_mode(self, max_age: Optional[float]=None) -> tuple:
         """ Retries and returns the current play mode, which includes the Repeat & Shuffle status.
 
+        :param max_age: Largest age (seconds) of a remembered value to accept; see _get_state()
         :return: tuple
         """
-        state = await self._pytheos.api.player.get_play_mode(self.id)
+        state = await self._get_state('play_mode', max_age, self._pytheos.api.player.get_play_mode)
         return state.repeat, state.shuffle
 
+    async def _get_state(self, name: str, max_age: Optional[float], fetch: Callable[[int], Awaitable]):
+        """ Answers a question about the player's state from memory if we can, and asks the player otherwise.
+
+        While change events are being received, remembered values are kept up to date by them and are returned no
+        matter how old they are, unless max_age says otherwise.  Without change events nothing keeps them up to date,
+        so they are only returned if max_age allows it.  An answer from the player isn't remembered if a change event
+        updated the value while the request was under way, since the event is the more recent of the two.
+
+        :param name: State value name (e.g. volume)
+        :param max_age: Largest age (seconds) of a remembered value to accept, zero to always ask the player, or None
+                        to accept any age while change events are being received
+        :param fetch: API call that retrieves the value given the player ID
+        :return: The value
+        """
+        if max_age is None and not self._pytheos.tracking_state:
+            max_age = 0
+
+        value = self._state.get(name, max_age)
+        if value is None:
+            version = self._state.version
+            value = await fetch(self.id)
+            if not self._state.set(name, value, since=version) and name in self._state:
+                value = self._state.peek(name)      # An event brought newer news while we were waiting
+
+        return value
+
     async def get_group(self) -> controllers.Group:
         return await self._pytheos.get_group(self._player.group_id)
@@ -1,17 +1,16 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
-from collections.abc import Sequence
-
 from .containers import create_media_leaf, MediaContainer
+from .paging import PagedItems, PagedSequence
 from .. import models
 
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 if TYPE_CHECKING:
     from pytheos import Pytheos
 
 
-class Source(Sequence):
+class Source(PagedSequence):
     @property
     def id(self):
         return self._source.source_id
@@ -60,13 +59,10 @@ class Source(Sequence):
         self._parent = parent
 
         self._nocache = False
-        self._items = None
-
-    def __getitem__(self, item):
-        return self._items[item]
-
-    def __len__(self):
-        return len(self._items)
+        self._items = PagedItems(
+            lambda item_range: pytheos.api.browse.browse_page(self.id, None, item_range, not self.nocache),
+            lambda item: create_media_leaf(item, self, self._pytheos))
+        self._search_criteria: Optional[list] = None
 
     def __str__(self):
         return self.name
@@ -74,6 +70,18 @@ class Source(Sequence):
     def __repr__(self):
         return f"<SourceController(id={self.id}, name={self.name})>"
 
+    def _update(self, source: models.Source) -> bool:
+        """ Replaces the Source information used by this class with a newer copy.  Browsed items are kept.
+
+        :param source: Source information
+        :return: True if anything changed
+        """
+        if source == self._source:
+            return False
+
+        self._source = source
+        return True
+
     async def retrieve_metadata(self):
         """ Retrieves a list of metadata for the specified source.  Only supported on some sources.
 
@@ -81,14 +89,13 @@ class Source(Sequence):
         """
         await self._pytheos.api.browse.retrieve_metadata()
 
-    async def refresh(self, force: bool=False):
-        """ Refreshes the container if it is uninitialized, this call is forced, or if caching is disabled.
+    async def get_search_criteria(self, refresh: bool=False) -> list:
+        """ Retrieves the search criteria supported by this source.  They are cached after the first request.
 
-        :param force: Force refresh
-        :return: None
+        :param refresh: Request the search criteria from the system again
+        :return: list of SearchCriteria
         """
-        if self._items is None or self.nocache or force:
-            items = await self._pytheos.api.browse.browse_source(self.id)
-            self._items = [create_media_leaf(item, self, self._pytheos) for item in items]
+        if self._search_criteria is None or self.nocache or refresh:
+            self._search_criteria = await self._pytheos.api.browse.get_search_criteria(self.id)
 
-        return self._items
+        return self._search_criteria
@@ -5,3 +5,8 @@
 class PytheosError(Exception):
     """ Base Pytheos error class """
     pass
+
+
+class ItemNotLoadedError(PytheosError, LookupError):
+    """ Raised when an item of a source or container is accessed synchronously before it has been retrieved """
+    pass
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+""" Keeps a warm standby connection to a second HEOS device and switches commands over to it """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, Iterable, Optional, Union
+
+from .api import BrowseAPI, GroupAPI, PlayerAPI, SystemAPI
+from .errors import PytheosError
+from .models.heos import HEOSResult, ResponseShape
+from .networking.admission import is_idempotent
+from .networking.errors import ChannelUnavailableError, CommandFailedError, CommandTimeoutError
+from .networking.selection import connect_fastest, normalize_candidates
+from .stats import FailoverStats
+
+logger = logging.getLogger('pytheos')
+
+NOT_REPLAYED = (
+    'system/heart_beat',    # A heartbeat checks the speaker it was sent to; answering it elsewhere would hide the loss
+)
+
+
+class FailoverChannel:
+    """ Command channel that sends commands to an active channel while keeping a second, already connected, standby
+    channel to another speaker.  When the active speaker is lost the standby is promoted in its place, and idempotent
+    commands that were in flight on the lost speaker are sent again on the new one.  Other commands fail as they
+    would have without failover, since they may already have been carried out.
+
+    A speaker that is unplugged or drops off the network usually goes quiet rather than closing the connection, so
+    when an idempotent command times out the speaker is sent a heartbeat straight away.  If that goes unanswered too
+    the active channel is closed, which has it replaced just as if the connection had been lost. """
+
+    SWITCH_TIMEOUT = 2      # Seconds an interrupted command waits for the switch to the standby before giving up
+    CONNECT_TIMEOUT = 5     # Seconds to wait on a connection to a standby candidate
+    PROBE_TIMEOUT = 1       # Seconds to wait on the heartbeat sent after a command times out
+
+    @property
+    def connected(self) -> bool:
+        return self.active.connected
+
+    @property
+    def outstanding(self) -> int:
+        return self.active.outstanding
+
+    @property
+    def server(self) -> Optional[str]:
+        return self.active.server
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.active.port
+
+    @property
+    def standby_ready(self) -> bool:
+        return self.standby is not None and self.standby.connected
+
+    def __init__(self, factory: Callable):
+        """ Constructor
+
+        :param factory: Callable that creates the channel to each speaker (e.g. a Connection)
+        """
+        self.active = factory()
+        self.standby = None
+        self.candidates: list = []      # (host, port) tuples of speakers that may serve as the standby
+        self.stats = FailoverStats()
+
+        self.system = SystemAPI(self)
+        self.player = PlayerAPI(self)
+        self.group = GroupAPI(self)
+        self.browse = BrowseAPI(self)
+
+        self._factory = factory
+        self._switched: Optional[asyncio.Future] = None
+        self._probe: Optional[asyncio.Task] = None      # Heartbeat checking whether the active speaker still answers
+
+    def __repr__(self):
+        return f'<FailoverChannel(active={self.active!r}, standby={self.standby!r})>'
+
+    async def connect(self, server: str, port: int):
+        """ Connects the active channel.
+
+        :param server: Server hostname or IP
+        :param port: Port number
+        :return: None
+        """
+        await self.active.connect(server, port)
+
+    def adopt(self, channel):
+        """ Replaces the active channel with one that is already connected.
+
+        :param channel: Connected channel
+        :return: None
+        """
+        self.active.close()
+        self.active = channel
+
+    def close(self):
+        """ Closes the active and standby channels.
+
+        :return: None
+        """
+        self.active.close()
+        if self.standby:
+            self.standby.close()
+            self.standby = None
+
+    async def wait_closed(self):
+        """ Waits for the active channel to be lost or closed.
+
+        :return: None
+        """
+        await self.active.wait_closed()
+
+    async def call(self, group: str, command: str, **kwargs: dict) -> HEOSResult:
+        """ Sends a command on the active channel and waits for the response.  See Connection.call().  If the active
+        speaker is lost while an idempotent command is in flight (or the command times out and the speaker doesn't
+        answer a heartbeat either) and a standby is ready, the command is sent again once the standby has taken over.
+
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param kwargs: Any parameters that should be sent along with the command
+        :raises: AssertionError, ChannelUnavailableError, CommandFailedError, CommandTimeoutError
+        :return: HEOSResult
+        """
+        while True:
+            channel = self.active
+            try:
+                return await channel.call(group, command, **kwargs)
+            except (ChannelUnavailableError, CommandTimeoutError, OSError) as ex:
+                if not is_idempotent(f'{group}/{command}') or f'{group}/{command}' in NOT_REPLAYED:
+                    raise
+
+                if channel is self.active:
+                    if not self.standby_ready:
+                        raise
+
+                    if isinstance(ex, CommandTimeoutError) and await self._still_answering(channel):
+                        raise   # Only this command was slow
+
+                    try:
+                        await asyncio.wait_for(asyncio.shield(self._switch_waiter()), self.SWITCH_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        raise ChannelUnavailableError() from None
+
+                self.stats.replayed += 1
+                logger.debug(f'Replaying {group}/{command} on {self.active.server}:{self.active.port}')
+
+    def promote(self):
+        """ Makes the standby channel the active one and closes the old active channel.
+
+        :raises: ChannelUnavailableError
+        :return: None
+        """
+        if not self.standby_ready:
+            raise ChannelUnavailableError('No standby channel is ready')
+
+        previous, self.active, self.standby = self.active, self.standby, None
+        previous.close()
+        self.stats.failovers += 1
+        logger.info(f'Failed over from {previous.server}:{previous.port} to {self.active.server}:{self.active.port}')
+
+        if self._switched is not None and not self._switched.done():
+            self._switched.set_result(None)
+        self._switched = None
+
+    def add_candidates(self, candidates: Iterable[Union[str, tuple]], port: int):
+        """ Adds speakers that may serve as the standby.
+
+        :param candidates: Hostnames or IPs, (host, port) tuples, or SSDPResponses
+        :param port: Port number used for candidates given without one
+        :return: None
+        """
+        for candidate in normalize_candidates(candidates, port):
+            if candidate not in self.candidates:
+                self.candidates.append(candidate)
+
+    async def ensure_standby(self) -> bool:
+        """ Connects a standby channel to whichever candidate speaker, other than the active one, answers first.
+
+        :return: True if a standby is ready
+        """
+        if self.standby_ready:
+            return True
+
+        if self.standby:
+            self.standby.close()
+            self.standby = None
+
+        candidates = [candidate for candidate in self.candidates
+                      if candidate != (self.active.server, self.active.port)]
+        if not candidates:
+            return False
+
+        try:
+            self.standby, *_ = await connect_fastest(candidates, self.active.port, self._factory,
+                                                     self.CONNECT_TIMEOUT)
+        except ChannelUnavailableError:
+            logger.debug('No standby speaker answered')
+            return False
+
+        self.stats.standby_connects += 1
+        logger.debug(f'Standby connected to {self.standby.server}:{self.standby.port}')
+
+        return True
+
+    async def check_standby(self, timeout: float) -> bool:
+        """ Sends a heartbeat on the standby channel to keep it warm, replacing it if it no longer answers.
+
+        :param timeout: Seconds to wait on the heartbeat
+        :return: True if a standby is ready
+        """
+        if self.standby_ready:
+            try:
+                await self.standby.call('system', 'heart_beat', shape=ResponseShape.Header, timeout=timeout)
+                return True
+            except CommandFailedError:
+                return True     # It answered
+            except (PytheosError, OSError) as ex:
+                logger.warning(f'Standby heartbeat failed: {ex!r}')
+
+        return await self.ensure_standby()
+
+    async def _still_answering(self, channel) -> bool:
+        """ Checks whether the speaker behind a channel still answers after a command timed out.  Commands that time
+        out together share a single heartbeat.
+
+        :param channel: Channel the command timed out on
+        :return: True if the speaker answered
+        """
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.get_running_loop().create_task(self._send_probe(channel))
+
+        return await asyncio.shield(self._probe)
+
+    async def _send_probe(self, channel) -> bool:
+        """ Sends a heartbeat to the speaker behind a channel and closes the channel if it goes unanswered.
+
+        :param channel: Channel to check
+        :return: True if the speaker answered
+        """
+        try:
+            await channel.call('system', 'heart_beat', shape=ResponseShape.Header, timeout=self.PROBE_TIMEOUT)
+        except CommandFailedError:
+            pass    # It answered
+        except (PytheosError, OSError) as ex:
+            logger.warning(f'{channel.server}:{channel.port} stopped answering: {ex!r}')
+            channel.close()
+            return False
+
+        return True
+
+    def _switch_waiter(self) -> asyncio.Future:
+        """ Retrieves a future that completes when the standby is promoted.
+
+        :return: asyncio.Future
+        """
+        if self._switched is None:
+            self._switched = asyncio.get_running_loop().create_future()
+
+        return self._switched
@@ -53,6 +53,19 @@ class SearchCriteria:
             self.playable = bool(from_dict.get('playable', False))
             self.container_id = from_dict.get('cid')
 
+    def to_dict(self) -> dict:
+        """ Converts the search criteria back into the dictionary format used by HEOS.
+
+        :return: dict
+        """
+        return {
+            'name': self.name,
+            'scid': self.search_criteria_id,
+            'wildcard': self.wildcard,
+            'playable': self.playable,
+            'cid': self.container_id,
+        }
+
 
 @dataclass
 class AlbumMetadata:
@@ -26,6 +26,13 @@ class Group:
 
             self.players = [GroupPlayer(gp) for gp in from_dict.get('players', [])]
 
+    def to_dict(self) -> dict:
+        """ Converts the group back into the dictionary format used by HEOS.
+
+        :return: dict
+        """
+        return {'name': self.name, 'gid': self.group_id, 'players': [player.to_dict() for player in self.players]}
+
 
 @dataclass
 class GroupPlayer:
@@ -38,3 +45,10 @@ class GroupPlayer:
             self.name = from_dict.get('name')
             self.player_id = from_dict.get('pid')
             self.role = GroupRole(from_dict.get('role'))
+
+    def to_dict(self) -> dict:
+        """ Converts the group member back into the dictionary format used by HEOS.
+
+        :return: dict
+        """
+        return {'name': self.name, 'pid': self.player_id, 'role': str(self.role)}
@@ -2,11 +2,25 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Optional, Union
+from enum import Enum
+from typing import TYPE_CHECKING, Optional, Union
 
 from pytheos import utils
 
+if TYPE_CHECKING:
+    from pytheos.networking.codec import JSONCodec
+
+
+class ResponseShape(Enum):
+    """ Describes how much of a response the caller of a command needs """
+    Full = 'full'       # The 'heos' block and the payload
+    Header = 'header'   # Only the 'heos' block - e.g. the result and the variables in the message
+
+    def __str__(self):
+        return self.value
+
 
 @dataclass
 class HEOSEvent:
@@ -15,21 +29,47 @@ class HEOSEvent:
     vars: dict
     command: Optional[str] = None
     message: Optional[str] = None
-    raw: Optional[str] = None
 
-    def __init__(self, from_dict: dict=None):
+    @property
+    def raw(self) -> Optional[str]:
+        """ The original message as a JSON string.  Only encoded when it is first asked for. """
+        if self._raw is None and self._source is not None:
+            if self._codec is not None:
+                self._raw = self._codec.dumps(dict(self._source)).decode('utf-8')
+            else:
+                self._raw = json.dumps(dict(self._source))
+
+        return self._raw
+
+    def __init__(self, from_dict: dict=None, codec: Optional[JSONCodec]=None):
+        """ Constructor
+
+        :param from_dict: Decoded event message
+        :param codec: Codec used to encode the raw message when it is asked for, or None to use the json module
+        """
+        self.vars = {}
+        self._source = from_dict
+        self._codec = codec
+        self._raw = None
+
         if from_dict:
             heos = from_dict.get('heos', {})
 
             self.command = heos.get('command')
             self.message = heos.get('message')
-            self.raw = json.dumps(from_dict)
 
             # Bind any message variables to our self as attributes
-            self.vars = {}
             if self.message:
                 self.vars = utils.parse_var_string(self.message)
 
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        # The raw message is compared in its decoded form, so the codec it is encoded with doesn't matter
+        return (self.vars, self.command, self.message, self._source) == \
+            (other.vars, other.command, other.message, other._source)
+
     def __str__(self):
         return self.raw
 
@@ -44,14 +84,20 @@ class HEOSHeader:
     result: Optional[str] = None      # 'success' or 'fail'
     message: Optional[str] = None     # URL-ish parameter string with additional details
 
+    @property
+    def vars(self) -> dict:
+        """ Variables from the message string, extracted for ease-of-access the first time they are needed """
+        if self._vars is None:
+            self._vars = utils.parse_var_string(self.message) if self.message else {}
+
+        return self._vars
+
     def __init__(self, from_dict=None):
         self.command = from_dict.get('command')
         self.result = from_dict.get('result')
         self.message = from_dict.get('message')
 
-        self.vars = {}
-        if self.message:    # Extract variables from the message string for ease-of-access
-            self.vars = utils.parse_var_string(self.message)
+        self._vars: Optional[dict] = None
 
     def __repr__(self):
         return f'<HEOSHeader(command={self.command}, result={self.result}, message={self.message})>'
@@ -77,21 +123,17 @@ class HEOSListPayloadIterator(object):
 
     def __init__(self, payload):
         self._payload = payload
-        self._current_index = 0
+        self._iterator = iter(payload.data) if payload.data else iter(())
 
     def __next__(self):
-        if not self._payload.data or self._current_index >= len(self._payload.data):
-            raise StopIteration()
-
-        result = self._payload.data[self._current_index]
-        self._current_index += 1
-        return result
+        return next(self._iterator)
 
 
 class HEOSListPayload(HEOSPayload):
-    """ Represents a list that is returned from some HEOS command execution """
+    """ Represents a list that is returned from some HEOS command execution.  Large lists may be backed by a lazily
+    decoded iterable rather than a list. """
 
-    data: list
+    data: Iterable
 
     def __iter__(self):
         return HEOSListPayloadIterator(self)
@@ -123,6 +165,8 @@ class HEOSResult(object):
             payload = HEOSDictPayload(payload_data)
         elif isinstance(payload_data, list):
             payload = HEOSListPayload(payload_data)
+        elif isinstance(payload_data, Iterable) and not isinstance(payload_data, (str, bytes)):
+            payload = HEOSListPayload(payload_data)     # Lazily decoded list
         else:
             payload = HEOSPayload(payload_data)
 
@@ -132,7 +176,12 @@ class HEOSResult(object):
     def succeeded(self) -> bool:
         return self.header.result and self.header.result.lower() == 'success'
 
-    def __init__(self, from_dict=None):
+    def __init__(self, from_dict=None, shape: ResponseShape=ResponseShape.Full):
+        """ Constructor
+
+        :param from_dict: Decoded response
+        :param shape: How much of the response to build - the payload is skipped entirely for header-only responses
+        """
         self.header = None
         self.payload = None
         if from_dict:
@@ -141,7 +190,8 @@ class HEOSResult(object):
                 raise ValueError('No "heos" block found in response.')
 
             self.header = HEOSHeader(heos)
-            self.payload = HEOSResult.create_payload(from_dict.get('payload'))
+            if shape == ResponseShape.Full:
+                self.payload = HEOSResult.create_payload(from_dict.get('payload'))
 
     def __repr__(self):
         return f'<HEOSResult(command={self.header!r})>'
@@ -119,3 +119,21 @@ class Player:
                 control = Control(int(control))
             self.control = control
 
+    def to_dict(self) -> dict:
+        """ Converts the player back into the dictionary format used by HEOS.
+
+        :return: dict
+        """
+        return {
+            'name': self.name,
+            'pid': self.player_id,
+            'gid': self.group_id,
+            'model': self.model,
+            'version': self.version,
+            'network': str(self.network),
+            'ip': self.ip,
+            'lineout': self.lineout.value,
+            'control': self.control.value if self.control is not None else None,
+            'serial': self.serial,
+        }
+
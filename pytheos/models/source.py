@@ -108,7 +108,7 @@ class Source:
             self.type = SourceType(from_dict.get('type'))
             self.available = from_dict.get('available')
             self.playable = from_dict.get('playable')
-            self.container = bool(from_dict.get('container'))
+            self.container = from_dict.get('container') in ('yes', True)
             self.source_id = from_dict.get('sid')
             self.container_id = from_dict.get('cid')
             self.media_id = from_dict.get('mid')
@@ -123,3 +123,24 @@ class Source:
 
         if not self.container_id:
             self.container_id = parent_container_id
+
+    def to_dict(self) -> dict:
+        """ Converts the source back into the dictionary format used by HEOS.
+
+        :return: dict
+        """
+        return {
+            'name': self.name,
+            'type': str(self.type),
+            'available': self.available,
+            'playable': self.playable,
+            'container': self.container,
+            'sid': self.source_id,
+            'cid': self.container_id,
+            'mid': self.media_id,
+            'image_url': self.image_url,
+            'service_username': self.service_username,
+            'album': self.album,
+            'album_id': self.album_id,
+            'artist': self.artist,
+        }
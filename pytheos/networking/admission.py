@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+""" Provides client-side admission control for commands sent to a HEOS device """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from ..networking.errors import CommandFailedError, HEOSErrorCode
+from ..networking.priority import CommandPriority
+from ..stats import AdmissionStats, LatencyCounter
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_PREFIXES = ('get_', 'check_', 'set_')
+IDEMPOTENT_COMMANDS = (
+    'system/heart_beat',
+    'system/register_for_change_events',
+    'system/prettify_json_response',
+    'browse/browse',
+    'browse/search',
+    'browse/retrieve_metadata',
+)
+NON_IDEMPOTENT_COMMANDS = (
+    'browse/set_service_option',    # Options include things like adding a station to favorites
+)
+
+
+def is_idempotent(command: str) -> bool:
+    """ Determines whether or not a command can safely be sent more than once.
+
+    :param command: Command (e.g. player/get_volume)
+    :return: bool
+    """
+    if command in NON_IDEMPOTENT_COMMANDS:
+        return False
+
+    return command in IDEMPOTENT_COMMANDS or command.partition('/')[2].startswith(IDEMPOTENT_PREFIXES)
+
+
+class AdmissionController:
+    """ Limits the number of commands in flight on a connection and learns the limit the device can sustain using
+    additive-increase/multiplicative-decrease.  Every command answered promptly raises the limit by 1/limit (roughly
+    one per round trip); a CommandQueueFull or ProcessingPreviousCommand error, or a response much slower than is usual
+    for its command, halves it - at most once per window of commands.  What is usual is learned separately for each
+    command, since a browse of a large container takes far longer than a volume change even on an idle device, and
+    drifts upwards when a command keeps taking longer so that one unusually fast response isn't the yardstick forever.
+
+    Commands over the limit wait locally for a slot.  Waiting commands are handed slots by priority, oldest first
+    within a priority, and a waiting command is treated as one priority higher for every AGING_INTERVAL seconds it has
+    waited so that background work is never starved.  Background commands only ever occupy a few slots, and
+    interactive commands may use a slot beyond the limit, so an interactive command never waits behind more than a
+    handful of bulk commands that were already sent. """
+
+    INITIAL_LIMIT = 8
+    MIN_LIMIT = 1
+    MAX_LIMIT = 64
+    DECREASE_FACTOR = 0.5
+    LATENCY_TOLERANCE = 4       # Responses this many times slower than usual for the command are treated as congestion
+    LATENCY_FLOOR = 0.25        # ... as long as they also took longer than this many seconds
+    BASELINE_DECAY = 0.05       # Fraction of the way the usual latency moves towards each slower response
+    MAX_RETRIES = 3
+    RETRY_DELAY = 0.05          # Seconds before the first retry of a rejected command; doubles with each retry
+    CONGESTION_ERRORS = (HEOSErrorCode.CommandQueueFull, HEOSErrorCode.ProcessingPreviousCommand)
+    AGING_INTERVAL = 1.0        # Seconds of waiting that are worth one priority level
+    INTERACTIVE_RESERVE = 1     # Extra slots available only to interactive commands
+    BACKGROUND_LIMIT = 4        # Most background commands in flight at once - enough to keep the device busy
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def __init__(self, initial_limit: float=INITIAL_LIMIT, min_limit: float=MIN_LIMIT, max_limit: float=MAX_LIMIT):
+        """ Constructor
+
+        :param initial_limit: Number of commands allowed in flight before anything has been learned
+        :param min_limit: Smallest limit
+        :param max_limit: Largest limit
+        """
+        self.limit: float = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.baseline_latencies: dict = {}     # Command -> usual seconds from sending it to its response
+        self.stats = AdmissionStats()
+
+        self._in_flight: int = 0
+        self._waiters: dict = {priority: deque() for priority in CommandPriority}   # Deques of (future, queued at)
+        self._tickets: int = 0                  # Sequence number handed to each admitted command
+        self._decreased_at_ticket: int = 0      # Commands admitted before this were in flight at the last decrease
+
+    def __repr__(self):
+        return f'<AdmissionController(limit={self.limit:.2f}, in_flight={self._in_flight}, queued={self.queued})>'
+
+    async def acquire(self, priority: CommandPriority=CommandPriority.Normal) -> int:
+        """ Waits for a slot to send a command in.
+
+        :param priority: Priority of the command
+        :return: Ticket to pass to release()
+        """
+        started = time.monotonic()
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, started)
+        self._waiters[priority].append(entry)
+        self._wake()
+
+        if not waiter.done():
+            self.stats.queued += 1
+            self.stats.max_queued = max(self.stats.max_queued, self.queued)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._in_flight -= 1    # We were handed a slot just as we were cancelled; pass it on
+                    self._wake()
+                else:
+                    self._waiters[priority].remove(entry)
+                raise
+
+        waited = time.monotonic() - started
+        self.stats.queue_latency.add(waited)
+        self.stats.priority_latency.setdefault(str(priority), LatencyCounter()).add(waited)
+        self.stats.admitted += 1
+        self._tickets += 1
+
+        return self._tickets
+
+    def release(self, ticket: int, latency: float, congested: bool=False, delayed: bool=False,
+                command: Optional[str]=None):
+        """ Frees the slot used by a command and adjusts the limit based on how it went.
+
+        :param ticket: Ticket returned by acquire()
+        :param latency: Seconds from sending the command to receiving its response
+        :param congested: Whether or not the device rejected the command because it was busy
+        :param delayed: Whether or not the device reported the command as still being processed
+        :param command: Command (e.g. player/get_volume) the latency is compared against
+        :return: None
+        """
+        self._in_flight -= 1
+
+        if congested:
+            self.stats.rejected += 1
+            self._decrease(ticket)
+        elif not delayed:   # Slow commands (e.g. streaming service browses) say nothing about the device's queue
+            baseline = self.baseline_latencies.get(command)
+            if baseline is None or latency < baseline:
+                self.baseline_latencies[command] = latency
+            else:
+                self.baseline_latencies[command] = baseline + (latency - baseline) * self.BASELINE_DECAY
+
+            if baseline is not None and latency > max(baseline * self.LATENCY_TOLERANCE, self.LATENCY_FLOOR):
+                self._decrease(ticket)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+
+        self._wake()
+
+    def should_retry(self, command: str, error: CommandFailedError, retries: int) -> bool:
+        """ Determines whether or not a failed command should be sent again.
+
+        :param command: Command (e.g. player/get_volume)
+        :param error: Error the command failed with
+        :param retries: Number of times the command has already been retried
+        :return: bool
+        """
+        return error.error_code in self.CONGESTION_ERRORS and retries < self.MAX_RETRIES and is_idempotent(command)
+
+    def retry_delay(self, retries: int) -> float:
+        """ Retrieves the time to wait before retrying a rejected command.
+
+        :param retries: Number of times the command has already been retried
+        :return: Delay in seconds
+        """
+        self.stats.retried += 1
+        return self.RETRY_DELAY * 2 ** retries
+
+    def _decrease(self, ticket: int):
+        """ Cuts the limit, unless it was already cut while this command was in flight.
+
+        :param ticket: Ticket of the command that signalled congestion
+        :return: None
+        """
+        if ticket <= self._decreased_at_ticket:
+            return
+
+        self.limit = max(self.limit * self.DECREASE_FACTOR, self.min_limit)
+        self._decreased_at_ticket = self._tickets
+        self.stats.decreases += 1
+        logger.debug(f'Congestion detected; command limit is now {self.limit:.2f}')
+
+    def _capacity(self, priority: CommandPriority) -> int:
+        """ Retrieves the number of commands that may be in flight when a command of the given priority is sent.
+
+        :param priority: Priority
+        :return: int
+        """
+        if priority == CommandPriority.Interactive:
+            return int(self.limit) + self.INTERACTIVE_RESERVE
+
+        if priority == CommandPriority.Background:
+            return min(int(self.limit), self.BACKGROUND_LIMIT)
+
+        return int(self.limit)
+
+    def _wake(self):
+        """ Hands free slots to waiting commands - highest aged priority first.
+
+        :return: None
+        """
+        while True:
+            now = time.monotonic()
+            candidates = [
+                (priority - (now - waiters[0][1]) / self.AGING_INTERVAL, priority)
+                for priority, waiters in self._waiters.items() if waiters and self._in_flight < self._capacity(priority)
+            ]
+            if not candidates:
+                return
+
+            _, priority = min(candidates)
+            waiter, _ = self._waiters[priority].popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
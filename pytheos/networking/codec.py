@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+""" Provides the JSON codecs used to decode messages from HEOS """
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec:
+    """ Standard library JSON codec.  Also serves as the base class for the other codecs. """
+
+    name = 'json'
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def loads(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        """ Decodes a UTF-8 encoded JSON document.
+
+        :param data: Raw JSON
+        :return: Decoded object
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """ Encodes an object as UTF-8 encoded JSON.
+
+        :param obj: Object to encode
+        :return: bytes
+        """
+        return json.dumps(obj).encode('utf-8')
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}(name={self.name})>'
+
+
+class OrjsonCodec(JSONCodec):
+    """ JSON codec backed by orjson """
+
+    name = 'orjson'
+
+    @classmethod
+    def available(cls) -> bool:
+        return orjson is not None
+
+    def loads(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    """ JSON codec backed by msgspec """
+
+    name = 'msgspec'
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    @classmethod
+    def available(cls) -> bool:
+        return msgspec is not None
+
+    def loads(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """ JSON codec backed by ujson """
+
+    name = 'ujson'
+
+    @classmethod
+    def available(cls) -> bool:
+        return ujson is not None
+
+    def loads(self, data: Union[bytes, bytearray, memoryview]) -> Any:
+        if not isinstance(data, bytes):
+            data = bytes(data)
+
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj).encode('utf-8')
+
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, UjsonCodec, JSONCodec)}
+PREFERRED_CODECS = ('orjson', 'msgspec', 'ujson', 'json')     # Fastest first
+
+
+def get_codec(codec: Optional[Union[str, JSONCodec]]=None) -> JSONCodec:
+    """ Retrieves a JSON codec.  If no codec is specified the fastest one that is installed is used.
+
+    :param codec: Codec name, codec instance, or None to pick automatically
+    :raises: ValueError
+    :return: JSONCodec
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None:
+        codec = next(name for name in PREFERRED_CODECS if CODECS[name].available())
+
+    codec_class = CODECS.get(codec)
+    if codec_class is None:
+        raise ValueError(f'Unknown JSON codec "{codec}" - must be one of {", ".join(CODECS)}')
+
+    if not codec_class.available():
+        raise ValueError(f'JSON codec "{codec}" is not installed')
+
+    return codec_class()
@@ -3,7 +3,6 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import time
 from typing import Optional, Union
@@ -11,8 +10,14 @@ import asyncio
 
 from .. import utils
 from ..api import BrowseAPI, GroupAPI, PlayerAPI, SystemAPI
-from ..networking.errors import CommandFailedError
-from ..models.heos import HEOSResult
+from ..networking.admission import AdmissionController
+from ..networking.codec import JSONCodec, get_codec
+from ..networking.errors import CommandFailedError, MessageTooLargeError
+from ..networking.framing import HEOSProtocol, OversizedMessage
+from ..networking.multiplexer import CommandMultiplexer, PendingCommand
+from ..networking.priority import CommandPriority, resolve_priority
+from ..networking.streaming import StreamedMessage, scan_header
+from ..models.heos import HEOSResult, ResponseShape
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +26,30 @@ class Connection:
     """ Connection to the telnet service on a HEOS device """
 
     CONNECTION_READ_TIMEOUT = 1
-    MESSAGE_READ_TIMEOUT = 1        # FIXME: I suspect that this needs to be larger.
+    MESSAGE_READ_TIMEOUT = 5                # Default time allowed for a response to a command
+    DELAYED_RESPONSE_TIMEOUT = 30           # Time allowed for a command after HEOS reports it is still processing it
+    MAX_MESSAGE_SIZE = 32 * 1024 * 1024     # Largest message we are willing to buffer
+    STREAM_PAYLOAD_SIZE = 64 * 1024         # Messages larger than this have their payload decoded lazily
+    COMMAND_TIMEOUTS = {                    # Commands that need more (or less) time than MESSAGE_READ_TIMEOUT
+        'system/sign_in': 10,
+        'system/reboot': 2,
+        'browse/browse': 10,
+        'browse/search': 15,
+        'browse/get_music_sources': 10,
+        'player/get_queue': 10,
+    }
     DELAY_MESSAGES = (
         "command under process",
-        "processing previous command"
     )
 
     @property
     def connected(self) -> bool:
-        return self._reader is not None and self._writer is not None
+        return self._protocol is not None and self._protocol.connected
+
+    @property
+    def outstanding(self) -> int:
+        """ Number of commands sent and awaiting a response or waiting to be sent """
+        return self.admission.in_flight + self.admission.queued
 
     @property
     def prettify_json_response(self):
@@ -40,10 +60,20 @@ class Connection:
         self._prettify_json_response = value
         self.system.prettify_json_response(value)
 
-    def __init__(self):
+    def __init__(self, max_message_size: Optional[int]=MAX_MESSAGE_SIZE, codec: Optional[Union[str, JSONCodec]]=None,
+                 delayed_response_timeout: float=DELAYED_RESPONSE_TIMEOUT):
+        """ Constructor
+
+        :param max_message_size: Maximum message size in bytes or None for no limit
+        :param codec: JSON codec, codec name, or None to use the fastest one installed
+        :param delayed_response_timeout: Seconds to wait on a command after HEOS reports it is still processing it
+        """
         self.server = None
         self.port = None
         self.deduplicate = None
+        self.max_message_size = max_message_size
+        self.delayed_response_timeout = delayed_response_timeout
+        self.codec: JSONCodec = get_codec(codec)
 
         self.system = SystemAPI(self)
         self.player = PlayerAPI(self)
@@ -51,9 +81,12 @@ class Connection:
         self.browse = BrowseAPI(self)
 
         self._prettify_json_response = False
-        self._reader = None
-        self._writer = None
-        self._last_response: Optional[str] = None
+        self._protocol: Optional[HEOSProtocol] = None
+        self._last_response: Optional[bytes] = None
+        self._multiplexer = CommandMultiplexer()
+        self.admission = AdmissionController()
+        self._reader_active: bool = False
+        self._reader_released: Optional[asyncio.Future] = None
 
     async def connect(self, server: str, port: int, deduplicate: bool=False):
         """ Establish a connection with the HEOS service
@@ -66,8 +99,27 @@ class Connection:
         self.server = server
         self.port = port
         self.deduplicate = deduplicate
+        self._last_response = None
+
+        loop = asyncio.get_running_loop()
+        _, self._protocol = await loop.create_connection(
+            lambda: HEOSProtocol(max_message_size=self.max_message_size), server, port)
+
+    def close(self):
+        """ Closes the connection to the HEOS service
 
-        self._reader, self._writer = await asyncio.open_connection(server, port)
+        :return: None
+        """
+        if self._protocol:
+            self._protocol.close()
+
+    async def wait_closed(self):
+        """ Waits for the connection to the HEOS service to be lost or closed
+
+        :return: None
+        """
+        if self._protocol:
+            await self._protocol.wait_closed()
 
     def write(self, input_data: bytes):
         """ Writes the provided data to the connection
@@ -75,43 +127,127 @@ class Connection:
         :param input_data: Data to write
         :return: None
         """
-        if self._writer:
-            self._writer.write(input_data)
+        if self._protocol:
+            self._protocol.write(input_data)
+
+    async def call(self, group: str, command: str, *, shape: ResponseShape=ResponseShape.Full,
+                   timeout: Optional[float]=None, priority: Optional[CommandPriority]=None,
+                   **kwargs: dict) -> HEOSResult:
+        """ Formats a HEOS API request, submits it, and waits for the matching response.  Any number of calls may be
+        in flight on the connection at once; responses are matched back to their callers by the echoed command and
+        request parameters.  Calls beyond what the device can keep up with wait for their turn, and idempotent
+        commands that the device turns away because it is busy are retried.  Waiting calls are sent in priority
+        order.  A call that times out or is cancelled leaves a tombstone behind so that its late response is dropped
+        rather than handed to another caller.
 
-    async def read_until(self, target: bytes) -> bytes:
-        """ Reads from the connection until the target string is found or the optional timeout is hit
-
-        :param target: Target string
-        :return: str
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param shape: How much of the response the caller needs.  Only the 'heos' block of a response is decoded when
+                      it is read, so the payload of a header-only call is never decoded at all.
+        :param timeout: Seconds to wait on the response or None to use the default for the command.  An explicit
+                        timeout is a hard deadline; the default one is extended if HEOS reports the command is still
+                        being processed.
+        :param priority: Scheduling priority or None to use the priority of the current context (see
+                         command_priority()) or the default for the command
+        :param kwargs: Any parameters that should be sent along with the command
+        :raises: AssertionError, CommandFailedError, CommandTimeoutError
+        :return: HEOSResult
         """
-        data = None
+        priority = resolve_priority(f'{group}/{command}', priority)
+        strict = timeout is not None
+        if timeout is None:
+            timeout = self.COMMAND_TIMEOUTS.get(f'{group}/{command}', self.MESSAGE_READ_TIMEOUT)
 
-        if self._reader:
-            data = await self._reader.readuntil(target)
+        retries = 0
+        while True:
+            try:
+                return await self._admitted_call(group, command, shape, timeout, strict, priority, kwargs)
+            except CommandFailedError as ex:
+                if not self.admission.should_retry(f'{group}/{command}', ex, retries):
+                    raise
 
-        return data
+                await asyncio.sleep(self.admission.retry_delay(retries))
+                retries += 1
 
-    async def call(self, group: str, command: str, **kwargs: dict) -> HEOSResult:
-        """ Formats a HEOS API request, submits it, and reads the response.
+    async def _admitted_call(self, group: str, command: str, shape: ResponseShape, timeout: float, strict: bool,
+                             priority: CommandPriority, kwargs: dict) -> HEOSResult:
+        """ Sends a single command once the admission controller allows it and waits for the response.
 
         :param group: Group name (e.g. system, player, etc)
         :param command: Command name (e.g. heart_beat)
+        :param shape: How much of the response the caller needs
+        :param timeout: Seconds to wait on the response
+        :param strict: Whether or not the timeout is a hard deadline
+        :param priority: Scheduling priority
         :param kwargs: Any parameters that should be sent along with the command
-        :raises: AssertionError, CommandFailedError
+        :raises: CommandFailedError, CommandTimeoutError
         :return: HEOSResult
         """
-        self.send_command(group, command, **kwargs)
-        message = await self.read_message()
-        results = HEOSResult(message)
+        ticket = await self.admission.acquire(priority)
+        pending = self._multiplexer.register(group, command, kwargs, timeout, strict)
+        congested = False
+        try:
+            self.send_command(group, command, **kwargs)
+            message = await self._wait_for_response(pending)
+
+            results = HEOSResult(message, shape)
+            if results.header:
+                #if results.header.result is None:
+                #    raise CommandFailedError('No "result" found in "heos" response', results)
+
+                if results.header.result == 'fail':
+                    raise CommandFailedError('Failed to execute command', results)
+        except CommandFailedError as ex:
+            congested = ex.error_code in self.admission.CONGESTION_ERRORS
+            raise
+        finally:
+            self._multiplexer.abandon(pending, self.delayed_response_timeout)
+            self.admission.release(ticket, time.monotonic() - pending.sent_at, congested, pending.delayed,
+                                   f'{group}/{command}')
 
-        if results.header:
-            #if results.header.result is None:
-            #    raise CommandFailedError('No "result" found in "heos" response', results)
+        return results
 
-            if results.header.result == 'fail':
-                raise CommandFailedError('Failed to execute command', results)
+    async def _wait_for_response(self, pending: PendingCommand) -> Optional[dict]:
+        """ Waits for the response to a pending command.  Only one caller reads from the connection at a time; it
+        dispatches every message it reads to whichever caller it belongs to, expires commands whose deadlines pass,
+        and hands the job off to the next waiting caller once its own response has arrived.  A "command under process"
+        response only gives its own command a new deadline, so slow commands do not hold up anybody else.
 
-        return results
+        :param pending: Pending command
+        :raises: CommandTimeoutError
+        :return: dict
+        """
+        while not pending.future.done():
+            if self._reader_active:
+                await asyncio.wait((pending.future, self._reader_released), return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            self._reader_active = True
+            self._reader_released = asyncio.get_running_loop().create_future()
+            try:
+                while not pending.future.done():
+                    timeout = max(self._multiplexer.next_deadline() - time.monotonic(), 0)
+                    try:
+                        message = await self.read_message(timeout)
+                    except MessageTooLargeError as ex:
+                        owner = self._multiplexer.find({'heos': ex.header}) if ex.header else None
+                        self._multiplexer.fail(owner or pending, ex)
+                        continue
+
+                    if message is None:     # Nothing arrived before the earliest deadline
+                        ttl = self.delayed_response_timeout
+                        if not self._multiplexer.expire(time.monotonic(), ttl):
+                            self._multiplexer.expire(self._multiplexer.next_deadline(), ttl)
+                    elif self._results_are_delayed(message.get('heos', {}).get('message', '')):
+                        logger.debug("Delayed - command under process")
+                        self._multiplexer.delay(message, self.delayed_response_timeout)
+                    else:
+                        self._multiplexer.dispatch(message)
+            finally:
+                self._reader_active = False
+                self._reader_released.set_result(None)
+
+        return pending.future.result()
 
     def send_command(self, group: str, command: str, **kwargs: dict) -> None:
         """ Formats a HEOS API request and submits it
@@ -126,50 +262,47 @@ class Connection:
         self.write(command_string.encode('utf-8'))
         logger.debug(f"Sending command: {command_string.rstrip()}")
 
-    async def read_message(self, timeout: int=MESSAGE_READ_TIMEOUT, delimiter: bytes=b'\r\n') -> Optional[dict]:
-        """ Reads a message from the connection
+    async def read_message(self, timeout: float=MESSAGE_READ_TIMEOUT) -> Optional[dict]:
+        """ Reads a message from the connection.  "Command under process" responses are returned like any other
+        message; callers can recognize them with _results_are_delayed().
 
         :param timeout: Timeout (seconds)
-        :param delimiter: Message delimiter
-        :return: bytes
+        :raises: ChannelUnavailableError, MessageTooLargeError
+        :return: dict or None if the timeout was reached
         """
-        results = None
-        response = b''
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
 
-        started = time.time()
         while True:
-            response += await self.read_until(delimiter)
-            if delimiter in response:
-                response = response.strip()
-                logger.debug(f"Got response: {response}")
-
-                # Bail out if we got a duplicate message and have deduplicate enabled
-                if self.deduplicate and response == self._last_response:
-                    response = b''
-                    continue
-                self._last_response = response
-
-                # Confirm message is valid JSON
-                try:
-                    results = json.loads(response.decode('utf-8'))
-                except (ValueError, TypeError):
-                    response = b''  # Not valid JSON; reset & retry
-                    continue
-
-                if self._results_are_delayed(results['heos'].get('message', '')):
-                    logger.debug("Delayed - command under process")
-                    response = b''
-                    continue
-
-                # Valid data
-                break
-
-            # And break out if we exceeded our time limit to read a valid message.  We are also considering delayed
-            # responses as valid in terms of timeout.
-            if time.time() - started > timeout and not self._results_are_delayed(self._last_response):
-                break
-
-        return results
+            response = await self._protocol.read_frame(max(deadline - loop.time(), 0))
+            if response is None:
+                return None
+
+            if isinstance(response, OversizedMessage):
+                raise MessageTooLargeError(f'Message exceeded the maximum size of {self.max_message_size} bytes',
+                                           scan_header(response.head, self.codec.loads), response.size)
+
+            logger.debug(f"Got response: {response[:256]}")
+
+            # Skip duplicate events if we have deduplicate enabled.  A repeated response to a command (e.g. a heartbeat)
+            # answers a new command, so it is kept.
+            if self.deduplicate and response == self._last_response and b'"event/' in response:
+                continue
+            self._last_response = response
+
+            # Confirm message is valid JSON.  Messages with a payload only have their 'heos' block decoded up front;
+            # the payload is decoded if and when a caller asks for it.
+            try:
+                results = None
+                if b'"payload"' in response:
+                    results = StreamedMessage.from_bytes(response, self.codec.loads, self.STREAM_PAYLOAD_SIZE)
+
+                if results is None:
+                    results = self.codec.loads(response)
+            except (ValueError, TypeError):
+                continue    # Not valid JSON; skip it
+
+            return results
 
     def _results_are_delayed(self, message: Union[str, bytes]) -> bool:
         """ Checks for a message matching known messages that indicate there is a delay in processing
@@ -62,6 +62,14 @@ class CommandFailedError(PytheosError):
                     self.system_error_code = system_error_code  # Unknown error code
 
 
+class CommandTimeoutError(PytheosError):
+    """ Error returned when a command does not receive a response before its deadline """
+    def __init__(self, message: str, command: Optional[str]=None, timeout: Optional[float]=None):
+        self.message = message
+        self.command = command
+        self.timeout = timeout
+
+
 class SignInFailedError(CommandFailedError):
     """ Error returned when the system/sign_in command fails """
     pass
@@ -70,3 +78,11 @@ class SignInFailedError(CommandFailedError):
 class InvalidResponse(PytheosError):
     """ Error returned when the response to a command appears invalid """
     pass
+
+
+class MessageTooLargeError(PytheosError):
+    """ Error returned when a message exceeds the maximum message size """
+    def __init__(self, message: str, header: Optional[dict]=None, size: int=0):
+        self.message = message
+        self.header = header
+        self.size = size
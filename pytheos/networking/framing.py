@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+""" Provides message framing for the HEOS CLI protocol """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from asyncio import transports
+from collections import deque
+from typing import Optional, Union
+
+from ..networking.errors import ChannelUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class OversizedMessage:
+    """ Placeholder for a message that exceeded the maximum message size and was discarded """
+
+    HEAD_SIZE = 1024    # Number of bytes kept from the start of the message so that it can still be identified
+
+    def __init__(self, head: bytes, size: int):
+        """ Constructor
+
+        :param head: First bytes of the message
+        :param size: Number of bytes that were discarded
+        """
+        self.head = head
+        self.size = size
+
+    def __repr__(self):
+        return f'<OversizedMessage(size={self.size})>'
+
+
+class MessageFramer:
+    """ Splits a byte stream into delimited messages.  Incoming data is appended to a single reusable buffer and
+    complete messages are sliced out of it with a memoryview, so each message is copied exactly once - out of the
+    buffer - no matter how many reads it arrived over.  Messages larger than the maximum size are discarded as they
+    arrive and reported as an OversizedMessage. """
+
+    def __init__(self, delimiter: bytes=b'\r\n', max_message_size: Optional[int]=None):
+        """ Constructor
+
+        :param delimiter: Message delimiter
+        :param max_message_size: Maximum message size in bytes or None for no limit
+        """
+        self.delimiter = delimiter
+        self.max_message_size = max_message_size
+
+        self._buffer = bytearray()
+        self._scan_offset = 0       # Position in the buffer that has already been searched for a delimiter
+        self._discarded: Optional[OversizedMessage] = None     # Set while we are skipping an oversized message
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> list:
+        """ Adds data to the buffer and returns any messages that are now complete.
+
+        :param data: Data received from the connection
+        :return: list of bytes or OversizedMessage
+        """
+        buffer = self._buffer
+        buffer += data
+
+        messages = []
+        delimiter = self.delimiter
+        delimiter_length = len(delimiter)
+        max_size = self.max_message_size
+
+        if self._discarded is not None:
+            end = buffer.find(delimiter)
+            if end == -1:
+                self._discard(len(buffer) - delimiter_length + 1)
+                return messages
+
+            self._discarded.size += end
+            messages.append(self._discarded)
+            self._discarded = None
+            del buffer[:end + delimiter_length]
+            self._scan_offset = 0
+
+        start = 0
+        with memoryview(buffer) as view:
+            end = buffer.find(delimiter, self._scan_offset)
+            while end != -1:
+                if max_size is not None and end - start > max_size:
+                    messages.append(OversizedMessage(bytes(view[start:start + OversizedMessage.HEAD_SIZE]), end - start))
+                elif end > start:     # Skip empty messages
+                    messages.append(bytes(view[start:end]))
+
+                start = end + delimiter_length
+                end = buffer.find(delimiter, start)
+
+        if start:
+            del buffer[:start]
+
+        if max_size is not None and len(buffer) > max_size:
+            self._discarded = OversizedMessage(bytes(buffer[:OversizedMessage.HEAD_SIZE]), 0)
+            self._discard(len(buffer) - delimiter_length + 1)
+            return messages
+
+        # A delimiter may be split across reads, so back up far enough to catch it on the next pass.
+        self._scan_offset = max(len(buffer) - delimiter_length + 1, 0)
+
+        return messages
+
+    def _discard(self, count: int):
+        """ Drops data from the front of the buffer while skipping an oversized message.
+
+        :param count: Number of bytes to drop
+        :return: None
+        """
+        if count > 0:
+            self._discarded.size += count
+            del self._buffer[:count]
+
+        self._scan_offset = 0
+
+    def clear(self):
+        """ Discards any partially received message.
+
+        :return: None
+        """
+        self._buffer.clear()
+        self._scan_offset = 0
+        self._discarded = None
+
+
+class HEOSProtocol(asyncio.Protocol):
+    """ Protocol for a connection to the HEOS CLI service.  Received data is split into messages as it arrives and
+    queued until it is read with read_frame(). """
+
+    MAX_BUFFERED_FRAMES = 1000      # Stop reading from the socket once this many messages are waiting to be read
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None and not self._closed
+
+    @property
+    def buffered(self) -> int:
+        return len(self._frames)
+
+    def __init__(self, delimiter: bytes=b'\r\n', max_message_size: Optional[int]=None):
+        """ Constructor
+
+        :param delimiter: Message delimiter
+        :param max_message_size: Maximum message size in bytes or None for no limit
+        """
+        super().__init__()
+
+        self._framer = MessageFramer(delimiter, max_message_size)
+        self._frames: deque = deque()
+        self._transport: Optional[transports.Transport] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed: bool = False
+        self._closed_waiter: Optional[asyncio.Future] = None
+        self._paused: bool = False
+
+    def connection_made(self, transport: transports.BaseTransport):
+        self._transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]):
+        logger.debug(f'Connection lost: {exc!r}')
+
+        self._closed = True
+        self._wake_waiter()
+
+        if self._closed_waiter is not None and not self._closed_waiter.done():
+            self._closed_waiter.set_result(None)
+
+    def data_received(self, data: bytes):
+        frames = self._framer.feed(data)
+        if not frames:
+            return
+
+        self._frames.extend(frames)
+        self._wake_waiter()
+
+        if not self._paused and len(self._frames) >= self.MAX_BUFFERED_FRAMES:
+            self._paused = True
+            self._transport.pause_reading()
+
+    def write(self, data: bytes):
+        """ Writes the provided data to the connection
+
+        :param data: Data to write
+        :return: None
+        """
+        if self._transport and not self._closed:
+            self._transport.write(data)
+
+    def close(self):
+        """ Closes the connection.
+
+        :return: None
+        """
+        if self._transport:
+            self._transport.close()
+
+    async def wait_closed(self):
+        """ Waits for the connection to be lost or closed.
+
+        :return: None
+        """
+        if self._closed:
+            return
+
+        if self._closed_waiter is None:
+            self._closed_waiter = asyncio.get_running_loop().create_future()
+
+        await asyncio.shield(self._closed_waiter)
+
+    async def read_frame(self, timeout: Optional[float]=None) -> Optional[Union[bytes, OversizedMessage]]:
+        """ Reads the next message from the connection.
+
+        :param timeout: Timeout (seconds) or None to wait indefinitely
+        :raises: ChannelUnavailableError
+        :return: bytes, OversizedMessage, or None if the timeout was reached
+        """
+        if not self._frames:
+            if self._closed:
+                raise ChannelUnavailableError()
+
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            timer = loop.call_later(timeout, self._wake_waiter) if timeout is not None else None
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if timer:
+                    timer.cancel()
+
+            if not self._frames:
+                if self._closed:
+                    raise ChannelUnavailableError()
+
+                return None     # Timed out
+
+        frame = self._frames.popleft()
+
+        if self._paused and len(self._frames) < self.MAX_BUFFERED_FRAMES // 2:
+            self._paused = False
+            self._transport.resume_reading()
+
+        return frame
+
+    def _wake_waiter(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
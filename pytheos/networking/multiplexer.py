@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+""" Provides response correlation for commands that are in flight on a single connection """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .. import utils
+from ..networking.errors import CommandTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class PendingCommand:
+    """ Represents a command that has been submitted and is waiting on a response """
+
+    def __init__(self, group: str, command: str, params: dict, timeout: float, strict: bool=False):
+        """ Constructor
+
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param params: Parameters sent along with the command
+        :param timeout: Seconds to wait on the response
+        :param strict: Keep the deadline even if HEOS reports the command is still being processed
+        """
+        self.command = f'{group}/{command}'
+        self.params = {k: str(v) for k, v in params.items()}
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.sent_at: float = time.monotonic()
+        self.timeout = timeout
+        self.deadline: float = self.sent_at + timeout
+        self.strict = strict
+        self.delayed: bool = False      # Set once HEOS has told us the command is still being processed
+        self.abandoned: bool = False    # Set once nobody is waiting on the response anymore
+
+    def __repr__(self):
+        return f'<PendingCommand(command={self.command}, params={self.params}, delayed={self.delayed}, ' \
+               f'abandoned={self.abandoned})>'
+
+    def matches(self, command: str, variables: dict) -> bool:
+        """ Determines whether or not a response belongs to this command.  HEOS echoes the command and most of the
+        request parameters back in the response message, so every parameter that was echoed must agree with what we
+        sent.  Parameters that were not echoed (e.g. passwords) are ignored.
+
+        :param command: Command from the response 'heos' block
+        :param variables: Parsed variables from the response message
+        :return: bool
+        """
+        if command != self.command:
+            return False
+
+        return all(variables[k] == v for k, v in self.params.items() if k in variables)
+
+
+class CommandMultiplexer:
+    """ Tracks the commands that are in flight on a connection and matches responses to the callers waiting on them.
+    Commands that time out or are cancelled are kept around as tombstones until their late response shows up, so that
+    the response is recognized and dropped instead of being handed to some other caller. """
+
+    def __init__(self):
+        self._pending: OrderedDict = OrderedDict()   # Insertion order is the order commands were sent in.
+
+    def __len__(self):
+        return len(self._pending)
+
+    def register(self, group: str, command: str, params: dict, timeout: float, strict: bool=False) -> PendingCommand:
+        """ Registers a new command as being in flight.
+
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param params: Parameters sent along with the command
+        :param timeout: Seconds to wait on the response
+        :param strict: Keep the deadline even if HEOS reports the command is still being processed
+        :return: PendingCommand
+        """
+        pending = PendingCommand(group, command, params, timeout, strict)
+        self._pending[id(pending)] = pending
+
+        return pending
+
+    def discard(self, pending: PendingCommand):
+        """ Stops tracking the provided command.
+
+        :param pending: Pending command
+        :return: None
+        """
+        self._pending.pop(id(pending), None)
+
+    def abandon(self, pending: PendingCommand, ttl: float):
+        """ Turns a command that nobody is waiting on anymore into a tombstone.  Does nothing if the command has
+        already been answered.
+
+        :param pending: Pending command
+        :param ttl: Seconds to keep the tombstone around waiting on a late response
+        :return: None
+        """
+        if id(pending) not in self._pending:
+            return
+
+        pending.abandoned = True
+        pending.deadline = time.monotonic() + ttl
+
+    def resolve(self, pending: PendingCommand, message: Optional[dict]):
+        """ Completes the provided command with the message and stops tracking it.
+
+        :param pending: Pending command
+        :param message: Response message
+        :return: None
+        """
+        self.discard(pending)
+        if not pending.future.done():
+            pending.future.set_result(message)
+
+    def fail(self, pending: PendingCommand, exc: Exception):
+        """ Completes the provided command with an error and stops tracking it.
+
+        :param pending: Pending command
+        :param exc: Exception to raise in the caller
+        :return: None
+        """
+        self.discard(pending)
+        if not pending.future.done():
+            pending.future.set_exception(exc)
+
+    def delay(self, message: dict, timeout: float) -> Optional[PendingCommand]:
+        """ Handles a "command under process" response by giving the command it belongs to a new deadline, unless it
+        asked for a strict one.  The command stays pending until its real response arrives.
+
+        :param message: Delayed response message
+        :param timeout: Seconds to wait on the real response
+        :return: The PendingCommand that was delayed or None if nobody is waiting on that command
+        """
+        pending = self.find(message)
+        if pending is None or pending.command != message['heos'].get('command'):
+            logger.debug(f'Dropping delayed response with no pending command: {message!r}')
+            return None
+
+        pending.delayed = True
+        if not pending.strict or pending.abandoned:
+            pending.deadline = time.monotonic() + timeout
+
+        return pending
+
+    def next_deadline(self) -> Optional[float]:
+        """ Retrieves the earliest deadline of the commands in flight.
+
+        :return: Deadline (time.monotonic() based) or None if nothing is pending
+        """
+        return min((pending.deadline for pending in self._pending.values()), default=None)
+
+    def expire(self, now: float, ttl: float) -> list:
+        """ Fails every command whose deadline has passed with a CommandTimeoutError, leaving a tombstone behind, and
+        drops tombstones whose late response never arrived.
+
+        :param now: Current time (time.monotonic() based)
+        :param ttl: Seconds to keep the tombstones of newly expired commands around
+        :return: list of the PendingCommands that expired
+        """
+        expired = [pending for pending in self._pending.values() if pending.deadline <= now]
+        for pending in expired:
+            if pending.abandoned:
+                self.discard(pending)
+                continue
+
+            logger.debug(f'Timed out waiting on a response to {pending!r}')
+            if not pending.future.done():
+                pending.future.set_exception(CommandTimeoutError(
+                    f'Timed out waiting on a response to {pending.command}', pending.command, pending.timeout))
+            self.abandon(pending, ttl)
+
+        return expired
+
+    def dispatch(self, message: dict) -> Optional[PendingCommand]:
+        """ Routes a response message to the command it belongs to.
+
+        :param message: Response message
+        :return: The PendingCommand that was resolved or None if nobody was waiting on the response
+        """
+        pending = self.find(message)
+        if pending is None:
+            logger.debug(f'Dropping response with no pending command: {message!r}')
+            return None
+
+        if pending.abandoned:
+            logger.debug(f'Dropping late response to {pending!r}')
+            self.discard(pending)
+            return None
+
+        self.resolve(pending, message)
+
+        return pending
+
+    def find(self, message: dict) -> Optional[PendingCommand]:
+        """ Finds the command that a response belongs to.  The oldest command with a matching command name and
+        parameters wins.  If the parameters don't correlate we fall back to the oldest command of the same name, since
+        HEOS answers commands on a connection in the order they were received.  Messages whose command name matches no
+        pending command (e.g. events arriving on a command connection) belong to nobody.
+
+        :param message: Response message
+        :return: PendingCommand or None
+        """
+        if not self._pending:
+            return None
+
+        heos = message.get('heos', {}) if message else {}
+        command = heos.get('command')
+
+        candidates = [pending for pending in self._pending.values() if pending.command == command]
+        if not candidates:
+            return None
+
+        if len(candidates) == 1:
+            return candidates[0]    # Nothing to disambiguate, so skip parsing the message
+
+        variables = utils.parse_var_string(heos.get('message'))
+        for pending in candidates:
+            if pending.matches(command, variables):
+                return pending
+
+        fallback = candidates[0]
+        logger.debug(f'Could not correlate response for {command}; falling back to {fallback!r}')
+
+        return fallback
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+""" Provides a command channel that spreads commands across several HEOS devices in the same household """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, Optional, Union
+
+from ..api import BrowseAPI, GroupAPI, PlayerAPI, SystemAPI
+from ..errors import PytheosError
+from ..networking.admission import is_idempotent
+from ..networking.codec import JSONCodec
+from ..networking.connection import Connection
+from ..networking.errors import ChannelUnavailableError, CommandFailedError, CommandTimeoutError
+from ..networking.striping import STRIPED_COMMANDS, StripedConnection
+from ..models.heos import HEOSResult, ResponseShape
+from ..stats import PoolMemberStats
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_PREFIXES = ('get_', 'check_')
+READ_ONLY_COMMANDS = STRIPED_COMMANDS + ('system/heart_beat',)
+
+
+def is_read_only(command: str) -> bool:
+    """ Determines whether or not a command only reads state, and so may be answered by any device.
+
+    :param command: Command (e.g. player/get_volume)
+    :return: bool
+    """
+    return command in READ_ONLY_COMMANDS or command.partition('/')[2].startswith(READ_ONLY_PREFIXES)
+
+
+class PoolMember:
+    """ A device in a DevicePool and the connection to it """
+
+    @property
+    def connected(self) -> bool:
+        return self.connection.connected
+
+    @property
+    def available(self) -> bool:
+        return self.connection.connected and time.monotonic() >= self.unavailable_until
+
+    @property
+    def rtt(self) -> float:
+        return self.stats.rtt_average if self.stats.rtt_average is not None else DevicePool.UNKNOWN_RTT
+
+    def __init__(self, host: str, port: int, connection: Union[Connection, StripedConnection]):
+        """ Constructor
+
+        :param host: Device hostname or IP
+        :param port: Port number
+        :param connection: Connection to the device
+        """
+        self.host = host
+        self.port = port
+        self.connection = connection
+        self.stats = PoolMemberStats()
+        self.unavailable_until: float = 0.0     # Monotonic time before which no commands are routed here
+        self.probed_at: Optional[float] = None
+
+    def __repr__(self):
+        return f'<PoolMember(host={self.host}, port={self.port}, connected={self.connected}, rtt={self.rtt:.4f}, ' \
+               f'outstanding={self.connection.outstanding})>'
+
+    def score(self) -> float:
+        """ Estimates how long a new command would take on this device - its round trip time, scaled by the number
+        of commands already waiting on it.
+
+        :return: float
+        """
+        return self.rtt * (1 + self.connection.outstanding)
+
+
+class DevicePool:
+    """ Command channel made up of connections to several speakers in the same household.  Any HEOS device can answer
+    commands for the whole system, so commands are routed to whichever device is expected to answer quickest.
+
+    Each device's round trip time is measured with periodic heartbeats.  Read-only commands go to the device with the
+    lowest round trip time scaled by its outstanding commands, so a slow or busy speaker is avoided.  Commands that
+    change state all go to a single primary device, so they are still carried out in the order they were sent; the
+    primary only moves when it fails or becomes several times slower than the best device.  A device that drops its
+    connection or stops answering is skipped and reconnected in the background, and idempotent commands that failed
+    on it are sent to another device. """
+
+    UNKNOWN_RTT = 0.1           # Round trip time assumed for a device that has not been probed yet
+    PROBE_INTERVAL = 5          # Seconds between round trip time probes of each device
+    PROBE_TIMEOUT = 2           # Seconds to wait on a probe before considering the device unavailable
+    CONNECT_TIMEOUT = 5         # Seconds to wait on a connection to a device
+    RETRY_INTERVAL = 5          # Seconds to avoid a device after it fails before trying it again
+    PRIMARY_SWITCH_RATIO = 2    # How many times slower than the best device the primary must be before it is replaced
+    FAILOVER_ERRORS = (ChannelUnavailableError, CommandTimeoutError, OSError)
+
+    @property
+    def connected(self) -> bool:
+        return any(member.connected for member in self.members)
+
+    @property
+    def outstanding(self) -> int:
+        return sum(member.connection.outstanding for member in self.members)
+
+    @property
+    def primary(self) -> Optional[PoolMember]:
+        return self._primary
+
+    def __init__(self, max_members: int=4, max_message_size: Optional[int]=Connection.MAX_MESSAGE_SIZE,
+                 codec: Optional[Union[str, JSONCodec]]=None, connection_factory: Optional[Callable]=None):
+        """ Constructor
+
+        :param max_members: Largest number of devices to keep connections to
+        :param max_message_size: Maximum message size in bytes or None for no limit
+        :param codec: JSON codec, codec name, or None to use the fastest one installed
+        :param connection_factory: Callable that creates the connection to each device or None to use a Connection
+        """
+        self.max_members = max_members
+        self.members: list = []
+        self.failovers: int = 0
+        self.server = None
+        self.port = None
+
+        self.system = SystemAPI(self)
+        self.player = PlayerAPI(self)
+        self.group = GroupAPI(self)
+        self.browse = BrowseAPI(self)
+
+        self._connection_factory = connection_factory or (lambda: Connection(max_message_size, codec))
+        self._primary: Optional[PoolMember] = None
+        self._tasks: dict = {}     # PoolMember -> background probe or reconnect task
+
+    def __repr__(self):
+        return f'<DevicePool(members={self.members!r}, primary={self._primary!r})>'
+
+    async def connect(self, server: str, port: int):
+        """ Connects to the device the pool starts from.  Other devices are added with add_hosts(); any that were
+        already in the pool are reconnected in the background.
+
+        :param server: Server hostname or IP
+        :param port: Port number
+        :return: None
+        """
+        self.server = server
+        self.port = port
+
+        member = self._find(server, port)
+        if member is None:
+            member = PoolMember(server, port, self._connection_factory())
+            self.members.insert(0, member)
+
+        await member.connection.connect(server, port)
+        member.unavailable_until = 0.0
+        self._primary = member
+
+    async def add_hosts(self, hosts: Iterable[Union[str, tuple]], port: Optional[int]=None) -> list:
+        """ Connects to more devices, up to the pool's limit, and measures their round trip times.  Devices that cannot
+        be reached are left out.
+
+        :param hosts: Hostnames or IPs, or (host, port) tuples
+        :param port: Port number used for hosts given without one or None to use the pool's port
+        :return: list of PoolMembers that were added
+        """
+        candidates = []
+        for host in hosts:
+            host, host_port = host if isinstance(host, tuple) else (host, port or self.port)
+            if self._find(host, host_port) is None and (host, host_port) not in candidates:
+                candidates.append((host, host_port))
+
+        candidates = candidates[:max(self.max_members - len(self.members), 0)]
+        members = [PoolMember(host, host_port, self._connection_factory()) for host, host_port in candidates]
+
+        results = await asyncio.gather(*[self._connect_member(member) for member in members], return_exceptions=True)
+
+        added = []
+        for member, result in zip(members, results):
+            if isinstance(result, BaseException):
+                logger.info(f'Leaving {member.host}:{member.port} out of the device pool: {result!r}')
+                member.connection.close()
+            else:
+                self.members.append(member)
+                added.append(member)
+
+        await asyncio.gather(*[self.probe(member) for member in added])
+
+        return added
+
+    def close(self):
+        """ Closes the connection to every device and stops any background probes or reconnects.
+
+        :return: None
+        """
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks = {}
+
+        for member in self.members:
+            member.connection.close()
+            member.unavailable_until = 0.0
+
+    async def wait_closed(self):
+        """ Waits until no device in the pool is connected.  Losing some devices is handled by the pool itself.
+
+        :return: None
+        """
+        while True:
+            connected = [member.connection for member in self.members if member.connected]
+            if not connected:
+                return
+
+            waiters = [asyncio.ensure_future(connection.wait_closed()) for connection in connected]
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    async def call(self, group: str, command: str, **kwargs: dict) -> HEOSResult:
+        """ Sends a command to the device chosen for it and waits for the response.  See Connection.call().  If the
+        device fails to answer an idempotent command it is sent to the next best device.
+
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param kwargs: Any parameters that should be sent along with the command
+        :raises: AssertionError, ChannelUnavailableError, CommandFailedError, CommandTimeoutError
+        :return: HEOSResult
+        """
+        name = f'{group}/{command}'
+        tried = []
+
+        while True:
+            member = self.route(name, exclude=tried)
+            try:
+                return await member.connection.call(group, command, **kwargs)
+            except self.FAILOVER_ERRORS as ex:
+                self._mark_unavailable(member, ex)
+                tried.append(member)
+
+                if not is_idempotent(name) or not any(other.available for other in self.members if other not in tried):
+                    raise
+
+                self.failovers += 1
+                logger.debug(f'Retrying {name} on another device after {member.host}:{member.port} failed')
+
+    def route(self, command: str, exclude: Iterable[PoolMember]=()) -> PoolMember:
+        """ Chooses the device a command is sent to.
+
+        :param command: Command (e.g. player/get_volume)
+        :param exclude: Devices not to choose
+        :raises: ChannelUnavailableError
+        :return: PoolMember
+        """
+        self._maintain()
+
+        candidates = [member for member in self.members if member.available and member not in exclude]
+        if not candidates:
+            raise ChannelUnavailableError()
+
+        if is_read_only(command):
+            member = min(candidates, key=lambda candidate: candidate.score())
+        else:
+            best = min(candidates, key=lambda candidate: candidate.rtt)
+            if self._primary not in candidates or self._primary.rtt > best.rtt * self.PRIMARY_SWITCH_RATIO:
+                if self._primary is not None and self._primary is not best:
+                    logger.info(f'Moving the primary device from {self._primary.host}:{self._primary.port} '
+                                f'to {best.host}:{best.port}')
+                self._primary = best
+
+            member = self._primary
+
+        member.stats.routed += 1
+
+        return member
+
+    async def probe(self, member: PoolMember) -> Optional[float]:
+        """ Measures the round trip time to a device with a heartbeat.
+
+        :param member: Device to probe
+        :return: Round trip time in seconds or None if the device did not answer
+        """
+        member.probed_at = time.monotonic()
+        try:
+            await member.connection.call('system', 'heart_beat', shape=ResponseShape.Header,
+                                         timeout=self.PROBE_TIMEOUT)
+        except CommandFailedError:
+            pass    # The device answered, so it is alive even if it didn't like the request
+        except (PytheosError, OSError) as ex:
+            self._mark_unavailable(member, ex)
+            return None
+
+        rtt = time.monotonic() - member.probed_at
+        member.stats.add_rtt(rtt)
+
+        return rtt
+
+    async def heart_beat(self):
+        """ Probes every connected device in order to keep the connections alive.
+
+        :return: None
+        """
+        await asyncio.gather(*[self.probe(member) for member in self.members if member.connected])
+
+    def _find(self, host: str, port: int) -> Optional[PoolMember]:
+        """ Finds the member for a device.
+
+        :param host: Hostname or IP
+        :param port: Port number
+        :return: PoolMember or None
+        """
+        for member in self.members:
+            if member.host == host and member.port == port:
+                return member
+
+        return None
+
+    async def _connect_member(self, member: PoolMember):
+        """ Connects to a device.
+
+        :param member: Device to connect to
+        :raises: OSError, asyncio.TimeoutError
+        :return: None
+        """
+        await asyncio.wait_for(member.connection.connect(member.host, member.port), self.CONNECT_TIMEOUT)
+
+    def _mark_unavailable(self, member: PoolMember, error: Exception):
+        """ Stops routing commands to a device for a while.
+
+        :param member: Device that failed
+        :param error: Error it failed with
+        :return: None
+        """
+        member.stats.failures += 1
+        member.unavailable_until = time.monotonic() + self.RETRY_INTERVAL
+        logger.warning(f'Avoiding {member.host}:{member.port} for {self.RETRY_INTERVAL}s: {error!r}')
+
+    def _maintain(self):
+        """ Starts background probes of devices whose round trip times are stale and reconnects to devices that have
+        been avoided long enough.
+
+        :return: None
+        """
+        now = time.monotonic()
+        for member in self.members:
+            if now < member.unavailable_until or member in self._tasks:
+                continue
+
+            if not member.connected:
+                self._start(self._reconnect(member), member)
+            elif member.probed_at is None or now - member.probed_at > self.PROBE_INTERVAL:
+                self._start(self.probe(member), member)
+
+    def _start(self, coro, member: PoolMember):
+        """ Runs a probe or reconnect in the background.
+
+        :param coro: Coroutine to run
+        :param member: Device it concerns
+        :return: None
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks[member] = task
+        task.add_done_callback(lambda _: self._tasks.pop(member, None))
+
+    async def _reconnect(self, member: PoolMember):
+        """ Reconnects to a device that was lost.
+
+        :param member: Device to reconnect to
+        :return: None
+        """
+        try:
+            await self._connect_member(member)
+        except (OSError, asyncio.TimeoutError) as ex:
+            self._mark_unavailable(member, ex)
+            return
+
+        member.stats.reconnects += 1
+        await self.probe(member)
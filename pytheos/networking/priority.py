@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+""" Provides command priorities for scheduling commands on a shared connection """
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Optional
+
+
+class CommandPriority(IntEnum):
+    """ Scheduling class of a command.  Lower values are sent first. """
+    Interactive = 0     # Something a person is waiting on - e.g. volume and transport controls
+    Normal = 1
+    Background = 2      # Bulk work - e.g. library crawls and queue rebuilds
+
+    def __str__(self):
+        return self.name
+
+
+DEFAULT_PRIORITIES = {
+    'system/heart_beat': CommandPriority.Interactive,
+    'player/set_play_state': CommandPriority.Interactive,
+    'player/set_volume': CommandPriority.Interactive,
+    'player/volume_up': CommandPriority.Interactive,
+    'player/volume_down': CommandPriority.Interactive,
+    'player/set_mute': CommandPriority.Interactive,
+    'player/toggle_mute': CommandPriority.Interactive,
+    'player/play_next': CommandPriority.Interactive,
+    'player/play_previous': CommandPriority.Interactive,
+    'player/set_play_mode': CommandPriority.Interactive,
+    'group/set_volume': CommandPriority.Interactive,
+    'group/volume_up': CommandPriority.Interactive,
+    'group/volume_down': CommandPriority.Interactive,
+    'group/set_mute': CommandPriority.Interactive,
+    'group/toggle_mute': CommandPriority.Interactive,
+    'player/check_update': CommandPriority.Background,
+}
+
+_current_priority: ContextVar[Optional[CommandPriority]] = ContextVar('pytheos_command_priority', default=None)
+
+
+@contextmanager
+def command_priority(priority: CommandPriority):
+    """ Context manager that applies a priority to every command sent within it, including those sent by tasks that
+    are started within it.
+
+        with command_priority(CommandPriority.Background):
+            await source.refresh()
+
+    :param priority: Priority
+    :return: None
+    """
+    token = _current_priority.set(CommandPriority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def resolve_priority(command: str, priority: Optional[CommandPriority]=None) -> CommandPriority:
+    """ Determines the priority of a command.  An explicit priority wins, followed by the priority of the current
+    context, then the default for the command.
+
+    :param command: Command (e.g. player/set_volume)
+    :param priority: Explicit priority or None
+    :return: CommandPriority
+    """
+    if priority is not None:
+        return CommandPriority(priority)
+
+    priority = _current_priority.get()
+    if priority is not None:
+        return priority
+
+    return DEFAULT_PRIORITIES.get(command, CommandPriority.Normal)
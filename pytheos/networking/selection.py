@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+""" Provides selection of the quickest HEOS device to connect to """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, Union
+
+from .. import utils
+from ..networking.connection import Connection
+from ..networking.errors import ChannelUnavailableError, CommandFailedError
+from ..networking.types import SSDPResponse
+from ..models.heos import ResponseShape
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5     # Seconds to wait for any device to answer
+
+
+def normalize_candidates(candidates: Iterable[Union[str, tuple, SSDPResponse]], port: int) -> list:
+    """ Converts a mix of hostnames, (host, port) tuples, and SSDPResponses into a list of unique (host, port) tuples.
+
+    :param candidates: Hostnames or IPs, (host, port) tuples, or SSDPResponses
+    :param port: Port number used for candidates given without one
+    :return: list of (host, port) tuples
+    """
+    results = []
+    for candidate in candidates:
+        if isinstance(candidate, SSDPResponse):
+            candidate = utils.extract_host(candidate.location)
+
+        if not isinstance(candidate, tuple):
+            candidate = (candidate, port)
+
+        if candidate[0] and candidate not in results:
+            results.append(candidate)
+
+    return results
+
+
+async def connect_fastest(candidates: Iterable[Union[str, tuple, SSDPResponse]], port: int,
+                          factory: Callable=Connection, timeout: float=CONNECT_TIMEOUT, stagger: float=0.0) -> tuple:
+    """ Connects to every candidate device at once and sends each a heartbeat, happy eyeballs style.  The first device
+    to answer is kept and the connections to the others are closed.
+
+    :param candidates: Hostnames or IPs, (host, port) tuples, or SSDPResponses (e.g. the results of discover())
+    :param port: Port number used for candidates given without one
+    :param factory: Callable that creates the channel used for each attempt
+    :param timeout: Seconds to wait for any device to answer
+    :param stagger: Seconds between starting each attempt, in the order given; zero starts them all at once
+    :raises: ValueError, ChannelUnavailableError
+    :return: (connected channel, host, port, seconds taken to connect and answer the heartbeat)
+    """
+    candidates = normalize_candidates(candidates, port)
+    if not candidates:
+        raise ValueError('No devices to connect to')
+
+    async def attempt(index: int, host: str, host_port: int) -> tuple:
+        await asyncio.sleep(index * stagger)
+
+        channel = factory()
+        started = time.monotonic()
+        try:
+            await channel.connect(host, host_port)
+            try:
+                await channel.call('system', 'heart_beat', shape=ResponseShape.Header, timeout=timeout)
+            except CommandFailedError:
+                pass    # The device answered, which is all we need to know
+        except BaseException:
+            channel.close()
+            raise
+
+        return channel, host, host_port, time.monotonic() - started
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = {asyncio.ensure_future(attempt(index, host, host_port))
+               for index, (host, host_port) in enumerate(candidates)}
+    answered = []
+    try:
+        while pending and not answered:
+            done, pending = await asyncio.wait(pending, timeout=max(deadline - loop.time(), 0),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+
+            for task in done:
+                if task.exception() is None:
+                    answered.append(task.result())
+                else:
+                    logger.debug(f'Connection attempt failed: {task.exception()!r}')
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if not answered:
+        raise ChannelUnavailableError(f'None of {len(candidates)} devices answered within {timeout}s')
+
+    answered.sort(key=lambda result: result[3])   # More than one may have answered in the same loop iteration
+    for channel, *_ in answered[1:]:
+        channel.close()
+
+    _, host, host_port, elapsed = answered[0]
+    logger.info(f'Selected {host}:{host_port}, which answered in {elapsed * 1000:.1f}ms')
+
+    return answered[0]
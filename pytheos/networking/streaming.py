@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+""" Provides incremental decoding of large HEOS messages """
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Mapping
+from typing import Callable, Iterator, Optional
+
+# Matches a complete JSON string, an unterminated string (we need more data), or a structural character.
+_TOKEN_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|"|[{}\[\],:]')
+_HEADER_RE = re.compile(rb'"heos"\s*:\s*{')
+_LIST_PAYLOAD_RE = re.compile(rb'"payload"\s*:\s*\[')
+
+
+def find_object_end(data: bytes, start: int) -> int:
+    """ Finds the end of the JSON object or array that opens at the provided position.
+
+    :param data: Raw JSON
+    :param start: Position of the opening bracket
+    :return: Position just past the closing bracket or -1 if the object is incomplete
+    """
+    depth = 0
+    for match in _TOKEN_RE.finditer(data, start):
+        token = match.group()
+        if token in (b'{', b'['):
+            depth += 1
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif token == b'"':
+            return -1   # Unterminated string
+
+    return -1
+
+
+def scan_header(data: bytes, loads: Callable=json.loads) -> Optional[dict]:
+    """ Decodes just the 'heos' block of a raw message without touching the rest of it.
+
+    :param data: Raw message
+    :param loads: JSON decoding function
+    :return: dict or None if the block could not be found
+    """
+    start = data.find(b'"heos"')
+    if start == -1:
+        return None
+
+    start = data.find(b'{', start)
+    if start == -1:
+        return None
+
+    # The 'heos' block never contains nested objects, so the first closing brace normally ends it.  If that brace was
+    # inside a string the slice will not decode and we fall back to a full scan.
+    end = data.find(b'}', start)
+    if end != -1:
+        try:
+            header = loads(data[start:end + 1])
+            if isinstance(header, dict):
+                return header
+        except ValueError:
+            pass
+
+    match = _HEADER_RE.search(data)
+    if not match:
+        return None
+
+    start = match.end() - 1
+    end = find_object_end(data, start)
+    if end == -1:
+        return None
+
+    return loads(data[start:end])
+
+
+class PayloadDecoder:
+    """ Incremental decoder that yields the entries of a message's 'payload' list one at a time as the raw bytes are
+    fed to it.  Only the bytes of the entry currently being decoded are retained. """
+
+    SEEKING = 0         # Looking for the "payload" key
+    EXPECTING = 1       # Found the key, waiting on the opening bracket
+    DECODING = 2        # Inside the payload list
+    FINISHED = 3        # Reached the end of the payload list
+
+    def __init__(self, loads: Callable=json.loads):
+        """ Constructor
+
+        :param loads: JSON decoding function
+        """
+        self._loads = loads
+        self._buffer = bytearray()
+        self._position = 0
+        self._depth = 0
+        self._state = self.SEEKING
+        self._key: Optional[bytes] = None
+        self._entry_start = 0
+
+    @property
+    def finished(self) -> bool:
+        return self._state == self.FINISHED
+
+    def feed(self, data: bytes) -> list:
+        """ Feeds more of the raw message to the decoder.
+
+        :param data: Raw data
+        :raises: ValueError
+        :return: list of payload entries that were completed by this data
+        """
+        if self._state == self.FINISHED:
+            return []
+
+        self._buffer += data
+        entries = []
+
+        for match in _TOKEN_RE.finditer(self._buffer, self._position):
+            token = match.group()
+            if token == b'"':
+                self._position = match.start()     # Unterminated string - wait for the rest of it
+                break
+
+            self._position = match.end()
+
+            if token in (b'{', b'['):
+                if self._state == self.EXPECTING:
+                    if token != b'[':
+                        raise ValueError('Payload is not a list')
+
+                    self._state = self.DECODING
+                    self._entry_start = match.end()
+
+                self._depth += 1
+            elif token in (b'}', b']'):
+                self._depth -= 1
+                if self._state == self.DECODING and self._depth == 1:
+                    self._add_entry(entries, match.start())
+                    self._state = self.FINISHED
+                    break
+            elif token == b',':
+                if self._state == self.DECODING and self._depth == 2:
+                    self._add_entry(entries, match.start())
+                    self._entry_start = match.end()
+                self._key = None
+            elif token == b':':
+                if self._state == self.SEEKING and self._depth == 1 and self._key == b'"payload"':
+                    self._state = self.EXPECTING
+            elif self._depth == 1:
+                self._key = token
+
+        self._compact()
+
+        return entries
+
+    def _add_entry(self, entries: list, end: int):
+        entry = bytes(self._buffer[self._entry_start:end]).strip()
+        if entry:
+            entries.append(self._loads(entry))
+
+    def _compact(self):
+        """ Drops data that has already been consumed from the buffer """
+        if self._state == self.FINISHED:
+            self._buffer.clear()
+            return
+
+        keep_from = self._entry_start if self._state == self.DECODING else self._position
+        keep_from = min(keep_from, self._position)
+        if keep_from:
+            del self._buffer[:keep_from]
+            self._position -= keep_from
+            self._entry_start = max(self._entry_start - keep_from, 0)
+
+
+class StreamedPayload:
+    """ Lazily decoded 'payload' list of a large message.  Entries are decoded one at a time while iterating, so
+    building models from it never requires the whole decoded list to exist at once. """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, data: bytes, loads: Callable=json.loads):
+        """ Constructor
+
+        :param data: Raw message
+        :param loads: JSON decoding function
+        """
+        self._data = data
+        self._loads = loads
+
+    def __iter__(self) -> Iterator:
+        decoder = PayloadDecoder(self._loads)
+        with memoryview(self._data) as view:
+            for offset in range(0, len(view), self.CHUNK_SIZE):
+                yield from decoder.feed(view[offset:offset + self.CHUNK_SIZE])
+                if decoder.finished:
+                    break
+
+    def __repr__(self):
+        return f'<StreamedPayload(size={len(self._data)})>'
+
+
+class StreamedMessage(Mapping):
+    """ Read-only view of a raw message that only decodes what is asked for.  The 'heos' block is decoded on its own,
+    a large list payload is exposed as a StreamedPayload, and anything else falls back to decoding the whole message
+    the first time it is needed. """
+
+    def __init__(self, data: bytes, header: dict, loads: Callable=json.loads, stream_payload_size: int=0):
+        """ Constructor
+
+        :param data: Raw message
+        :param header: Decoded 'heos' block
+        :param loads: JSON decoding function
+        :param stream_payload_size: Messages larger than this have their list payload decoded lazily
+        """
+        self._data = data
+        self._header = header
+        self._loads = loads
+        self._stream_payload_size = stream_payload_size
+        self._decoded: Optional[dict] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, loads: Callable=json.loads, stream_payload_size: int=0) -> Optional[StreamedMessage]:
+        """ Creates a StreamedMessage from a raw message.
+
+        :param data: Raw message
+        :param loads: JSON decoding function
+        :param stream_payload_size: Messages larger than this have their list payload decoded lazily
+        :return: StreamedMessage or None if the message does not have a 'heos' block
+        """
+        header = scan_header(data, loads)
+        if header is None:
+            return None
+
+        return cls(data, header, loads, stream_payload_size)
+
+    def __getitem__(self, key):
+        if key == 'heos':
+            return self._header
+
+        if key == 'payload' and self._decoded is None and len(self._data) > self._stream_payload_size \
+                and _LIST_PAYLOAD_RE.search(self._data):
+            return StreamedPayload(self._data, self._loads)
+
+        return self._decode()[key]
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __len__(self):
+        return len(self._decode())
+
+    def __bool__(self):
+        return True     # There is always a 'heos' block; otherwise truth would decode everything to get the length
+
+    def __repr__(self):
+        return f'<StreamedMessage(heos={self._header!r}, size={len(self._data)})>'
+
+    def _decode(self) -> dict:
+        if self._decoded is None:
+            self._decoded = self._loads(self._data)
+
+        return self._decoded
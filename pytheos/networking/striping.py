@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+""" Provides a command channel made up of several connections to the same HEOS device """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional, Union
+
+from ..api import BrowseAPI, GroupAPI, PlayerAPI, SystemAPI
+from ..networking.codec import JSONCodec
+from ..networking.connection import Connection
+from ..networking.errors import ChannelUnavailableError
+from ..models.heos import HEOSResult
+
+logger = logging.getLogger(__name__)
+
+STRIPED_COMMANDS = (    # Read-only commands that may be answered by any connection
+    'browse/browse',
+    'browse/search',
+    'browse/get_source_info',
+    'browse/get_search_criteria',
+    'browse/retrieve_metadata',
+    'player/get_player_info',
+    'player/get_queue',
+    'group/get_group_info',
+)
+AFFINITY_KEYS = ('pid', 'gid')  # Commands for the same player or group always use the same connection
+
+
+class StripedConnection:
+    """ Command channel that spreads commands over several connections to the same HEOS device.  Read-only bulk
+    commands (browse pages, queue ranges, player info) go to whichever connection has the least outstanding work.
+    Every other command is pinned to a connection by its player or group ID, or to the first connection if it has
+    neither, so commands that depend on each other are still sent and answered in order. """
+
+    @property
+    def connected(self) -> bool:
+        return all(connection.connected for connection in self.connections)
+
+    @property
+    def outstanding(self) -> int:
+        """ Number of commands sent and awaiting a response or waiting to be sent, across every connection """
+        return sum(connection.outstanding for connection in self.connections)
+
+    @property
+    def prettify_json_response(self):
+        return self.connections[0].prettify_json_response
+
+    @prettify_json_response.setter
+    def prettify_json_response(self, value):
+        for connection in self.connections:
+            connection.prettify_json_response = value
+
+    def __init__(self, count: int, max_message_size: Optional[int]=Connection.MAX_MESSAGE_SIZE,
+                 codec: Optional[Union[str, JSONCodec]]=None):
+        """ Constructor
+
+        :param count: Number of connections to open
+        :param max_message_size: Maximum message size in bytes or None for no limit
+        :param codec: JSON codec, codec name, or None to use the fastest one installed
+        """
+        if count < 1:
+            raise ValueError('At least one connection is required')
+
+        self.connections: list = [Connection(max_message_size, codec) for _ in range(count)]
+        self.server = None
+        self.port = None
+
+        self.system = SystemAPI(self)
+        self.player = PlayerAPI(self)
+        self.group = GroupAPI(self)
+        self.browse = BrowseAPI(self)
+
+        self._next: int = 0
+
+    def __repr__(self):
+        return f'<StripedConnection(server={self.server}, port={self.port}, connections={len(self.connections)})>'
+
+    async def connect(self, server: str, port: int):
+        """ Establishes every connection with the HEOS service
+
+        :param server: Server hostname or IP
+        :param port: Port number
+        :return: None
+        """
+        self.server = server
+        self.port = port
+
+        await asyncio.gather(*[connection.connect(server, port) for connection in self.connections])
+
+    def close(self):
+        """ Closes every connection to the HEOS service
+
+        :return: None
+        """
+        for connection in self.connections:
+            connection.close()
+
+    async def wait_closed(self):
+        """ Waits for any of the connections to the HEOS service to be lost or closed
+
+        :return: None
+        """
+        waiters = [asyncio.ensure_future(connection.wait_closed()) for connection in self.connections]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def call(self, group: str, command: str, **kwargs: dict) -> HEOSResult:
+        """ Sends a command on the connection chosen for it and waits for the response.  See Connection.call().
+
+        :param group: Group name (e.g. system, player, etc)
+        :param command: Command name (e.g. heart_beat)
+        :param kwargs: Any parameters that should be sent along with the command
+        :raises: AssertionError, ChannelUnavailableError, CommandFailedError, CommandTimeoutError
+        :return: HEOSResult
+        """
+        return await self.route(f'{group}/{command}', kwargs).call(group, command, **kwargs)
+
+    def route(self, command: str, params: dict) -> Connection:
+        """ Chooses the connection a command is sent on.
+
+        :param command: Command (e.g. browse/browse)
+        :param params: Command parameters
+        :raises: ChannelUnavailableError
+        :return: Connection
+        """
+        if command in STRIPED_COMMANDS:
+            connections = [connection for connection in self.connections if connection.connected]
+            if not connections:
+                raise ChannelUnavailableError()
+
+            self._next += 1     # Rotate through equally loaded connections rather than always picking the first
+            offset = self._next % len(connections)
+            connections = connections[offset:] + connections[:offset]
+
+            return min(connections, key=lambda connection: connection.outstanding)
+
+        for key in AFFINITY_KEYS:
+            if params.get(key) is not None:
+                return self.connections[hash(str(params[key])) % len(self.connections)]
+
+        return self.connections[0]
+
+    async def heart_beat(self):
+        """ Performs a system/heart_beat API call on every connection in order to keep them alive.
+
+        :return: None
+        """
+        await asyncio.gather(*[connection.heart_beat() for connection in self.connections])
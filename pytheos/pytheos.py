@@ -4,16 +4,31 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
-from typing import Callable, Optional, Union
+import time
+from typing import Callable, Iterable, Optional, Union
 
 from . import utils
 from . import controllers
+from .api.cache import BrowseCache
+from .api.library import LibraryStore
+from .networking.codec import JSONCodec, get_codec
 from .networking.connection import Connection
+from .networking.pool import DevicePool
+from .networking.selection import connect_fastest
+from .networking.striping import StripedConnection
 from .networking.types import SSDPResponse
-from .networking.errors import ChannelUnavailableError
+from .networking.errors import ChannelUnavailableError, CommandFailedError, HEOSErrorCode, MessageTooLargeError
+from .errors import PytheosError
 from .models.heos import HEOSEvent
+from .models.player import PlayMode, PlayState, RepeatMode, ShuffleMode
 from .models.system import AccountStatus
+from .stats import EventPipelineStats, StartupStats
+from .failover import FailoverChannel
+from .snapshot import Snapshot
+from .state import TopologyChange
+from .supervisor import ConnectionSupervisor
 
 logger = logging.getLogger('pytheos')
 
@@ -21,6 +36,14 @@ logger = logging.getLogger('pytheos')
 class Pytheos:
     """ Pytheos interface """
     DEFAULT_PORT = 1255
+    EVENT_QUEUE_SIZE = 1000     # Events buffered before we stop reading from the event channel
+    EVENT_BATCH_SIZE = 100      # Maximum number of events dispatched per batch
+    COALESCED_EVENTS = (        # Events where only the most recent one per player or group matters
+        'event/player_now_playing_progress',
+        'event/player_volume_changed',
+        'event/group_volume_changed',
+    )
+    REFRESH_SCOPES = ('account', 'players', 'groups', 'sources')
 
     @staticmethod
     def check_channel_availability(channel: Connection):
@@ -53,33 +76,123 @@ class Pytheos:
     def username(self):
         return self._account_username
 
-    def __init__(self, server: Union[str, SSDPResponse]=None, port: Optional[int]=DEFAULT_PORT):
+    @property
+    def event_stats(self) -> EventPipelineStats:
+        return self._event_stats
+
+    @property
+    def startup_stats(self) -> StartupStats:
+        return self._startup_stats
+
+    @property
+    def supervisor(self) -> Optional[ConnectionSupervisor]:
+        return self._supervisor
+
+    @property
+    def tracking_state(self) -> bool:
+        # Change events are being received, so the state remembered by the Player and Group controllers is current
+        return self._receive_events and self._event_task is not None and not self._event_task.done()
+
+    def __init__(self, server: Union[str, tuple, SSDPResponse, list]=None, port: Optional[int]=DEFAULT_PORT,
+                 max_message_size: Optional[int]=Connection.MAX_MESSAGE_SIZE,
+                 codec: Optional[Union[str, JSONCodec]]=None,
+                 heartbeat_interval: Optional[float]=ConnectionSupervisor.HEARTBEAT_INTERVAL,
+                 command_connections: int=1, device_pool_size: int=1, failover: bool=False,
+                 standby_hosts: Optional[list]=None, lazy: bool=False, snapshot_path: Optional[str]=None,
+                 browse_cache: Union[bool, BrowseCache]=False, library_path: Optional[str]=None,
+                 coalesce_events: bool=False):
         """ Constructor
 
-        :param server: Server hostname or IP
+        :param server: Server hostname or IP, a (host, port) tuple, or a list of hostnames, IPs, (host, port)
+                       tuples, or SSDPResponses to connect to whichever of them answers first
         :param port: Port number
+        :param max_message_size: Largest message, in bytes, that will be accepted from the HEOS device
+        :param codec: JSON codec, codec name (json, orjson, msgspec, ujson), or None to use the fastest one installed
+        :param heartbeat_interval: Seconds between heartbeats or None to disable heartbeats and automatic reconnects
+        :param command_connections: Number of command connections to open; read-only bulk commands (browsing, queue
+                                    and player info) are spread across them
+        :param device_pool_size: Number of speakers to send commands to.  When greater than one, connections are
+                                 opened to other speakers in the system once the players are known, and each command
+                                 is routed to whichever speaker is answering quickest.
+        :param failover: Keeps a standby connection to a second speaker and switches over to it if the speaker we are
+                         connected to is lost
+        :param standby_hosts: Hostnames, IPs, (host, port) tuples, or SSDPResponses of speakers to use as the standby
+                              or None to use the other players in the system
+        :param lazy: Skips the full refresh on connect; the account, players, groups, and sources are each requested
+                     the first time they are asked for and cached after that
+        :param snapshot_path: File to keep a snapshot of the players, groups, sources, and search criteria in.  When
+                              a snapshot exists, connect() uses it instead of waiting on a refresh and brings it up to
+                              date in the background.
+        :param browse_cache: Caches browse results; True uses the cache shared by every instance in the process that
+                             talks to the same system, or a BrowseCache may be given.  Cached results are dropped when
+                             the system reports that sources changed.
+        :param library_path: SQLite database to keep browse results in across restarts.  Stored results are answered
+                             without asking the system until they grow old, and can be browsed while offline.
+        :param coalesce_events: Drops progress and volume events that are superseded by a later one for the same
+                                player or group in the same batch, so subscribers only see the most recent
         """
-        if isinstance(server, SSDPResponse):
+        self._candidates: Optional[list] = None
+        if isinstance(server, tuple) and len(server) == 2 and isinstance(server[1], int):
+            server, port = server
+        elif isinstance(server, (list, tuple)):
+            self._candidates = list(server)
+            server = None
+        elif isinstance(server, SSDPResponse):
             server = utils.extract_host(server.location)
 
         self.server: str = server
         self.port: int = port
 
-        self._command_channel = Connection()
-        self._event_channel = Connection()
-        self._event_queue = asyncio.Queue()
+        self.codec: JSONCodec = get_codec(codec)
+
+        self._max_message_size = max_message_size
+        self._command_connections = command_connections
+        self._device_pool_size = device_pool_size
+        if failover:
+            self._command_channel = FailoverChannel(self._create_command_channel)
+        else:
+            self._command_channel = self._create_command_channel()
+        self._standby_hosts: Optional[list] = standby_hosts
+        self._event_channel = Connection(max_message_size, self.codec)
+        self._event_queue = asyncio.Queue(self.EVENT_QUEUE_SIZE)
+        self._coalesce: bool = coalesce_events
+        self._event_stats = EventPipelineStats()
+        self._startup_stats = StartupStats()
         self._event_task: Optional[asyncio.Task] = None
+        self._event_heartbeat: Optional[asyncio.Future] = None      # Answered when the listener sees the response
         self._event_processor: Optional[asyncio.Task] = None
+        self._supervisor: Optional[ConnectionSupervisor] = None
+        if heartbeat_interval is not None:
+            self._supervisor = ConnectionSupervisor(self, heartbeat_interval)
         self._connected: bool = False
         self._event_subscriptions: dict = {}
+        self._change_subscriptions: list = []
+        self._reloading: dict = {}  # Scope -> whether another change event arrived while it was being reloaded
         self._receive_events: bool = True
         self._account_status: Optional[AccountStatus] = None
         self._account_username: Optional[str] = None
         self._players: list = []
         self._groups: dict = {}     # FIXME?: Not sure I like having this as a dict.
         self._sources: dict = {}    # FIXME?: Not sure I like having this as a dict.
-
-        self.api: Connection = self._command_channel
+        self._lazy: bool = lazy
+        self._loaded: set = set()   # Parts of the system (see REFRESH_SCOPES) that have been requested
+        self._snapshot_path: Optional[str] = snapshot_path
+        self._revalidate_task: Optional[asyncio.Task] = None
+
+        self._browse_cache: Optional[BrowseCache] = None
+        self._share_browse_cache: bool = False
+        if isinstance(browse_cache, BrowseCache):
+            self._browse_cache = browse_cache
+        elif browse_cache:
+            self._share_browse_cache = True
+            if self.server is not None:
+                self._browse_cache = BrowseCache.shared((self.server, self.port))
+
+        self._library: Optional[LibraryStore] = LibraryStore(library_path) if library_path is not None else None
+
+        self.api: Union[Connection, StripedConnection, DevicePool, FailoverChannel] = self._command_channel
+        self.api.browse.cache = self._browse_cache
+        self.api.browse.library = self._library
 
         self._init_internal_event_handlers()
 
@@ -100,28 +213,308 @@ class Pytheos:
         """ Connect to our HEOS device.
 
         :param enable_event_connection: Enables establishing an additional connection for system events
-        :param refresh: Determines if the system state should be automatically refreshed
+        :param refresh: Determines if the system state should be automatically refreshed; ignored in lazy mode.  If
+                        there is a snapshot, it is used right away and the refresh happens in the background.
         :return: self
         """
-        logger.info(f'Connecting to {self.server}:{self.port}')
+        started = time.monotonic()
+        self._startup_stats = StartupStats()
+        warm = refresh and self._snapshot_path is not None and self._restore_snapshot()
+        refresh = refresh and not self._lazy and not warm
+        self._receive_events = enable_event_connection
 
-        await self._command_channel.connect(self.server, self.port)
-        self._connected = True
+        if self._candidates:
+            await self._timed('select', self._connect_fastest())
 
-        self._receive_events = enable_event_connection
-        if self._receive_events:
-            await self._event_channel.connect(self.server, self.port, deduplicate=True)
-            await self.enable_event_reception(True)
+            # The shared browse cache to use depends on which system answered
+            if self._share_browse_cache and self._browse_cache is None:
+                self._browse_cache = self.api.browse.cache = BrowseCache.shared((self.server, self.port))
 
-            loop = asyncio.get_running_loop()
-            self._event_task = loop.create_task(self._listen_for_events())
-            self._event_processor = loop.create_task(self._process_events())
+        logger.info(f'Connecting to {self.server}:{self.port}')
+        await self._timed('connect', self._connect_channels())
+        self._connected = True
 
+        # Registering for events and refreshing use different channels, so their round trips overlap
+        steps = []
+        if self._receive_events:
+            steps.append(self._timed('register', self._start_event_reception()))
         if refresh:
-            await self.refresh()
+            steps.append(self.refresh())
+        await asyncio.gather(*steps)
+
+        if warm:
+            self._revalidate_task = asyncio.get_running_loop().create_task(self._revalidate())
+        elif refresh and self._snapshot_path is not None:
+            self._save_snapshot()
+
+        # The other players are only known once they have been loaded (or restored), but standby hosts given to us
+        # don't depend on them
+        hosts = [player.ip for player in self._players if player.ip]
+        steps = []
+        if hosts and isinstance(self._command_channel, DevicePool):
+            steps.append(self._timed('pool', self._command_channel.add_hosts(hosts)))
+
+        if isinstance(self._command_channel, FailoverChannel):
+            standby_hosts = self._standby_hosts if self._standby_hosts is not None else self._candidates or []
+            self._command_channel.add_candidates(standby_hosts, self.port)
+            if self._standby_hosts is None:
+                self._command_channel.add_candidates(hosts, self.port)
+            steps.append(self._timed('standby', self._command_channel.ensure_standby()))
+        await asyncio.gather(*steps)
+
+        self._startup_stats.total = time.monotonic() - started
+        logger.debug(f'Ready in {self._startup_stats.total * 1000:.1f}ms: {self._startup_stats!r}')
+
+        if self._supervisor:
+            self._supervisor.start()
 
         return self
 
+    def snapshot(self) -> Snapshot:
+        """ Takes a snapshot of the players, groups, sources, and any search criteria that have been retrieved.
+
+        :return: Snapshot
+        """
+        return Snapshot(
+            players=[player._player for player in self._players],
+            groups=[group._group for group in self._groups.values()],
+            sources=[source._source for source in self._sources.values()],
+            search_criteria={source_id: source._search_criteria for source_id, source in self._sources.items()
+                             if source._search_criteria is not None},
+        )
+
+    def _restore_snapshot(self) -> bool:
+        """ Loads the snapshot, if there is a usable one, and merges it into the Player, Group, and Source
+        controllers.
+
+        :return: True if a snapshot was restored
+        """
+        started = time.monotonic()
+        snapshot = Snapshot.load(self._snapshot_path)
+        if snapshot is None:
+            return False
+
+        self._apply_players(snapshot.players)
+        self._apply_groups(snapshot.groups)
+        self._apply_sources(snapshot.sources)
+        for source_id, search_criteria in snapshot.search_criteria.items():
+            if source_id in self._sources:
+                self._sources[source_id]._search_criteria = search_criteria
+
+        self._startup_stats.phases['snapshot'] = time.monotonic() - started
+        logger.debug(f'Restored {snapshot!r} from {self._snapshot_path}')
+
+        return True
+
+    def _save_snapshot(self):
+        """ Writes a snapshot to the snapshot path.  Failures are logged rather than raised since the snapshot is only
+        an optimization.
+
+        :return: None
+        """
+        try:
+            self.snapshot().save(self._snapshot_path)
+        except OSError as ex:
+            logger.warning(f'Failed to save snapshot to {self._snapshot_path}: {ex!r}')
+
+    async def _revalidate(self):
+        """ Async task that replaces the restored snapshot with the current state of the system.  Controllers are
+        updated in place, so only what changed since the snapshot was taken is applied, and then the snapshot is saved
+        again.
+
+        :return: None
+        """
+        try:
+            await self.resync()
+            await asyncio.gather(*[source.get_search_criteria(refresh=True) for source in self._sources.values()
+                                   if source._search_criteria is not None])
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failed to revalidate snapshot: {ex!r}')
+            return
+
+        self._save_snapshot()
+
+    def _create_command_channel(self) -> Union[Connection, StripedConnection, DevicePool]:
+        """ Creates the command channel called for by the constructor options.
+
+        :return: Connection, StripedConnection, or DevicePool
+        """
+        if self._device_pool_size > 1:
+            return DevicePool(self._device_pool_size, connection_factory=self._create_command_connection)
+
+        return self._create_command_connection()
+
+    def _create_command_connection(self) -> Union[Connection, StripedConnection]:
+        """ Creates the connection, or set of connections, to a single device used for commands.
+
+        :return: Connection or StripedConnection
+        """
+        if self._command_connections > 1:
+            return StripedConnection(self._command_connections, self._max_message_size, self.codec)
+
+        return Connection(self._max_message_size, self.codec)
+
+    async def _connect_fastest(self):
+        """ Connects a command channel to every candidate device at once and keeps the one that answers first.
+
+        :raises: ChannelUnavailableError
+        :return: None
+        """
+        channel, self.server, self.port, _ = await connect_fastest(
+            self._candidates, self.port, self._create_command_channel)
+
+        if isinstance(self._command_channel, FailoverChannel):
+            self._command_channel.adopt(channel)
+        else:
+            self._command_channel.close()
+            self._command_channel = self.api = channel
+            self.api.browse.cache = self._browse_cache
+            self.api.browse.library = self._library
+
+    async def _open_channels(self):
+        """ Connects the command channel, unless it is already connected, and, if we are receiving events, the event
+        channel.  Registers for change events and starts the event tasks.
+
+        :return: None
+        """
+        await self._connect_channels()
+        if self._receive_events:
+            await self._start_event_reception()
+
+    async def _connect_channels(self):
+        """ Connects the command channel, unless it is already connected, and, if we are receiving events, the event
+        channel at the same time.
+
+        :return: None
+        """
+        steps = []
+        if not self._command_channel.connected:
+            steps.append(self._command_channel.connect(self.server, self.port))
+
+        if self._receive_events:
+            steps.append(self._event_channel.connect(self.server, self.port, deduplicate=True))
+
+        await asyncio.gather(*steps)
+
+    async def _start_event_reception(self):
+        """ Registers for change events on the event channel and starts the event tasks.
+
+        :return: None
+        """
+        await self.enable_event_reception(True)
+
+        loop = asyncio.get_running_loop()
+        self._event_task = loop.create_task(self._listen_for_events())
+        self._event_processor = loop.create_task(self._process_events())
+
+    async def _reopen_event_channel(self):
+        """ Reconnects the event channel on its own, re-registers for change events, and restarts the event tasks.
+
+        :return: None
+        """
+        self._close_event_channel()
+        await self._event_channel.connect(self.server, self.port, deduplicate=True)
+        await self._start_event_reception()
+
+    async def _event_heart_beat(self, timeout: float):
+        """ Sends a heartbeat on the event channel, if we are receiving events, and waits for the listener to see the
+        response.
+
+        :param timeout: Seconds to wait on the response
+        :raises: asyncio.TimeoutError
+        :return: None
+        """
+        if not self.tracking_state:
+            return
+
+        if self._event_heartbeat is None or self._event_heartbeat.done():
+            self._event_heartbeat = asyncio.get_running_loop().create_future()
+            self._event_channel.send_command('system', 'heart_beat')
+
+        await asyncio.wait_for(asyncio.shield(self._event_heartbeat), timeout)
+
+    async def _timed(self, phase: str, awaitable):
+        """ Awaits one phase of connecting or refreshing and records how long it took.
+
+        :param phase: Phase name
+        :param awaitable: Awaitable that carries out the phase
+        :return: Result of the awaitable
+        """
+        started = time.monotonic()
+        try:
+            return await awaitable
+        finally:
+            self._startup_stats.phases[phase] = time.monotonic() - started
+
+    def _close_channels(self):
+        """ Stops the event tasks and closes both channels.
+
+        :return: None
+        """
+        self._close_event_channel()
+        self._command_channel.close()
+
+    def _close_event_channel(self):
+        """ Stops the event tasks and closes the event channel.
+
+        :return: None
+        """
+        if self._event_task:
+            self._event_task.cancel()
+            self._event_task = None
+
+        if self._event_processor:
+            self._event_processor.cancel()
+            self._event_processor = None
+
+        self._event_heartbeat = None
+        self._event_channel.close()
+
+    async def failover(self) -> bool:
+        """ Switches the command and event channels over to the standby speaker, if one is ready.  Idempotent commands
+        that were interrupted are sent again on the new speaker, change events are re-registered, and the system state
+        is resynchronized.
+
+        :raises: PytheosError, OSError
+        :return: True if we failed over, False if there was no standby to fail over to
+        """
+        channel = self._command_channel
+        if not isinstance(channel, FailoverChannel) or not channel.standby_ready:
+            return False
+
+        started = time.monotonic()
+
+        self._close_event_channel()
+        channel.promote()
+        self.server, self.port = channel.server, channel.port
+        await self._open_channels()
+
+        channel.stats.switch_time.add(time.monotonic() - started)
+
+        await self.resync()
+        asyncio.get_running_loop().create_task(channel.ensure_standby())
+
+        return True
+
+    async def _check_standby(self, timeout: float):
+        """ Keeps the standby connection warm, if there is one, and replaces it if it has been lost.
+
+        :param timeout: Seconds to wait on the standby's heartbeat
+        :return: None
+        """
+        if isinstance(self._command_channel, FailoverChannel):
+            await self._command_channel.check_standby(timeout)
+
+    def _channels(self) -> list:
+        """ Retrieves the channels that are expected to be connected.
+
+        :return: list of Connections
+        """
+        if self._receive_events:
+            return [self._command_channel, self._event_channel]
+
+        return [self._command_channel]
+
     async def _set_register_for_change_events(self, value: bool):
         """ Notifies HEOS that we want event messages on the event channel.
 
@@ -137,11 +530,17 @@ class Pytheos:
         """
         logger.info(f'Closing connection to {self.server}:{self.port}')
 
-        if self._event_task:
-            self._event_task.cancel()
+        if self._supervisor:
+            self._supervisor.stop()
 
-        if self._event_processor:
-            self._event_processor.cancel()
+        if self._revalidate_task:
+            self._revalidate_task.cancel()
+            self._revalidate_task = None
+
+        self._close_channels()
+
+        if self._library is not None:
+            self._library.close()
 
         self._connected = False
 
@@ -158,15 +557,221 @@ class Pytheos:
 
         self._event_subscriptions[event_name].append(callback)
 
-    async def refresh(self):
-        """ Refreshes internal information from the HEOS system.
+    def subscribe_changes(self, callback: Callable):
+        """ Subscribe a callback function to changes in the players, groups, or sources.  The callback receives a
+        TopologyChange each time one of them is retrieved and something was added, removed, or changed - whether
+        because the system announced a change, we reconnected, or it was refreshed by request.  Coroutine functions
+        are run as tasks; plain functions are called straight away.
+
+        :param callback: Callback function or coroutine function
+        :return: None
+        """
+        self._change_subscriptions.append(callback)
+
+    def _notify_change(self, change: TopologyChange):
+        """ Passes a TopologyChange along to the change subscribers, if anything changed.
+
+        :param change: TopologyChange
+        :return: None
+        """
+        if not change:
+            return
+
+        logger.debug(f'Topology changed: {change!r}')
+        for callback in self._change_subscriptions:
+            try:
+                result = callback(change)
+            except Exception:
+                logger.exception(f'Change subscriber {callback} failed')
+                continue
+
+            if asyncio.iscoroutine(result):
+                asyncio.get_running_loop().create_task(result)
+
+    async def refresh(self, scope: Optional[Iterable[str]]=None):
+        """ Refreshes internal information from the HEOS system.  The account, players, groups, and sources are
+        independent of each other, so they are all requested at once.  Existing Player, Group, and Source controllers
+        are kept and updated in place.
+
+        :param scope: Parts of the system to refresh (see REFRESH_SCOPES) or None to refresh everything
+        :raises: ValueError
+        :return: None
+        """
+        scope = self.REFRESH_SCOPES if scope is None else tuple(scope)
+        unknown = set(scope) - set(self.REFRESH_SCOPES)
+        if unknown:
+            raise ValueError(f'Unknown refresh scope: {", ".join(sorted(unknown))}')
+
+        loaders = {
+            'account': self.check_account,
+            'players': self._load_players,
+            'groups': self._load_groups,
+            'sources': self._load_sources,
+        }
+        await self._timed('refresh', asyncio.gather(*[self._timed(name, loaders[name]()) for name in scope]))
+
+    async def resync(self):
+        """ Brings our view of the HEOS system back in line with the device after a reconnect.  Only the parts of the
+        system that have already been loaded are refreshed.  Existing Player, Group, and Source controllers are kept
+        and only updated where something actually changed, so anything holding on to them keeps working and their
+        cached state survives.
 
         :return: None
         """
-        await self.check_account()
-        await self.get_players()
-        await self.get_groups()
-        await self.get_sources()
+        # Any change events sent while we were disconnected are lost, so the remembered player state can't be trusted
+        for controller in self._players + list(self._groups.values()):
+            controller.state.clear()
+
+        scope = [name for name in self.REFRESH_SCOPES if name in self._loaded] if self._lazy else self.REFRESH_SCOPES
+        await self.refresh(scope)
+
+    async def _load_players(self) -> tuple:
+        """ Retrieves the players and merges them into the existing Player controllers.
+
+        :return: (added, removed, changed) lists of Players
+        """
+        return self._apply_players(await self.api.player.get_players())
+
+    def _apply_players(self, players: list) -> tuple:
+        """ Merges Player models into the existing Player controllers.
+
+        :param players: List of models.Player
+        :return: (added, removed, changed) lists of Players
+        """
+        players = {player.player_id: player for player in players}
+        merged, added, removed, changed = self._merge_controllers(
+            {player.id: player for player in self._players}, players, lambda model: controllers.Player(self, model))
+        self._players = list(merged.values())
+        self._loaded.add('players')
+        logger.debug(f'Loaded players: {len(added)} added, {len(removed)} removed, {len(changed)} changed')
+        self._notify_change(TopologyChange('players', added, removed, changed))
+
+        return added, removed, changed
+
+    async def _load_groups(self) -> tuple:
+        """ Retrieves the groups and merges them into the existing Group controllers.
+
+        :return: (added, removed, changed) lists of Groups
+        """
+        return self._apply_groups(await self.api.group.get_groups())
+
+    def _apply_groups(self, groups: list) -> tuple:
+        """ Merges Group models into the existing Group controllers.
+
+        :param groups: List of models.Group
+        :return: (added, removed, changed) lists of Groups
+        """
+        groups = {group.group_id: group for group in groups}
+        self._groups, added, removed, changed = self._merge_controllers(
+            self._groups, groups, lambda model: controllers.Group(self, model))
+        self._loaded.add('groups')
+        logger.debug(f'Loaded groups: {len(added)} added, {len(removed)} removed, {len(changed)} changed')
+        self._notify_change(TopologyChange('groups', added, removed, changed))
+        self._notify_change(TopologyChange('players', changed=self._update_player_groups()))
+
+        return added, removed, changed
+
+    async def _load_sources(self) -> tuple:
+        """ Retrieves the music sources and merges them into the existing Source controllers.
+
+        :return: (added, removed, changed) lists of Sources
+        """
+        return self._apply_sources(await self.api.browse.get_music_sources())
+
+    def _apply_sources(self, sources: list) -> tuple:
+        """ Merges Source models into the existing Source controllers.
+
+        :param sources: List of models.Source
+        :return: (added, removed, changed) lists of Sources
+        """
+        sources = {source.source_id: source for source in sources}
+        self._sources, added, removed, changed = self._merge_controllers(
+            self._sources, sources, lambda model: controllers.Source(self, model))
+        self._loaded.add('sources')
+        logger.debug(f'Loaded sources: {len(added)} added, {len(removed)} removed, {len(changed)} changed')
+        self._notify_change(TopologyChange('sources', added, removed, changed))
+
+        return added, removed, changed
+
+    def _update_player_groups(self) -> list:
+        """ Brings the group IDs of the players in line with the groups, so that a change in grouping doesn't also
+        require the players to be retrieved again.
+
+        :return: list of Players whose group changed
+        """
+        group_ids = {member.player_id: group.id for group in self._groups.values() for member in group._group.players}
+
+        changed = []
+        for player in self._players:
+            group_id = group_ids.get(player.id)
+            if player._player.group_id != group_id:
+                model = copy.copy(player._player)
+                model.group_id = group_id
+                player._update(model)
+                changed.append(player)
+
+        return changed
+
+    async def _reload(self, scope: str):
+        """ Retrieves part of the system again after the system announced that it changed.  Parts that haven't been
+        loaded are left for when they are first asked for.  If more change events arrive while it is being retrieved,
+        it is retrieved once more afterwards rather than once per event.
+
+        :param scope: Part of the system (players, groups, or sources)
+        :return: None
+        """
+        if scope not in self._loaded:
+            return
+
+        if scope in self._reloading:
+            self._reloading[scope] = True
+            return
+
+        loaders = {
+            'players': self._load_players,
+            'groups': self._load_groups,
+            'sources': self._load_sources,
+        }
+        try:
+            self._reloading[scope] = True
+            while self._reloading[scope]:
+                self._reloading[scope] = False
+                await loaders[scope]()
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failed to reload {scope}: {ex!r}')
+            return
+        finally:
+            del self._reloading[scope]
+
+        if self._snapshot_path is not None:
+            self._save_snapshot()
+
+    @staticmethod
+    def _merge_controllers(current: dict, latest: dict, create: Callable) -> tuple:
+        """ Merges freshly retrieved models into a mapping of existing controllers.
+
+        :param current: Mapping of IDs to existing controllers
+        :param latest: Mapping of IDs to the models just retrieved from the HEOS system
+        :param create: Factory that creates a controller from a model
+        :return: (mapping of IDs to controllers, added controllers, removed controllers, changed controllers)
+        """
+        merged = {}
+        added = []
+        changed = []
+
+        for obj_id, model in latest.items():
+            controller = current.get(obj_id)
+            if controller is None:
+                controller = create(model)
+                added.append(controller)
+            elif controller._update(model):
+                changed.append(controller)
+
+            merged[obj_id] = controller
+
+        removed = [controller for obj_id, controller in current.items() if obj_id not in merged]
+
+        return merged, added, removed, changed
 
     async def reboot(self):
         """ Instructs the system to reboot.
@@ -181,6 +786,7 @@ class Pytheos:
         :return: tuple
         """
         self._account_status, self._account_username = await self.api.system.check_account()
+        self._loaded.add('account')
 
         return self._account_status, self._account_username
 
@@ -200,49 +806,104 @@ class Pytheos:
         """
         await self.api.system.sign_out()
 
-    async def get_players(self):
-        """ Retrieves a mapping of IDs to Players present in the HEOS system.
+    async def get_players(self, refresh: Optional[bool]=None) -> list:
+        """ Retrieves the Players present in the HEOS system.
 
+        :param refresh: Whether to request the players from the system again; None only does so if they have not been
+                        loaded yet in lazy mode, and always does otherwise
         :return: list
         """
-        self._players = [controllers.Player(self, player) for player in await self.api.player.get_players()]
+        if self._needs_load('players', refresh):
+            await self._load_players()
 
         return self._players
 
-    async def get_group(self, group_id):
+    async def get_player(self, player_id: int) -> Optional[controllers.Player]:
+        """ Retrieves a specific player by ID.  In lazy mode, if the players have not been loaded yet, only the one
+        player is requested from the system.
+
+        :param player_id: Player ID
+        :return: Player or None if there is no such player
+        """
+        if self._lazy and 'players' not in self._loaded:
+            for player in self._players:
+                if player.id == player_id:
+                    return player
+
+            try:
+                model = await self.api.player.get_player_info(player_id)
+            except CommandFailedError as ex:
+                if ex.error_code == HEOSErrorCode.InvalidID:
+                    return None
+                raise
+
+            player = controllers.Player(self, model)
+            self._players.append(player)
+
+            return player
+
+        for player in await self.get_players():
+            if player.id == player_id:
+                return player
+
+        return None
+
+    async def get_group(self, group_id: int) -> Optional[controllers.Group]:
         """ Retrieve a specific group by ID.
 
         :param group_id: Group ID
-        :return: PytheosGroup
+        :return: Group or None if there is no such group
         """
         groups = await self.get_groups()
 
         return groups.get(group_id)
 
-    async def get_groups(self):
+    async def get_groups(self, refresh: Optional[bool]=None) -> dict:
         """ Retrieves a mapping of IDs to Groups present in the HEOS system.
 
+        :param refresh: Whether to request the groups from the system again; None only does so if they have not been
+                        loaded yet in lazy mode, and always does otherwise
         :return: dict
         """
-        self._groups = {}
-
-        for group in await self.api.group.get_groups():
-            self._groups[group.group_id] = controllers.Group(self, group)
+        if self._needs_load('groups', refresh):
+            await self._load_groups()
 
         return self._groups
 
-    async def get_sources(self):
-        """ Retrieves a mapping of IDs to Sources present in the HEOS system.
+    async def get_source(self, source_id: int) -> Optional[controllers.Source]:
+        """ Retrieve a specific music source by ID.
 
-        :return:
+        :param source_id: Source ID
+        :return: Source or None if there is no such source
         """
-        self._sources = {}
+        sources = await self.get_sources()
+
+        return sources.get(source_id)
+
+    async def get_sources(self, refresh: Optional[bool]=None) -> dict:
+        """ Retrieves a mapping of IDs to Sources present in the HEOS system.
 
-        for source in await self.api.browse.get_music_sources():
-            self._sources[source.source_id] = controllers.Source(self, source)
+        :param refresh: Whether to request the sources from the system again; None only does so if they have not been
+                        loaded yet in lazy mode, and always does otherwise
+        :return: dict
+        """
+        if self._needs_load('sources', refresh):
+            await self._load_sources()
 
         return self._sources
 
+    def _needs_load(self, scope: str, refresh: Optional[bool]) -> bool:
+        """ Determines whether part of the system needs to be requested from the system.
+
+        :param scope: Part of the system (see REFRESH_SCOPES)
+        :param refresh: Explicit choice or None to decide based on lazy mode
+        :return: bool
+        """
+        if refresh is not None:
+            return refresh
+
+        return not self._lazy or scope not in self._loaded
+
     def is_receiving_events(self):
         """ Retrieves whether or not we're receiving events.
 
@@ -261,31 +922,85 @@ class Pytheos:
 
     async def _listen_for_events(self):
         """ Async task that reads messages from the event channel and adds them to our event queue for
-        later processing.
+        later processing.  Reads as fast as data arrives; if the queue fills up we stop reading until the processor
+        catches up.
 
         :return: None
         """
+        stats = self._event_stats.receive
+
         while True:
-            results = await self._event_channel.read_message()
+            try:
+                results = await self._event_channel.read_message()
+            except MessageTooLargeError as ex:
+                logger.warning(f'Dropped oversized event ({ex.size} bytes): {ex.header!r}')
+                continue
+            except ChannelUnavailableError:
+                logger.warning('Event channel closed')     # The supervisor, if enabled, takes it from here.
+                return
+
+            if results and results.get('heos', {}).get('command') == 'system/heart_beat':
+                if self._event_heartbeat is not None and not self._event_heartbeat.done():
+                    self._event_heartbeat.set_result(None)
+                continue
+
             if results:
-                event = HEOSEvent(results)
+                received = time.monotonic()
+                event = HEOSEvent(results, self.codec)
                 logger.debug(f"Received event: {event!r}")
-                await self._event_queue.put(event)
+                await self._event_queue.put((received, event))
 
-            await asyncio.sleep(0.5)
+                stats.processed += 1
+                stats.latency.add(time.monotonic() - received)
+                stats.update_depth(self._event_queue.qsize())
 
     async def _process_events(self):
-        """ Async task that processes events that originate from the event channel.
+        """ Async task that processes events that originate from the event channel.  Events are pulled off of the
+        queue in batches and, if enabled, superseded events are coalesced before being dispatched.
 
         :return: None
         """
+        stats = self._event_stats.dispatch
+
         while True:
-            event = await self._event_queue.get()
-            if event:
+            batch = [await self._event_queue.get()]
+            while len(batch) < self.EVENT_BATCH_SIZE and not self._event_queue.empty():
+                batch.append(self._event_queue.get_nowait())
+
+            stats.update_depth(self._event_queue.qsize())
+            self._event_stats.batches += 1
+
+            events = self._coalesce_events(batch) if self._coalesce else batch
+            self._event_stats.coalesced += len(batch) - len(events)
+
+            now = time.monotonic()
+            for received, event in events:
                 logger.debug(f'Processing event: {event!r}')
                 await self._event_handler(event)
 
-            await asyncio.sleep(0.5)
+                stats.processed += 1
+                stats.latency.add(now - received)
+
+    def _coalesce_events(self, batch: list) -> list:
+        """ Drops events from a batch that have been superseded by a later event of the same type for the same
+        player or group.
+
+        :param batch: List of (received time, HEOSEvent) tuples
+        :return: list
+        """
+        latest = {}
+        for index, (_, event) in enumerate(batch):
+            if event.command in self.COALESCED_EVENTS:
+                latest[(event.command, event.vars.get('pid'), event.vars.get('gid'))] = index
+
+        if not latest:
+            return batch
+
+        return [
+            item for index, item in enumerate(batch)
+            if item[1].command not in self.COALESCED_EVENTS
+            or latest[(item[1].command, item[1].vars.get('pid'), item[1].vars.get('gid'))] == index
+        ]
 
     async def _event_handler(self, event: HEOSEvent):
         """ Internal event handler
@@ -305,38 +1020,82 @@ class Pytheos:
         """
         # FIXME: Meh, do something better with this.
         internal_handler_map = {
-            # 'event/sources_changed': self._handle_sources_changed,
-            # 'event/players_changed': self._handle_players_changed,
-            # 'event/groups_changed': self._handle_groups_changed,
-            # 'event/player_state_changed': self._handle_player_state_changed,
-            # 'event/player_now_playing_changed': self._handle_now_playing_changed,
+            'event/sources_changed': self._handle_sources_changed,
+            'event/players_changed': self._handle_players_changed,
+            'event/groups_changed': self._handle_groups_changed,
+            'event/player_state_changed': self._handle_player_state_changed,
+            'event/player_now_playing_changed': self._handle_now_playing_changed,
             # 'event/player_now_playing_progress': self._handle_now_playing_progress,
             # 'event/player_playback_error': self._handle_playback_error,
             # 'event/player_queue_changed': self._handle_queue_changed,
-            # 'event/player_volume_changed': self._handle_volume_changed,
-            # 'event/repeat_mode_changed': self._handle_repeat_mode_changed,
-            # 'event/shuffle_mode_changed': self._handle_shuffle_mode_changed,
-            # 'event/group_volume_changed': self._handle_group_volume_changed,
+            'event/player_volume_changed': self._handle_volume_changed,
+            'event/repeat_mode_changed': self._handle_repeat_mode_changed,
+            'event/shuffle_mode_changed': self._handle_shuffle_mode_changed,
+            'event/group_volume_changed': self._handle_group_volume_changed,
             # 'event/user_changed': self._handle_user_changed,
         }
 
         for event, callback in internal_handler_map.items():
             self.subscribe(event, callback)
 
-    def _handle_sources_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+    async def _handle_sources_changed(self, event: HEOSEvent):
+        if self._browse_cache is not None:
+            self._browse_cache.invalidate()
 
-    def _handle_players_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+        if self._library is not None:
+            await self._library.expire_async()
 
-    def _handle_groups_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+        await self._reload('sources')
 
-    def _handle_player_state_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+    async def _handle_players_changed(self, event: HEOSEvent):
+        await self._reload('players')
 
-    def _handle_now_playing_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+    async def _handle_groups_changed(self, event: HEOSEvent):
+        await self._reload('groups')
+
+    def _find_player(self, player_id: Optional[str]) -> Optional[controllers.Player]:
+        """ Finds the Player controller for the player ID in an event.
+
+        :param player_id: Player ID as given in the event
+        :return: Player or None if we don't know of the player
+        """
+        try:
+            player_id = int(player_id)
+        except (TypeError, ValueError):
+            return None
+
+        for player in self._players:
+            if player.id == player_id:
+                return player
+
+        return None
+
+    def _find_group(self, group_id: Optional[str]) -> Optional[controllers.Group]:
+        """ Finds the Group controller for the group ID in an event.
+
+        :param group_id: Group ID as given in the event
+        :return: Group or None if we don't know of the group
+        """
+        try:
+            return self._groups.get(int(group_id))
+        except (TypeError, ValueError):
+            return None
+
+    async def _handle_player_state_changed(self, event: HEOSEvent):
+        player = self._find_player(event.vars.get('pid'))
+        if player is None:
+            return
+
+        try:
+            player.state.set('play_state', PlayState(event.vars.get('state')))
+        except ValueError:
+            player.state.discard('play_state')
+
+    async def _handle_now_playing_changed(self, event: HEOSEvent):
+        # The event doesn't say what is playing now, so it is requested the next time it is asked for
+        player = self._find_player(event.vars.get('pid'))
+        if player is not None:
+            player.state.discard('now_playing')
 
     def _handle_now_playing_progress(self, event: HEOSEvent):
         raise NotImplementedError()
@@ -347,26 +1106,67 @@ class Pytheos:
     def _handle_queue_changed(self, event: HEOSEvent):
         raise NotImplementedError()
 
-    def _handle_volume_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+    async def _handle_volume_changed(self, event: HEOSEvent):
+        player = self._find_player(event.vars.get('pid'))
+        if player is not None:
+            self._record_volume(player.state, event)
+
+    async def _handle_repeat_mode_changed(self, event: HEOSEvent):
+        player = self._find_player(event.vars.get('pid'))
+        play_mode = player.state.peek('play_mode') if player is not None else None
+        if play_mode is None:
+            return  # Nothing to update; the play mode is requested in full the next time it is asked for
+
+        try:
+            player.state.set('play_mode', PlayMode(repeat=RepeatMode(event.vars.get('repeat')),
+                                                   shuffle=play_mode.shuffle))
+        except ValueError:
+            player.state.discard('play_mode')
+
+    async def _handle_shuffle_mode_changed(self, event: HEOSEvent):
+        player = self._find_player(event.vars.get('pid'))
+        play_mode = player.state.peek('play_mode') if player is not None else None
+        if play_mode is None:
+            return  # Nothing to update; the play mode is requested in full the next time it is asked for
+
+        try:
+            player.state.set('play_mode', PlayMode(repeat=play_mode.repeat,
+                                                   shuffle=ShuffleMode(event.vars.get('shuffle'))))
+        except ValueError:
+            player.state.discard('play_mode')
+
+    async def _handle_group_volume_changed(self, event: HEOSEvent):
+        group = self._find_group(event.vars.get('gid'))
+        if group is not None:
+            self._record_volume(group.state, event)
 
-    def _handle_repeat_mode_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+    @staticmethod
+    def _record_volume(state, event: HEOSEvent):
+        """ Records the volume level and mute status from a volume change event.
 
-    def _handle_shuffle_mode_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+        :param state: StateCache of the player or group the event is for
+        :param event: HEOS Event
+        :return: None
+        """
+        try:
+            state.set('volume', int(event.vars['level']))
+        except (KeyError, ValueError):
+            state.discard('volume')
 
-    def _handle_group_volume_changed(self, event: HEOSEvent):
-        raise NotImplementedError()
+        if event.vars.get('mute') in ('on', 'off'):
+            state.set('mute', event.vars['mute'] == 'on')
+        else:
+            state.discard('mute')
 
     def _handle_user_changed(self, event: HEOSEvent):
         raise NotImplementedError()
 
 
-async def connect(host: Union[SSDPResponse, str], port: int=Pytheos.DEFAULT_PORT) -> Pytheos:
-    """ Connect to the provided host and return a context manager for use with the connection.
+async def connect(host: Union[SSDPResponse, str, list], port: int=Pytheos.DEFAULT_PORT) -> Pytheos:
+    """ Connect to the provided host and return a context manager for use with the connection.  Given a list of hosts
+    or SSDPResponses, connects to whichever of them answers first.
 
-    :param host: Host to connect to
+    :param host: Host to connect to, or a list of hosts or SSDPResponses (e.g. the results of discover())
     :param port: Port to connect to
     :raises: ValueError
     :return: The Pytheos instance
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+""" Saves and restores the known state of a HEOS system so that it is available as soon as we start """
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+from . import models
+
+logger = logging.getLogger('pytheos')
+
+SNAPSHOT_VERSION = 1    # Increment whenever the layout of the snapshot changes
+
+
+class Snapshot:
+    """ The players, groups, music sources, and search criteria of a HEOS system at a point in time.  Snapshots are
+    stored as JSON in the same format HEOS itself uses for each model, along with a version number.  A snapshot
+    written by a different version is ignored rather than misread. """
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def __init__(self, players: Optional[list]=None, groups: Optional[list]=None, sources: Optional[list]=None,
+                 search_criteria: Optional[dict]=None, created: Optional[float]=None):
+        """ Constructor
+
+        :param players: List of models.Player
+        :param groups: List of models.Group
+        :param sources: List of models.Source
+        :param search_criteria: Mapping of source IDs to lists of SearchCriteria
+        :param created: Time (seconds since the epoch) the snapshot was taken or None for now
+        """
+        self.players: list = players or []
+        self.groups: list = groups or []
+        self.sources: list = sources or []
+        self.search_criteria: dict = search_criteria or {}
+        self.created: float = created if created is not None else time.time()
+
+    def __repr__(self):
+        return f'<Snapshot(players={len(self.players)}, groups={len(self.groups)}, sources={len(self.sources)}, ' \
+               f'age={self.age:.1f}s)>'
+
+    def to_dict(self) -> dict:
+        """ Converts the snapshot into a dictionary suitable for serialization.
+
+        :return: dict
+        """
+        return {
+            'version': SNAPSHOT_VERSION,
+            'created': self.created,
+            'players': [player.to_dict() for player in self.players],
+            'groups': [group.to_dict() for group in self.groups],
+            'sources': [source.to_dict() for source in self.sources],
+            'search_criteria': {
+                str(source_id): [criteria.to_dict() for criteria in search_criteria]
+                for source_id, search_criteria in self.search_criteria.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Snapshot:
+        """ Creates a snapshot from a dictionary produced by to_dict().
+
+        :param data: Snapshot dictionary
+        :raises: ValueError
+        :return: Snapshot
+        """
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported snapshot version: {data.get("version")}')
+
+        return cls(
+            players=[models.Player(player) for player in data.get('players', [])],
+            groups=[models.Group(group) for group in data.get('groups', [])],
+            sources=[models.Source(source) for source in data.get('sources', [])],
+            search_criteria={
+                int(source_id): [models.SearchCriteria(criteria) for criteria in search_criteria]
+                for source_id, search_criteria in data.get('search_criteria', {}).items()
+            },
+            created=data.get('created'),
+        )
+
+    def save(self, path: str):
+        """ Writes the snapshot to disk.  The file is replaced in one step, so a reader never sees a partial snapshot.
+
+        :param path: File path
+        :raises: OSError
+        :return: None
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix='.pytheos-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f)
+
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional[Snapshot]:
+        """ Reads a snapshot from disk.
+
+        :param path: File path
+        :return: Snapshot or None if there is no usable snapshot at that path
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, AttributeError) as ex:
+            logger.warning(f'Ignoring snapshot {path}: {ex!r}')
+            return None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+""" Remembers the state of players and groups as it is reported by the HEOS system """
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+class StateCache:
+    """ The last known values of a player's or group's state (volume, mute, play state, etc), along with when each was
+    recorded.  Values are recorded from change events and from the responses to our own commands.
+
+    Every change is numbered, so a value retrieved by a request can be dropped if the value was changed (e.g. by an
+    event) after the request was sent - the request's answer is the older of the two. """
+
+    @property
+    def version(self) -> int:
+        # Number of the latest change; take it before sending a request and pass it to set() along with the answer
+        return self._version
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._values: dict = {}     # Name -> (value, time recorded)
+        self._version: int = 0
+        self._changed: dict = {}    # Name -> number of the last change to it
+        self._cleared: int = 0      # Number of the last clear()
+
+    def __repr__(self):
+        return f'<StateCache(values={len(self._values)}, hits={self.hits}, misses={self.misses})>'
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def get(self, name: str, max_age: Optional[float]=None) -> Optional[Any]:
+        """ Retrieves a remembered value.
+
+        :param name: Value name (e.g. volume)
+        :param max_age: Largest age (seconds) of a value that may be returned, zero to never return one, or None to
+                        accept any age
+        :return: The value or None if it is unknown or too old
+        """
+        value, recorded = self._values.get(name, (None, None))
+        if value is None or (max_age is not None and (max_age <= 0 or time.monotonic() - recorded > max_age)):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def peek(self, name: str) -> Optional[Any]:
+        """ Retrieves a remembered value regardless of its age, without counting it as a hit or miss.
+
+        :param name: Value name
+        :return: The value or None if it is unknown
+        """
+        return self._values.get(name, (None, None))[0]
+
+    def age(self, name: str) -> Optional[float]:
+        """ Retrieves how long ago a value was recorded.
+
+        :param name: Value name
+        :return: Seconds or None if the value is unknown
+        """
+        if name not in self._values:
+            return None
+
+        return time.monotonic() - self._values[name][1]
+
+    def set(self, name: str, value: Any, since: Optional[int]=None) -> bool:
+        """ Records a value.
+
+        :param name: Value name
+        :param value: Value
+        :param since: For a value retrieved by a request, the version when the request was sent; the value isn't
+                      recorded if it has changed since then.  None to record it regardless.
+        :return: True if the value was recorded
+        """
+        if since is not None and max(self._changed.get(name, 0), self._cleared) > since:
+            return False
+
+        self._values[name] = (value, time.monotonic())
+        self._changed[name] = self._next_version()
+
+        return True
+
+    def discard(self, name: str):
+        """ Forgets a value, so that it is requested again the next time it is needed.
+
+        :param name: Value name
+        :return: None
+        """
+        self._values.pop(name, None)
+        self._changed[name] = self._next_version()
+
+    def clear(self):
+        """ Forgets every value.
+
+        :return: None
+        """
+        self._values.clear()
+        self._changed.clear()
+        self._cleared = self._next_version()
+
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+
+@dataclass
+class TopologyChange:
+    """ What changed in one part of the system - the players, groups, or sources - when it was last retrieved.  The
+    lists hold the Player, Group, or Source controllers involved; removed controllers are no longer used. """
+
+    scope: str
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
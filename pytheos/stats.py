@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+""" Counters used to report on the internal behavior of the library """
+
+from __future__ import annotations
+
+from typing import Optional
+
+
+class LatencyCounter:
+    """ Accumulates latency samples (in seconds) """
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.last: Optional[float] = None
+
+    def __repr__(self):
+        return f'<LatencyCounter(count={self.count}, mean={self.mean:.6f}, max={self.max:.6f})>'
+
+    def add(self, value: float):
+        """ Records a new sample.
+
+        :param value: Latency in seconds
+        :return: None
+        """
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def reset(self):
+        """ Clears all samples.
+
+        :return: None
+        """
+        self.__init__()
+
+
+class QueueStageStats:
+    """ Statistics for a single stage of a queue-based pipeline """
+
+    def __init__(self, name: str):
+        """ Constructor
+
+        :param name: Stage name
+        """
+        self.name = name
+        self.processed: int = 0
+        self.depth: int = 0
+        self.max_depth: int = 0
+        self.latency = LatencyCounter()
+
+    def __repr__(self):
+        return f'<QueueStageStats(name={self.name}, processed={self.processed}, depth={self.depth}, ' \
+               f'max_depth={self.max_depth}, latency={self.latency!r})>'
+
+    def update_depth(self, depth: int):
+        """ Records the current depth of the queue feeding this stage.
+
+        :param depth: Queue depth
+        :return: None
+        """
+        self.depth = depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+class EventPipelineStats:
+    """ Statistics for the event pipeline - socket reads, the event queue, and dispatching to subscribers """
+
+    def __init__(self):
+        self.receive = QueueStageStats('receive')       # Socket -> event queue
+        self.dispatch = QueueStageStats('dispatch')     # Event queue -> subscribers
+        self.batches: int = 0
+        self.coalesced: int = 0
+
+    def __repr__(self):
+        return f'<EventPipelineStats(receive={self.receive!r}, dispatch={self.dispatch!r}, ' \
+               f'batches={self.batches}, coalesced={self.coalesced})>'
+
+
+class SupervisorStats:
+    """ Statistics for the connection supervisor - heartbeat round trips and reconnects """
+
+    RTT_SMOOTHING = 0.2     # Weight given to the newest sample in the round trip time moving average
+
+    def __init__(self):
+        self.rtt = LatencyCounter()
+        self.rtt_average: Optional[float] = None
+        self.heartbeat_failures: int = 0
+        self.disconnects: int = 0
+        self.reconnects: int = 0
+        self.reconnect_attempts: int = 0
+        self.event_reconnects: int = 0      # Times the event channel alone was reconnected
+        self.outage = LatencyCounter()      # Time from losing the connection to being resynchronized
+
+    def __repr__(self):
+        return f'<SupervisorStats(rtt={self.rtt!r}, rtt_average={self.rtt_average}, ' \
+               f'heartbeat_failures={self.heartbeat_failures}, disconnects={self.disconnects}, ' \
+               f'reconnects={self.reconnects}, reconnect_attempts={self.reconnect_attempts}, ' \
+               f'event_reconnects={self.event_reconnects})>'
+
+    def add_rtt(self, value: float):
+        """ Records a heartbeat round trip time.
+
+        :param value: Round trip time in seconds
+        :return: None
+        """
+        self.rtt.add(value)
+        if self.rtt_average is None:
+            self.rtt_average = value
+        else:
+            self.rtt_average += self.RTT_SMOOTHING * (value - self.rtt_average)
+
+
+class AdmissionStats:
+    """ Statistics for the command admission controller """
+
+    def __init__(self):
+        self.admitted: int = 0
+        self.queued: int = 0
+        self.max_queued: int = 0
+        self.rejected: int = 0          # Commands the device turned away because it was busy
+        self.retried: int = 0
+        self.decreases: int = 0
+        self.queue_latency = LatencyCounter()   # Time spent waiting locally for a slot
+        self.priority_latency: dict = {}        # Priority name -> LatencyCounter of time spent waiting for a slot
+
+    def __repr__(self):
+        return f'<AdmissionStats(admitted={self.admitted}, queued={self.queued}, max_queued={self.max_queued}, ' \
+               f'rejected={self.rejected}, retried={self.retried}, decreases={self.decreases}, ' \
+               f'queue_latency={self.queue_latency!r})>'
+
+
+class PoolMemberStats:
+    """ Statistics for one device in a device pool - round trips, commands routed to it, and failures """
+
+    RTT_SMOOTHING = 0.2     # Weight given to the newest sample in the round trip time moving average
+
+    def __init__(self):
+        self.rtt = LatencyCounter()
+        self.rtt_average: Optional[float] = None
+        self.routed: int = 0
+        self.failures: int = 0
+        self.reconnects: int = 0
+
+    def __repr__(self):
+        return f'<PoolMemberStats(rtt_average={self.rtt_average}, routed={self.routed}, ' \
+               f'failures={self.failures}, reconnects={self.reconnects})>'
+
+    def add_rtt(self, value: float):
+        """ Records a probe round trip time.
+
+        :param value: Round trip time in seconds
+        :return: None
+        """
+        self.rtt.add(value)
+        if self.rtt_average is None:
+            self.rtt_average = value
+        else:
+            self.rtt_average += self.RTT_SMOOTHING * (value - self.rtt_average)
+
+
+class FailoverStats:
+    """ Statistics for failing over to a standby speaker """
+
+    def __init__(self):
+        self.failovers: int = 0
+        self.replayed: int = 0          # Interrupted commands sent again after a failover
+        self.standby_connects: int = 0
+        self.switch_time = LatencyCounter()     # Time from losing the active speaker to receiving events again
+
+    def __repr__(self):
+        return f'<FailoverStats(failovers={self.failovers}, replayed={self.replayed}, ' \
+               f'standby_connects={self.standby_connects}, switch_time={self.switch_time!r})>'
+
+
+class StartupStats:
+    """ Time taken by each phase of the last connect() and refresh().  Phases that run at the same time overlap, so
+    they add up to more than the total. """
+
+    def __init__(self):
+        self.phases: dict = {}      # Phase name -> seconds
+        self.total: Optional[float] = None
+
+    def __repr__(self):
+        phases = ', '.join(f'{phase}={elapsed * 1000:.1f}ms' for phase, elapsed in self.phases.items())
+        total = f'{self.total * 1000:.1f}ms' if self.total is not None else None
+        return f'<StartupStats(total={total}, {phases})>'
+
+
+class CacheStats:
+    """ Statistics for a cache - lookups, and entries dropped for space, age, or because they became outdated """
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0         # Entries dropped to stay within the entry or size limit
+        self.expirations: int = 0       # Entries dropped because they were older than their time to live
+        self.invalidations: int = 0     # Entries dropped because the system told us they had changed
+
+    def __repr__(self):
+        return f'<CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, ' \
+               f'expirations={self.expirations}, invalidations={self.invalidations})>'
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+""" Keeps the connection to a HEOS device alive and restores it when it is lost """
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Optional
+
+from .models.heos import ResponseShape
+from .errors import PytheosError
+from .networking.errors import CommandFailedError
+from .stats import SupervisorStats
+
+if TYPE_CHECKING:
+    from pytheos import Pytheos
+
+logger = logging.getLogger('pytheos')
+
+
+class Backoff:
+    """ Jittered exponential backoff.  Each delay is drawn from the upper part of an exponentially growing window so
+    that clients which lost their connections at the same moment do not all come back at the same moment. """
+
+    def __init__(self, initial: float=0.5, maximum: float=30.0, factor: float=2.0, jitter: float=0.5):
+        """ Constructor
+
+        :param initial: Delay (seconds) before the first attempt
+        :param maximum: Largest delay (seconds)
+        :param factor: Growth factor applied after each attempt
+        :param jitter: Fraction of each delay that is randomized (0 - 1)
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+
+        self.attempts: int = 0
+
+    def __repr__(self):
+        return f'<Backoff(initial={self.initial}, maximum={self.maximum}, attempts={self.attempts})>'
+
+    def next(self) -> float:
+        """ Retrieves the delay before the next attempt.
+
+        :return: Delay in seconds
+        """
+        delay = min(self.initial * self.factor ** self.attempts, self.maximum)
+        self.attempts += 1
+
+        return delay * (1 - self.jitter * random.random())
+
+    def reset(self):
+        """ Starts the backoff over from the initial delay.
+
+        :return: None
+        """
+        self.attempts = 0
+
+
+class ConnectionSupervisor:
+    """ Watches the connections of a Pytheos instance.  A heartbeat is sent on the command channel every heartbeat
+    interval and its round trip time is recorded.  If a socket closes or a heartbeat goes unanswered the connections
+    are re-established with jittered exponential backoff, change events are re-registered, and the system state is
+    resynchronized.  A heartbeat is sent on the event channel too, since a connection that is lost without being
+    closed would otherwise just stop delivering events; if it goes unanswered only the event channel is reconnected.
+    """
+
+    HEARTBEAT_INTERVAL = 10     # Seconds between heartbeats
+    HEARTBEAT_TIMEOUT = 5       # Seconds to wait on a heartbeat before considering the connection dead
+    CONNECT_TIMEOUT = 5         # Seconds to wait on each reconnect attempt
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __init__(self, pytheos: 'Pytheos', heartbeat_interval: float=HEARTBEAT_INTERVAL,
+                 heartbeat_timeout: float=HEARTBEAT_TIMEOUT, backoff: Optional[Backoff]=None):
+        """ Constructor
+
+        :param pytheos: Pytheos instance to supervise
+        :param heartbeat_interval: Seconds between heartbeats
+        :param heartbeat_timeout: Seconds to wait on a heartbeat before considering the connection dead
+        :param backoff: Reconnect backoff or None to use the defaults
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.backoff = backoff or Backoff()
+        self.stats = SupervisorStats()
+
+        self._pytheos = pytheos
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return f'<ConnectionSupervisor(running={self.running}, stats={self.stats!r})>'
+
+    def start(self):
+        """ Starts supervising the connection.
+
+        :return: None
+        """
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._supervise())
+
+    def stop(self):
+        """ Stops supervising the connection.
+
+        :return: None
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def heart_beat(self) -> float:
+        """ Sends a heartbeat on the command channel and records the round trip time.
+
+        :raises: PytheosError, OSError
+        :return: Round trip time in seconds
+        """
+        started = time.monotonic()
+        try:
+            await self._pytheos.api.call('system', 'heart_beat', shape=ResponseShape.Header,
+                                         timeout=self.heartbeat_timeout)
+        except CommandFailedError:
+            pass    # The device answered, so the connection is alive even if it didn't like the request
+
+        rtt = time.monotonic() - started
+        self.stats.add_rtt(rtt)
+
+        return rtt
+
+    async def reconnect(self):
+        """ Fails over to the standby speaker if there is one.  Otherwise re-establishes the connections, retrying with
+        backoff until it succeeds, and resynchronizes the system state.
+
+        :return: None
+        """
+        self.stats.disconnects += 1
+        started = time.monotonic()
+
+        try:
+            if await self._pytheos.failover():
+                self.stats.outage.add(time.monotonic() - started)
+                return
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failover failed: {ex!r}')
+
+        self._pytheos._close_channels()
+        self.backoff.reset()
+
+        while True:
+            delay = self.backoff.next()
+            logger.info(f'Reconnecting to {self._pytheos.server}:{self._pytheos.port} in {delay:.2f}s')
+            await asyncio.sleep(delay)
+
+            self.stats.reconnect_attempts += 1
+            try:
+                await asyncio.wait_for(self._pytheos._open_channels(), self.CONNECT_TIMEOUT)
+                break
+            except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+                logger.warning(f'Reconnect attempt failed: {ex!r}')
+                self._pytheos._close_channels()
+
+        try:
+            await self._pytheos.resync()
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failed to resynchronize after reconnecting: {ex!r}')
+
+        self.stats.reconnects += 1
+        self.stats.outage.add(time.monotonic() - started)
+        logger.info(f'Reconnected to {self._pytheos.server}:{self._pytheos.port}')
+
+    async def _supervise(self):
+        """ Async task that sends heartbeats and reconnects when the connection is lost.
+
+        :return: None
+        """
+        while True:
+            if not await self._wait_for_disconnect(self.heartbeat_interval):
+                try:
+                    await self.heart_beat()
+                except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+                    logger.warning(f'Heartbeat failed: {ex!r}')
+                    self.stats.heartbeat_failures += 1
+                else:
+                    await self._check_event_channel()
+                    await self._pytheos._check_standby(self.heartbeat_timeout)
+                    continue
+
+            await self.reconnect()
+
+    async def _check_event_channel(self):
+        """ Sends a heartbeat on the event channel.  If it goes unanswered the event channel is reconnected, change
+        events are re-registered, and the system state is resynchronized, since any events sent in the meantime were
+        lost.  If the event channel can't be reconnected it is left closed for the next full reconnect.
+
+        :return: None
+        """
+        try:
+            await self._pytheos._event_heart_beat(self.heartbeat_timeout)
+            return
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Event channel heartbeat failed: {ex!r}')
+            self.stats.heartbeat_failures += 1
+
+        try:
+            await asyncio.wait_for(self._pytheos._reopen_event_channel(), self.CONNECT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failed to reconnect the event channel: {ex!r}')
+            self._pytheos._close_event_channel()
+            return
+
+        self.stats.event_reconnects += 1
+        try:
+            await self._pytheos.resync()
+        except (OSError, asyncio.TimeoutError, PytheosError) as ex:
+            logger.warning(f'Failed to resynchronize after reconnecting the event channel: {ex!r}')
+
+    async def _wait_for_disconnect(self, timeout: float) -> bool:
+        """ Waits for any of the supervised connections to close.
+
+        :param timeout: Seconds to wait
+        :return: True if a connection was lost, False if the timeout was reached
+        """
+        channels = self._pytheos._channels()
+        if not all(channel.connected for channel in channels):
+            return True
+
+        waiters = [asyncio.ensure_future(channel.wait_closed()) for channel in channels]
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+        return bool(done)
@@ -35,6 +35,7 @@ setup(
     extras_require={
         'dev': ['check-manifest'],
         'test': ['coverage'],
+        'speedups': ['orjson'],
     },
     # package_data={},
     # entry_points={
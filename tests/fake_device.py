@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+""" A minimal, local imitation of the HEOS CLI service used by the tests and benchmarks """
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Callable, Optional
+
+from pytheos import utils
+
+
+class FakeHEOSDevice:
+    """ Speaks just enough of the HEOS CLI protocol to exercise the networking layers without a real device.  Commands
+    on a connection are answered one at a time, in order, after the configured latency - just like a real device.  If
+    a queue limit is set, commands that arrive while that many are already waiting are rejected with CommandQueueFull.
+    """
+
+    def __init__(self, host: str='127.0.0.1', port: int=0, latency: float=0.0, network_latency: float=0.0):
+        """ Constructor
+
+        :param host: Host to listen on
+        :param port: Port to listen on (0 picks a free port)
+        :param latency: Seconds taken to answer each command
+        :param network_latency: Seconds each response spends on the network; unlike latency, it does not hold up the
+                                commands behind it
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.network_latency = network_latency
+
+        self.players = [
+            {'name': 'Living Room', 'pid': 1, 'model': 'HEOS 1', 'version': '1.0', 'ip': host, 'network': 'wired',
+             'lineout': 0, 'serial': 'SN0001'},
+        ]
+        self.groups = []
+        self.sources = [
+            {'name': 'Local Music', 'image_url': '', 'type': 'heos_server', 'sid': 1024, 'available': 'true'},
+        ]
+        self.containers = {}        # (sid, cid) -> list of item dicts
+        self.page_size: Optional[int] = None    # Most items returned by one browse request, like a real device
+        self.handlers = {}          # 'group/command' -> callable(params) -> (message, payload) overrides
+        self.delays = {}            # 'group/command' -> seconds spent "under process" before the real response
+        self.queue_limit: Optional[int] = None  # Commands waiting to be processed before new ones are rejected
+        self.rejected = 0
+        self.commands = []          # Every command received, in order
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: list = []
+        self._event_clients: list = []
+        self._silenced: list = []   # Connections that are neither answered nor sent events, as if the network dropped
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def start(self):
+        """ Starts listening for connections.
+
+        :return: None
+        """
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """ Stops listening and drops all connected clients.
+
+        :return: None
+        """
+        self.drop_clients()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_clients(self):
+        """ Abruptly closes every client connection.
+
+        :return: None
+        """
+        for writer in self._clients:
+            writer.close()
+
+        self._clients = []
+        self._event_clients = []
+        self._silenced = []
+
+    def silence_event_clients(self):
+        """ Stops answering, and sending events to, the connections registered for change events without closing
+        them, like a connection lost without either end noticing.
+
+        :return: None
+        """
+        self._silenced += self._event_clients
+        self._event_clients = []
+
+    def set_handler(self, command: str, handler: Callable):
+        """ Overrides the response for a command.  The handler receives the parsed parameters and returns a
+        (message, payload) tuple.
+
+        :param command: Command (e.g. browse/browse)
+        :param handler: Handler
+        :return: None
+        """
+        self.handlers[command] = handler
+
+    def emit_event(self, event: str, **kwargs):
+        """ Sends an event to every connection that has registered for change events.
+
+        :param event: Event name (e.g. player_state_changed)
+        :param kwargs: Event variables
+        :return: None
+        """
+        message = self._encode({'heos': {'command': f'event/{event}', 'message': self._var_string(kwargs)}})
+        for writer in self._event_clients:
+            writer.write(message)
+
+    async def emit_events(self, events: list, batch_size: int=500):
+        """ Sends a burst of events as fast as the connections will take them.
+
+        :param events: List of (event, kwargs) tuples
+        :param batch_size: Number of events written between flow-control checks
+        :return: None
+        """
+        for index, (event, kwargs) in enumerate(events):
+            self.emit_event(event, **kwargs)
+            if index % batch_size == 0:
+                for writer in self._event_clients:
+                    await writer.drain()
+
+        for writer in self._event_clients:
+            await writer.drain()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.append(writer)
+
+        backlog = asyncio.Queue()
+        worker = asyncio.ensure_future(self._process_commands(writer, backlog))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                command, params = self._parse_command(line.decode('utf-8').strip())
+                self.commands.append((command, params))
+
+                if self.queue_limit is not None and backlog.qsize() >= self.queue_limit:
+                    self.rejected += 1
+                    self._write(writer, self._encode({'heos': {
+                        'command': command, 'result': 'fail',
+                        'message': f'eid=16&text=Command queue full&{self._var_string(params)}'}}))
+                    continue
+
+                backlog.put_nowait((command, params))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            worker.cancel()
+            if writer in self._clients:
+                self._clients.remove(writer)
+            if writer in self._event_clients:
+                self._event_clients.remove(writer)
+            writer.close()
+
+    async def _process_commands(self, writer: asyncio.StreamWriter, backlog: asyncio.Queue):
+        try:
+            while True:
+                command, params = await backlog.get()
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                if command == 'system/register_for_change_events':
+                    if params.get('enable') == 'on' and writer not in self._event_clients:
+                        self._event_clients.append(writer)
+                    elif params.get('enable') == 'off' and writer in self._event_clients:
+                        self._event_clients.remove(writer)
+
+                if command in self.delays:
+                    self._write(writer, self._encode({'heos': {
+                        'command': command, 'result': 'success',
+                        'message': 'command under process&' + self._var_string(params)}}))
+                    asyncio.ensure_future(self._respond_later(writer, self.delays[command], command, params))
+                    continue
+
+                if writer in self._silenced:
+                    continue
+
+                self._write(writer, self._respond(command, params))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    async def _respond_later(self, writer: asyncio.StreamWriter, delay: float, command: str, params: dict):
+        await asyncio.sleep(delay)
+        self._write(writer, self._respond(command, params))
+
+    def _write(self, writer: asyncio.StreamWriter, data: bytes):
+        if self.network_latency:
+            asyncio.get_running_loop().call_later(self.network_latency, self._deliver, writer, data)
+        else:
+            self._deliver(writer, data)
+
+    @staticmethod
+    def _deliver(writer: asyncio.StreamWriter, data: bytes):
+        if not writer.is_closing():
+            writer.write(data)
+
+    def _respond(self, command: str, params: dict) -> bytes:
+        message = self._var_string(params)
+        payload = None
+
+        if command in self.handlers:
+            message, payload = self.handlers[command](params)
+        elif command == 'system/check_account':
+            message = 'signed_out'
+        elif command == 'player/get_players':
+            payload = self.players
+        elif command == 'group/get_groups':
+            payload = self.groups
+        elif command == 'browse/get_music_sources':
+            payload = self.sources
+        elif command == 'browse/browse':
+            message, payload = self._browse(params)
+
+        response = {'heos': {'command': command, 'result': 'success', 'message': message}}
+        if payload is not None:
+            response['payload'] = payload
+
+        return self._encode(response)
+
+    def _browse(self, params: dict) -> tuple:
+        items = self.containers.get((str(params.get('sid')), params.get('cid')), [])
+
+        start, end = 0, len(items) - 1
+        if 'range' in params:
+            start, end = [int(itm) for itm in params['range'].split(',')]
+
+        if self.page_size is not None:
+            end = min(end, start + self.page_size - 1)
+
+        page = items[start:end + 1]
+        message = self._var_string(dict(params, returned=len(page), count=len(items)))
+
+        return message, page
+
+    @staticmethod
+    def _parse_command(line: str) -> tuple:
+        command, _, variables = line[len('heos://'):].partition('?')
+        return command, utils.parse_var_string(variables) if variables else {}
+
+    @staticmethod
+    def _var_string(variables: dict) -> str:
+        return '&'.join(f'{k}={v}' for k, v in variables.items())
+
+    @staticmethod
+    def _encode(response: dict) -> bytes:
+        return json.dumps(response).encode('utf-8') + b'\r\n'
+
+
+async def wait_for(condition: Callable, timeout: float=2.0):
+    """ Polls until a condition holds.
+
+    :param condition: Callable returning True once the condition holds
+    :param timeout: Seconds to wait
+    :raises: asyncio.TimeoutError
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise asyncio.TimeoutError()
+
+        await asyncio.sleep(0.01)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from pytheos.networking.admission import AdmissionController, is_idempotent
+from pytheos.networking.connection import Connection
+from pytheos.networking.errors import CommandFailedError, HEOSErrorCode
+from pytheos.networking.priority import CommandPriority, command_priority, resolve_priority
+from tests.fake_device import FakeHEOSDevice
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_is_idempotent(self):
+        self.assertTrue(is_idempotent('player/get_volume'))
+        self.assertTrue(is_idempotent('player/set_volume'))
+        self.assertTrue(is_idempotent('browse/browse'))
+        self.assertFalse(is_idempotent('player/volume_up'))
+        self.assertFalse(is_idempotent('browse/add_to_queue'))
+        self.assertFalse(is_idempotent('browse/set_service_option'))
+
+    def test_additive_increase(self):
+        async def run():
+            controller = AdmissionController(initial_limit=2)
+            for _ in range(4):
+                controller.release(await controller.acquire(), 0.01)
+
+            return controller
+
+        controller = _async_run(run())
+        self.assertGreater(controller.limit, 3)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_decreases_once_per_window(self):
+        async def run():
+            controller = AdmissionController(initial_limit=8)
+            tickets = [await controller.acquire() for _ in range(4)]
+            for ticket in tickets:
+                controller.release(ticket, 0.01, congested=True)
+
+            return controller
+
+        controller = _async_run(run())
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(controller.stats.decreases, 1)
+        self.assertEqual(controller.stats.rejected, 4)
+
+    def test_slow_responses_decrease_the_limit(self):
+        async def run():
+            controller = AdmissionController(initial_limit=8)
+            controller.release(await controller.acquire(), 0.01)
+            limit = controller.limit
+            controller.release(await controller.acquire(), 1.0, delayed=True)
+            self.assertGreaterEqual(controller.limit, limit)
+            controller.release(await controller.acquire(), 1.0)
+
+            return controller
+
+        controller = _async_run(run())
+        self.assertLess(controller.limit, 5)
+
+    def test_latency_is_judged_per_command(self):
+        async def run():
+            controller = AdmissionController(initial_limit=8)
+            for _ in range(20):
+                controller.release(await controller.acquire(), 0.01, command='player/get_volume')
+                controller.release(await controller.acquire(), 0.5, command='browse/browse')
+            self.assertEqual(controller.stats.decreases, 0)
+
+            # A command that settles at a slower latency stops being treated as congestion
+            for _ in range(20):
+                controller.release(await controller.acquire(), 0.3, command='player/get_volume')
+            limit = controller.limit
+            controller.release(await controller.acquire(), 0.3, command='player/get_volume')
+            self.assertGreater(controller.limit, limit)
+
+            return controller
+
+        controller = _async_run(run())
+        self.assertGreater(controller.baseline_latencies['player/get_volume'], 0.075)
+
+    def test_excess_commands_wait_in_order(self):
+        async def run():
+            controller = AdmissionController(initial_limit=1)
+            order = []
+
+            async def command(index):
+                ticket = await controller.acquire()
+                order.append(index)
+                await asyncio.sleep(0)
+                controller.release(ticket, 0.01)
+
+            await asyncio.gather(*[command(index) for index in range(5)])
+            return controller, order
+
+        controller, order = _async_run(run())
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+        self.assertEqual(controller.stats.queued, 4)
+
+    def test_priority_order_and_aging(self):
+        async def run():
+            controller = AdmissionController(initial_limit=1)
+            controller.INTERACTIVE_RESERVE = 0
+            blocker = await controller.acquire()
+            order = []
+
+            async def command(name, priority):
+                ticket = await controller.acquire(priority)
+                order.append(name)
+                controller.release(ticket, 0.01)
+
+            tasks = [asyncio.ensure_future(command('background', CommandPriority.Background))]
+            await asyncio.sleep(0.05)
+            tasks += [asyncio.ensure_future(command(f'normal{index}', CommandPriority.Normal)) for index in range(2)]
+            tasks.append(asyncio.ensure_future(command('interactive', CommandPriority.Interactive)))
+            await asyncio.sleep(0)
+
+            controller.AGING_INTERVAL = 0.03    # The background command has now waited long enough to outrank Normal
+            controller.release(blocker, 0.01)
+            await asyncio.gather(*tasks)
+
+            return order
+
+        self.assertEqual(_async_run(run()), ['interactive', 'background', 'normal0', 'normal1'])
+
+    def test_interactive_reserve(self):
+        async def run():
+            controller = AdmissionController(initial_limit=1)
+            await controller.acquire(CommandPriority.Background)
+            await asyncio.wait_for(controller.acquire(CommandPriority.Interactive), 1)
+
+            return controller
+
+        self.assertEqual(_async_run(run()).in_flight, 2)
+
+    def test_background_limit(self):
+        async def run():
+            controller = AdmissionController(initial_limit=16)
+            for _ in range(controller.BACKGROUND_LIMIT):
+                await controller.acquire(CommandPriority.Background)
+
+            waiting = asyncio.ensure_future(controller.acquire(CommandPriority.Background))
+            await asyncio.sleep(0)
+            self.assertFalse(waiting.done())
+            await asyncio.wait_for(controller.acquire(CommandPriority.Normal), 1)
+            waiting.cancel()
+
+            return controller
+
+        self.assertEqual(_async_run(run()).in_flight, AdmissionController.BACKGROUND_LIMIT + 1)
+
+    def test_resolve_priority(self):
+        self.assertEqual(resolve_priority('player/set_volume'), CommandPriority.Interactive)
+        self.assertEqual(resolve_priority('browse/browse'), CommandPriority.Normal)
+        with command_priority(CommandPriority.Background):
+            self.assertEqual(resolve_priority('player/set_volume'), CommandPriority.Background)
+            self.assertEqual(resolve_priority('browse/browse', CommandPriority.Interactive),
+                             CommandPriority.Interactive)
+        self.assertEqual(resolve_priority('browse/browse'), CommandPriority.Normal)
+
+    def test_rejected_commands_against_device(self):
+        async def run(command):
+            async with FakeHEOSDevice(latency=0.005) as device:
+                device.queue_limit = 1
+                device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    results = await asyncio.gather(*[command(connection) for _ in range(20)], return_exceptions=True)
+                finally:
+                    connection.close()
+
+            return results, device.rejected, connection.admission
+
+        results, rejected, admission = _async_run(run(lambda connection: connection.player.get_volume(1)))
+        self.assertEqual(results, [10] * 20)
+        self.assertGreater(rejected, 0)
+        self.assertLess(admission.limit, AdmissionController.INITIAL_LIMIT)
+        self.assertGreater(admission.stats.retried, 0)
+
+        results, _, _ = _async_run(run(lambda connection: connection.player.volume_up(1)))
+        errors = [result for result in results if isinstance(result, CommandFailedError)]
+        self.assertTrue(errors)
+        self.assertEqual(errors[0].error_code, HEOSErrorCode.CommandQueueFull)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -306,7 +306,7 @@ class TestAPIs(unittest.TestCase):
 
     def test_player_toggle_mute(self):
         with patch.object(pytheos.networking.connection.Connection, 'read_message',
-                          return_value=TestAPIs.get_basic_response('player', 'get_mute', 'success',
+                          return_value=TestAPIs.get_basic_response('player', 'toggle_mute', 'success',
                                                                    pid=TEST_PLAYER_ID)):
             _async_run(self._pytheos.api.player.toggle_mute(TEST_PLAYER_ID))
             self._pytheos.api.send_command.assert_called_with('player', 'toggle_mute', pid=TEST_PLAYER_ID)
@@ -356,6 +356,9 @@ class TestAPIs(unittest.TestCase):
         with patch.object(pytheos.networking.connection.Connection, 'read_message', return_value=TestAPIs.get_demo_queue()):
             queue = _async_run(self._pytheos.api.player.get_queue(TEST_PLAYER_ID, 0, 10))
 
+        with patch.object(pytheos.networking.connection.Connection, 'read_message',
+                          return_value=TestAPIs.get_basic_response('player', 'play_queue', 'success',
+                                                                   pid=TEST_PLAYER_ID, qid=queue[0].queue_id)):
             _async_run(self._pytheos.api.player.play_queue(TEST_PLAYER_ID, queue[0].queue_id))
             self._pytheos.api.send_command.assert_called_with('player', 'play_queue', pid=TEST_PLAYER_ID, qid=queue[0].queue_id)
 
@@ -700,7 +703,7 @@ class TestAPIs(unittest.TestCase):
             self.assertIsInstance(music_sources[0], Source)
 
     def test_browse_get_source_info(self):
-        response = TestAPIs.get_basic_response('browse', 'get_music_sources', 'success')
+        response = TestAPIs.get_basic_response('browse', 'get_source_info', 'success')
         response['payload'] = {
             "name": "Pandora",
             "image_url": "https://production.ws.skyegloup.com:443/media/images/service/logos/pandora.png",
@@ -869,7 +872,7 @@ class TestAPIs(unittest.TestCase):
         url = 'http://someserver/somestream.mp3'
 
         with patch.object(pytheos.networking.connection.Connection, 'read_message',
-                          return_value=TestAPIs.get_basic_response('browse', 'play_url', 'success',
+                          return_value=TestAPIs.get_basic_response('browse', 'play_stream', 'success',
                                                                    pid=TEST_PLAYER_ID, url=url)):
             _async_run(self._pytheos.api.browse.play_url(TEST_PLAYER_ID, url))
 
@@ -948,7 +951,7 @@ class TestAPIs(unittest.TestCase):
         sid = 1
         query = 'foobar'
 
-        response = TestAPIs.get_basic_response('browse', 'retrieve_metadata', 'success',
+        response = TestAPIs.get_basic_response('browse', 'set_service_option', 'success',
                                                sid=sid, search=query, scid=1, range='0,100',
                                                returned=2, count=2)
         response['payload'] = [
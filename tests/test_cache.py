@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import gc
+import time
+import unittest
+from unittest.mock import patch
+
+import pytheos
+from pytheos import models
+from pytheos.api.cache import BrowseCache
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _items(count: int) -> list:
+    return [models.Source({'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'name': f'Track {i}'})
+            for i in range(count)]
+
+
+class TestBrowseCache(unittest.TestCase):
+    def test_lookups(self):
+        cache = BrowseCache()
+        items = _items(3)
+        self.assertIsNone(cache.get(1024, 'albums', (0, 49)))
+
+        cache.put('1024', 'albums', ('0', '49'), 3, items)
+        self.assertEqual(cache.get(1024, 'albums', (0, 49)), (3, items))
+        self.assertIsNone(cache.get(1024, 'albums', (50, 99)))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 2))
+
+        cache.put(1026, None, None, 3, items)    # History isn't cached
+        self.assertEqual(len(cache), 1)
+
+    def test_entry_and_size_limits(self):
+        cache = BrowseCache(max_entries=2)
+        for cid in ('a', 'b', 'c'):
+            cache.put(1024, cid, None, 1, _items(1))
+        cache.get(1024, 'b', None)
+        cache.put(1024, 'd', None, 1, _items(1))
+
+        self.assertIsNone(cache.get(1024, 'a', None))
+        self.assertIsNone(cache.get(1024, 'c', None))
+        self.assertIsNotNone(cache.get(1024, 'b', None))
+        self.assertEqual(cache.stats.evictions, 2)
+
+        cache = BrowseCache(max_bytes=cache.size // 2 * 3)
+        for cid in range(10):
+            cache.put(1024, str(cid), None, 1, _items(1))
+        self.assertEqual(len(cache), 3)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_expiry_and_invalidation(self):
+        cache = BrowseCache(default_ttl=10)
+        cache.set_ttl('3', 1)
+        cache.put(3, 'stations', None, 1, _items(1))
+        cache.put(1024, 'albums', None, 1, _items(1))
+        cache.put(1024, 'artists', None, 1, _items(1))
+        cache.put(1, 'stations', None, 1, _items(1))
+
+        later = time.monotonic() + 2
+        with patch('pytheos.api.cache.time.monotonic', return_value=later):
+            self.assertIsNone(cache.get(3, 'stations', None))
+            self.assertIsNotNone(cache.get(1, 'stations', None))
+        self.assertEqual(cache.stats.expirations, 1)
+
+        cache.invalidate(1024, 'albums')
+        self.assertEqual(len(cache), 2)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.invalidations, 3)
+
+    def test_shared_between_instances(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.containers[('1024', 'albums')] = [
+                    {'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'name': f'Track {i}'} for i in range(120)]
+                device.page_size = 50
+
+                cache = BrowseCache()
+                first = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, browse_cache=cache)
+                second = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, browse_cache=cache)
+                await first.connect()
+                await second.connect(enable_event_connection=False)
+                try:
+                    browse = lambda: len([command for command, _ in device.commands if command == 'browse/browse'])
+
+                    await first.api.browse.browse_source_container(1024, 'albums')
+                    results = await second.api.browse.browse_source_container(1024, 'albums')
+                    self.assertEqual(browse(), 3)
+
+                    device.emit_event('sources_changed')
+                    await wait_for(lambda: len(cache) == 0)
+                    await second.api.browse.browse_source_container(1024, 'albums')
+
+                    return results, browse(), cache.stats
+                finally:
+                    first.close()
+                    second.close()
+
+        results, browse_commands, stats = _async_run(run())
+        self.assertEqual(len(results), 120)
+        self.assertEqual(browse_commands, 6)
+        self.assertEqual(stats.hits, 3)
+
+    def test_shared_caches_are_dropped_once_unused(self):
+        system = ('127.0.0.9', 1255)
+        cache = BrowseCache.shared(system)
+        self.assertIs(BrowseCache.shared(system), cache)
+
+        del cache
+        gc.collect()
+        self.assertNotIn(system, BrowseCache._shared)
+
+    @patch.dict(BrowseCache._shared, clear=True)
+    def test_shared_per_system(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                other = FakeHEOSDevice('127.0.0.2', device.port)
+                await other.start()
+                try:
+                    for fake, prefix in ((device, 'Track'), (other, 'Song')):
+                        fake.containers[('1024', 'albums')] = [
+                            {'container': 'no', 'type': 'song', 'mid': f'{prefix}-{i}', 'name': f'{prefix} {i}'}
+                            for i in range(10)]
+
+                    first = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, browse_cache=True)
+                    second = pytheos.Pytheos(other.host, other.port, heartbeat_interval=None, browse_cache=True)
+                    await first.connect()
+                    await second.connect()
+                    try:
+                        first_results = await first.api.browse.browse_source_container(1024, 'albums')
+                        second_results = await second.api.browse.browse_source_container(1024, 'albums')
+
+                        first_cache, second_cache = first.api.browse.cache, second.api.browse.cache
+                        self.assertIsNot(first_cache, second_cache)
+                        self.assertIs(first_cache, BrowseCache.shared((device.host, device.port)))
+
+                        # A change on one system leaves what is cached for the other alone
+                        other.emit_event('sources_changed')
+                        await wait_for(lambda: len(second_cache) == 0)
+                        self.assertEqual(len(first_cache), 1)
+
+                        return first_results, second_results
+                    finally:
+                        first.close()
+                        second.close()
+                finally:
+                    await other.stop()
+
+        first_results, second_results = _async_run(run())
+        self.assertEqual([item.name for item in first_results], [f'Track {i}' for i in range(10)])
+        self.assertEqual([item.name for item in second_results], [f'Song {i}' for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
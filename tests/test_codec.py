@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import unittest
+
+from pytheos.models.heos import HEOSEvent
+from pytheos.networking.codec import CODECS, JSONCodec, get_codec
+
+MESSAGE = b'{"heos": {"command": "player/get_volume", "result": "success", "message": "pid=1&level=10"}}'
+
+
+class TestCodec(unittest.TestCase):
+    def test_available_codecs(self):
+        for name, codec_class in CODECS.items():
+            if not codec_class.available():
+                continue
+
+            codec = get_codec(name)
+            self.assertEqual(codec.name, name)
+
+            decoded = codec.loads(MESSAGE)
+            self.assertEqual(decoded['heos']['message'], 'pid=1&level=10')
+            self.assertEqual(codec.loads(memoryview(MESSAGE)), decoded)
+            self.assertEqual(codec.loads(codec.dumps(decoded)), decoded)
+
+    def test_default_codec(self):
+        preferred = get_codec()
+        self.assertTrue(preferred.available())
+        self.assertIs(get_codec(preferred), preferred)
+
+    def test_stdlib_fallback(self):
+        self.assertIsInstance(get_codec('json'), JSONCodec)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            get_codec('yaml')
+
+    def test_event_raw_is_lazy(self):
+        event = HEOSEvent(get_codec().loads(MESSAGE))
+        self.assertIsNone(event._raw)
+        self.assertEqual(get_codec('json').loads(str(event).encode('utf-8'))['heos']['command'], 'player/get_volume')
+
+    def test_event_raw_uses_codec(self):
+        class _Codec(JSONCodec):
+            def dumps(self, obj):
+                return b'encoded'
+
+        event = HEOSEvent(get_codec().loads(MESSAGE), _Codec())
+        self.assertEqual(event.raw, 'encoded')
+        self.assertEqual(repr(event), '<HEOSEvent(command="player/get_volume", message="pid=1&level=10")>')
+        self.assertEqual(event, HEOSEvent(get_codec('json').loads(MESSAGE)))
+        self.assertNotEqual(event, HEOSEvent(get_codec().loads(MESSAGE.replace(b'level=10', b'level=20'))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+import unittest.mock
+from unittest.mock import patch
+
+import pytheos
+import pytheos.networking.connection
+from pytheos.networking.connection import Connection
+from pytheos.models.heos import ResponseShape
+from pytheos.networking.errors import CommandTimeoutError, MessageTooLargeError
+from pytheos.networking.streaming import StreamedMessage
+from tests.fake_device import FakeHEOSDevice
+
+TEST_PLAYER_ID = 12345678
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _response(command, result='success', **kwargs):
+    return {
+        'heos': {
+            'command': command,
+            'result': result,
+            'message': '&'.join('='.join((k, str(v))) for k, v in kwargs.items())
+        }
+    }
+
+
+class TestConnection(unittest.TestCase):
+    def setUp(self):
+        self._connection = Connection()
+        self._connection.send_command = unittest.mock.MagicMock()
+
+    def test_pipelined_calls_receive_their_own_responses(self):
+        responses = [
+            _response('player/get_volume', pid=2, level=20),
+            _response('player/get_mute', pid=1, state='on'),
+            _response('player/get_volume', pid=1, level=10),
+        ]
+
+        async def read_message(*args, **kwargs):
+            await asyncio.sleep(0)      # Give the other callers a chance to submit their commands
+            return responses.pop(0)
+
+        async def run():
+            return await asyncio.gather(
+                self._connection.player.get_volume(1),
+                self._connection.player.get_volume(2),
+                self._connection.player.get_mute(1),
+            )
+
+        with patch.object(pytheos.networking.connection.Connection, 'read_message', side_effect=read_message):
+            volume_1, volume_2, mute_1 = _async_run(run())
+
+        self.assertEqual(volume_1, 10)
+        self.assertEqual(volume_2, 20)
+        self.assertTrue(mute_1)
+        self.assertEqual(self._connection.send_command.call_count, 3)
+        self.assertEqual(len(self._connection._multiplexer), 0)
+
+    def test_messages_for_other_commands_are_dropped(self):
+        responses = [
+            {'heos': {'command': 'event/players_changed', 'message': ''}},
+            _response('browse/play_url', pid=TEST_PLAYER_ID),
+            _response('player/get_volume', pid=TEST_PLAYER_ID, level=20),
+        ]
+
+        async def read_message(*args, **kwargs):
+            return responses.pop(0)
+
+        with patch.object(pytheos.networking.connection.Connection, 'read_message', side_effect=read_message):
+            volume = _async_run(self._connection.player.get_volume(TEST_PLAYER_ID))
+
+        self.assertEqual(volume, 20)
+        self.assertEqual(responses, [])
+
+    def test_header_only_response_skips_payload(self):
+        response = dict(_response('player/get_volume', pid=TEST_PLAYER_ID, level=20), payload=[{'ignored': True}])
+        with patch.object(pytheos.networking.connection.Connection, 'read_message', return_value=response):
+            result = _async_run(self._connection.call('player', 'get_volume', shape=ResponseShape.Header,
+                                                      pid=TEST_PLAYER_ID))
+
+        self.assertEqual(result.header.vars['level'], '20')
+        self.assertIsNone(result.payload)
+        self._connection.send_command.assert_called_with('player', 'get_volume', pid=TEST_PLAYER_ID)
+
+    def test_calls_against_device(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    await asyncio.gather(*[connection.system.heart_beat() for _ in range(10)])
+                    return await connection.player.get_players()
+                finally:
+                    connection.close()
+
+        players = _async_run(run())
+        self.assertEqual(players[0].name, 'Living Room')
+
+    def test_payload_is_decoded_lazily(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    connection.send_command('player', 'get_players')
+                    return await connection.read_message()
+                finally:
+                    connection.close()
+
+        response = _async_run(run())
+        self.assertIsInstance(response, StreamedMessage)
+        self.assertIsNone(response._decoded)
+
+    def test_header_only_calls_leave_the_payload_undecoded(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    return await connection.call('player', 'get_players', shape=ResponseShape.Header)
+                finally:
+                    connection.close()
+
+        with patch.object(StreamedMessage, '_decode', autospec=True, side_effect=StreamedMessage._decode) as decode:
+            result = _async_run(run())
+
+        decode.assert_not_called()
+        self.assertTrue(result.succeeded)
+        self.assertIsNone(result.payload)
+
+    def test_large_payloads_are_streamed_into_models(self):
+        def get_queue(params):
+            items = [{'song': f'Song {qid}', 'album': 'Album', 'artist': 'Artist' * 200, 'image_url': '',
+                      'qid': qid, 'mid': f'track-{qid}', 'album_id': '1'} for qid in range(1, 101)]
+            return f'pid={params["pid"]}&range=0,99&returned=100&count=100', items
+
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.set_handler('player/get_queue', get_queue)
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    return await connection.player.get_queue(TEST_PLAYER_ID)
+                finally:
+                    connection.close()
+
+        # The payload is far over STREAM_PAYLOAD_SIZE, so the models are built without ever decoding it whole
+        with patch.object(StreamedMessage, '_decode', autospec=True, side_effect=StreamedMessage._decode) as decode:
+            queue = _async_run(run())
+
+        decode.assert_not_called()
+        self.assertEqual([item.song for item in queue], [f'Song {qid}' for qid in range(1, 101)])
+
+    def test_delayed_command_does_not_block_other_calls(self):
+        async def run(delayed_response_timeout):
+            async with FakeHEOSDevice() as device:
+                device.delays['browse/get_source_info'] = 0.3
+
+                connection = Connection(delayed_response_timeout=delayed_response_timeout)
+                connection.MESSAGE_READ_TIMEOUT = 0.1
+                await connection.connect(device.host, device.port)
+                try:
+                    loop = asyncio.get_running_loop()
+                    started = loop.time()
+                    slow = loop.create_task(connection.call('browse', 'get_source_info', sid=1024))
+                    await asyncio.sleep(0.05)
+
+                    for _ in range(5):
+                        await connection.system.heart_beat()
+                    heartbeats_done = loop.time() - started
+
+                    return await slow, heartbeats_done
+                finally:
+                    connection.close()
+
+        result, heartbeats_done = _async_run(run(1))
+        self.assertEqual(result.header.vars['sid'], '1024')
+        self.assertLess(heartbeats_done, 0.3)
+
+        with self.assertRaises(CommandTimeoutError):
+            _async_run(run(0.1))
+
+    def test_timeouts_and_late_responses(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.delays['player/get_volume'] = 0.2
+                device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    with self.assertRaises(CommandTimeoutError) as context:
+                        await connection.call('player', 'get_volume', pid=1, timeout=0.05)
+                    self.assertEqual(context.exception.command, 'player/get_volume')
+
+                    # Cancel a call outright; its late response must not be handed to the next caller.
+                    task = asyncio.ensure_future(connection.call('player', 'get_volume', pid=2))
+                    await asyncio.sleep(0.05)
+                    task.cancel()
+
+                    del device.delays['player/get_volume']
+                    await asyncio.sleep(0.3)
+                    return await connection.call('player', 'get_volume', pid=3)
+                finally:
+                    connection.close()
+
+        result = _async_run(run())
+        self.assertEqual(result.header.vars['pid'], '3')
+
+    def test_large_browse_results(self):
+        source_id, container_id = 1024, 'library'
+        items = [{'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'Track {i}',
+                  'image_url': ''} for i in range(2000)]
+
+        async def run(max_message_size):
+            async with FakeHEOSDevice() as device:
+                device.containers[(str(source_id), container_id)] = items
+                device.set_handler('player/get_queue', lambda params: ('', [{'qid': 1, 'song': 'x'}]))
+
+                connection = Connection(max_message_size)
+                await connection.connect(device.host, device.port)
+                try:
+                    results = await asyncio.gather(
+                        connection.browse.browse_source_container(source_id, container_id, (0, 1999)),
+                        connection.player.get_queue(1),
+                        return_exceptions=True)
+                finally:
+                    connection.close()
+
+            return results
+
+        browsed, queue = _async_run(run(Connection.MAX_MESSAGE_SIZE))
+        self.assertEqual(len(browsed), 2000)
+        self.assertEqual(browsed[-1].media_id, 'track-1999')
+        self.assertEqual(browsed[-1].container_id, container_id)
+        self.assertEqual(queue[0].queue_id, 1)
+
+        browsed, queue = _async_run(run(64 * 1024))
+        self.assertIsInstance(browsed, MessageTooLargeError)
+        self.assertEqual(browsed.header['command'], 'browse/browse')
+        self.assertEqual(queue[0].queue_id, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
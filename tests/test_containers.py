@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.controllers import Source
+from pytheos.controllers.containers import MediaContainer, MediaItem
+from pytheos.errors import ItemNotLoadedError
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+SOURCE_ID, CONTAINER_ID = 1024, 'tracks'
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _browse_commands(device: FakeHEOSDevice) -> list:
+    return [params.get('range') for command, params in device.commands if command == 'browse/browse']
+
+
+def _populate(device: FakeHEOSDevice, count: int):
+    device.page_size = 50
+    device.containers[(str(SOURCE_ID), None)] = [
+        {'container': 'yes', 'type': 'container', 'cid': CONTAINER_ID, 'playable': 'no', 'name': 'Tracks',
+         'image_url': ''}]
+    device.containers[(str(SOURCE_ID), CONTAINER_ID)] = [
+        {'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'Track {i}',
+         'image_url': ''} for i in range(count)]
+
+
+async def _open_container(device: FakeHEOSDevice) -> tuple:
+    conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+    await conn.connect(enable_event_connection=False)
+
+    source: Source = conn._sources[SOURCE_ID]
+    container = await source.get(0)
+    device.commands.clear()
+
+    return conn, container
+
+
+class TestPagedContainers(unittest.TestCase):
+    def test_only_touched_pages_are_retrieved(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _populate(device, 20000)
+                conn, container = await _open_container(device)
+                try:
+                    self.assertIsInstance(container, MediaContainer)
+                    with self.assertRaises(ItemNotLoadedError):
+                        len(container)
+
+                    self.assertEqual(await container.get_count(), 20000)
+                    self.assertEqual(len(container), 20000)
+
+                    item = await container.get(10510)
+                    self.assertIsInstance(item, MediaItem)
+                    self.assertIs(container[10510], item)
+                    with self.assertRaises(ItemNotLoadedError):
+                        container[5000]
+                    with self.assertRaises(IndexError):
+                        await container.get(20000)
+
+                    items = await container.get(slice(90, 160))
+                    last = await container.get(-1)
+
+                    return _browse_commands(device), items, last
+                finally:
+                    conn.close()
+
+        ranges, items, last = _async_run(run())
+        self.assertEqual(ranges, ['0,49', '10500,10549', '50,99', '100,149', '150,199', '19950,19999'])
+        self.assertEqual([item.id for item in items], [f'track-{i}' for i in range(90, 160)])
+        self.assertEqual(last.id, 'track-19999')
+
+    def test_sequential_scans_read_ahead_and_evict(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _populate(device, 1000)
+                conn, container = await _open_container(device)
+                try:
+                    container._items.max_pages = 4
+
+                    await container.get(0)
+                    await container.get(50)
+                    await wait_for(lambda: len(_browse_commands(device)) == 4)
+                    read_ahead = _browse_commands(device)
+
+                    names = [item.name async for item in container]
+                    return read_ahead, names, container._items
+                finally:
+                    conn.close()
+
+        read_ahead, names, items = _async_run(run())
+        self.assertEqual(read_ahead, ['0,49', '50,99', '100,149', '150,199'])
+        self.assertEqual(names, [f'Track {i}' for i in range(1000)])
+        self.assertLessEqual(items.resident_pages, 4)
+        self.assertEqual(items.pages_loaded, 20)   # Each page once, with no more than four kept at a time
+
+    def test_slices_wider_than_the_kept_pages(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _populate(device, 300)
+                conn, container = await _open_container(device)
+                try:
+                    container._items.max_pages = 2
+
+                    return await container.get(slice(10, 260)), container._items
+                finally:
+                    conn.close()
+
+        items, paged = _async_run(run())
+        self.assertEqual([item.id for item in items], [f'track-{i}' for i in range(10, 260)])
+        self.assertEqual(paged.resident_pages, 2)
+
+    def test_sequence_use(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _populate(device, 120)
+                conn, container = await _open_container(device)
+                try:
+                    container._items.max_pages = 2
+                    self.assertFalse(container)
+                    self.assertNotIn(None, container)
+
+                    await container.refresh()
+                    self.assertTrue(container)
+                    self.assertEqual(len(container), 120)
+                    with self.assertRaises(ItemNotLoadedError):
+                        list(container)
+
+                    await container.refresh(all_pages=True)
+                    names = [item.name for item in container]
+                    last = next(reversed(container))
+                    self.assertIn(last, container)
+                    self.assertEqual(container.count(last), 1)
+
+                    return names, last, container._items
+                finally:
+                    conn.close()
+
+        names, last, items = _async_run(run())
+        self.assertEqual(names, [f'Track {i}' for i in range(120)])
+        self.assertEqual(last.name, 'Track 119')
+        self.assertEqual(items.resident_pages, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.networking.errors import ChannelUnavailableError, CommandTimeoutError
+from pytheos.supervisor import Backoff
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _volume_handler(params):
+    return f'pid={params["pid"]}&level=10', None
+
+
+class TestFailover(unittest.TestCase):
+    def test_fails_over_to_the_standby(self):
+        async def run():
+            async with FakeHEOSDevice() as primary, FakeHEOSDevice() as standby:
+                for device in (primary, standby):
+                    device.set_handler('player/get_volume', _volume_handler)
+
+                conn = pytheos.Pytheos(primary.host, primary.port, heartbeat_interval=0.05, failover=True,
+                                       standby_hosts=[(standby.host, standby.port)])
+                conn.supervisor.backoff = Backoff(initial=5)    # Make sure we don't simply reconnect
+
+                received = []
+
+                async def on_event(event):
+                    received.append(event)
+
+                conn.subscribe('event/players_changed', on_event)
+
+                await conn.connect()
+                try:
+                    player = conn._players[0]
+                    self.assertTrue(conn.api.standby_ready)
+
+                    primary.latency = 0.5
+                    idempotent = asyncio.ensure_future(conn.api.player.get_volume(1))
+                    non_idempotent = asyncio.ensure_future(conn.api.player.volume_up(1))
+                    await asyncio.sleep(0.05)
+
+                    await primary.stop()
+                    volume = await asyncio.wait_for(idempotent, 1)
+                    with self.assertRaises(ChannelUnavailableError):
+                        await non_idempotent
+
+                    await wait_for(lambda: conn.supervisor.stats.disconnects == 1 and conn._event_task)
+                    standby.emit_event('players_changed')
+                    await wait_for(lambda: received)
+
+                    return volume, conn.port, standby.port, conn.api.stats, player, conn._players
+                finally:
+                    conn.close()
+
+        volume, port, standby_port, stats, player, players = _async_run(run())
+        self.assertEqual(volume, 10)
+        self.assertEqual(port, standby_port)
+        self.assertEqual(stats.failovers, 1)
+        self.assertEqual(stats.replayed, 1)
+        self.assertLess(stats.switch_time.max, 1)
+        self.assertIs(players[0], player)
+
+    def test_fails_over_from_a_silent_speaker(self):
+        async def run():
+            async with FakeHEOSDevice() as primary, FakeHEOSDevice() as standby:
+                for device in (primary, standby):
+                    device.set_handler('player/get_volume', _volume_handler)
+
+                conn = pytheos.Pytheos(primary.host, primary.port, heartbeat_interval=30, failover=True,
+                                       standby_hosts=[(standby.host, standby.port)])
+                conn.supervisor.backoff = Backoff(initial=5)    # Make sure we don't simply reconnect
+                conn.api.PROBE_TIMEOUT = 0.2
+
+                await conn.connect()
+                try:
+                    # A command that is merely slow times out without failing over, since the speaker still answers
+                    primary.delays['player/get_volume'] = 1
+                    with self.assertRaises(CommandTimeoutError):
+                        await conn.api.call('player', 'get_volume', pid=1, timeout=0.2)
+                    self.assertEqual(conn.api.stats.failovers, 0)
+
+                    # A speaker that stops answering without closing the connection is failed over from
+                    del primary.delays['player/get_volume']
+                    primary.latency = 30
+                    started = asyncio.get_running_loop().time()
+                    results = await conn.api.call('player', 'get_volume', pid=1, timeout=0.2)
+                    elapsed = asyncio.get_running_loop().time() - started
+
+                    return results, elapsed, conn.port, standby.port, conn.api.stats
+                finally:
+                    conn.close()
+
+        results, elapsed, port, standby_port, stats = _async_run(run())
+        self.assertEqual(results.header.vars['level'], '10')
+        self.assertLess(elapsed, 2)
+        self.assertEqual(port, standby_port)
+        self.assertEqual((stats.failovers, stats.replayed), (1, 1))
+
+    def test_reconnects_without_a_standby(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=0.05, failover=True,
+                                       standby_hosts=[])
+                conn.supervisor.backoff = Backoff(initial=0.01, maximum=0.05)
+                await conn.connect()
+                try:
+                    self.assertFalse(conn.api.standby_ready)
+                    device.drop_clients()
+                    await wait_for(lambda: conn.supervisor.stats.reconnects == 1)
+
+                    return conn.api.stats
+                finally:
+                    conn.close()
+
+        self.assertEqual(_async_run(run()).failovers, 0)
+
+    def test_standby_without_refreshing(self):
+        async def run():
+            async with FakeHEOSDevice() as primary, FakeHEOSDevice() as standby:
+                results = []
+                for kwargs, connect_kwargs in (({'lazy': True}, {}), ({}, {'refresh': False})):
+                    conn = pytheos.Pytheos(primary.host, primary.port, heartbeat_interval=None, failover=True,
+                                           standby_hosts=[(standby.host, standby.port)], **kwargs)
+                    await conn.connect(**connect_kwargs)
+                    try:
+                        results.append((conn.api.standby_ready, conn._players))
+                    finally:
+                        conn.close()
+
+                return results
+
+        for standby_ready, players in _async_run(run()):
+            self.assertTrue(standby_ready)
+            self.assertEqual(players, [])
+
+    def test_no_standby_hosts_means_no_standby(self):
+        async def run():
+            async with FakeHEOSDevice() as primary, FakeHEOSDevice() as other:
+                conn = pytheos.Pytheos([(primary.host, primary.port), (other.host, other.port)],
+                                       heartbeat_interval=None, failover=True, standby_hosts=[])
+                await conn.connect()
+                try:
+                    return conn.api.standby_ready, conn.api.candidates
+                finally:
+                    conn.close()
+
+        standby_ready, candidates = _async_run(run())
+        self.assertFalse(standby_ready)
+        self.assertEqual(candidates, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
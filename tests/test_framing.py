@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+import unittest.mock
+
+from pytheos.networking.errors import ChannelUnavailableError
+from pytheos.networking.framing import MessageFramer, HEOSProtocol, OversizedMessage
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class TestMessageFramer(unittest.TestCase):
+    def setUp(self):
+        self._framer = MessageFramer()
+
+    def test_multiple_messages_per_read(self):
+        self.assertEqual(self._framer.feed(b'{"a": 1}\r\n{"b": 2}\r\n{"c"'), [b'{"a": 1}', b'{"b": 2}'])
+        self.assertEqual(self._framer.feed(b': 3}\r\n'), [b'{"c": 3}'])
+        self.assertEqual(len(self._framer), 0)
+
+    def test_message_split_across_reads(self):
+        self.assertEqual(self._framer.feed(b'{"a":'), [])
+        self.assertEqual(self._framer.feed(b' 1}'), [])
+        self.assertEqual(self._framer.feed(b'\r\n'), [b'{"a": 1}'])
+
+    def test_delimiter_split_across_reads(self):
+        self.assertEqual(self._framer.feed(b'{"a": 1}\r'), [])
+        self.assertEqual(self._framer.feed(b'\n{"b": 2}\r\n'), [b'{"a": 1}', b'{"b": 2}'])
+
+    def test_empty_messages_are_skipped(self):
+        self.assertEqual(self._framer.feed(b'\r\n\r\n{"a": 1}\r\n\r\n'), [b'{"a": 1}'])
+
+    def test_oversized_message(self):
+        framer = MessageFramer(max_message_size=16)
+
+        messages = framer.feed(b'{"a": 1}\r\n{"heos": {"command": "x"}, ')
+        self.assertEqual(messages[0], b'{"a": 1}')
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(framer.feed(b'"payload": [1, 2, 3]}\r'), [])
+        self.assertLessEqual(len(framer), 1)
+
+        messages = framer.feed(b'\n{"b": 2}\r\n')
+        self.assertIsInstance(messages[0], OversizedMessage)
+        self.assertTrue(messages[0].head.startswith(b'{"heos": {"command": "x"}'))
+        self.assertEqual(messages[0].size, len(b'{"heos": {"command": "x"}, "payload": [1, 2, 3]}'))
+        self.assertEqual(messages[1], b'{"b": 2}')
+
+    def test_oversized_message_in_single_read(self):
+        framer = MessageFramer(max_message_size=4)
+        messages = framer.feed(b'{"a": 1}\r\n{}\r\n')
+        self.assertIsInstance(messages[0], OversizedMessage)
+        self.assertEqual(messages[1], b'{}')
+
+
+class TestHEOSProtocol(unittest.TestCase):
+    def setUp(self):
+        self._protocol = HEOSProtocol()
+        self._protocol.connection_made(unittest.mock.MagicMock())
+
+    def test_read_frame(self):
+        self._protocol.data_received(b'{"a": 1}\r\n{"b": 2}\r\n')
+        self.assertEqual(_async_run(self._protocol.read_frame(1)), b'{"a": 1}')
+        self.assertEqual(_async_run(self._protocol.read_frame(1)), b'{"b": 2}')
+
+    def test_read_frame_waits_for_data(self):
+        async def run():
+            asyncio.get_running_loop().call_later(0.01, self._protocol.data_received, b'{"a": 1}\r\n')
+            return await self._protocol.read_frame(1)
+
+        self.assertEqual(_async_run(run()), b'{"a": 1}')
+
+    def test_read_frame_timeout(self):
+        self.assertIsNone(_async_run(self._protocol.read_frame(0.01)))
+
+    def test_read_frame_connection_lost(self):
+        self._protocol.data_received(b'{"a": 1}\r\n')
+        self._protocol.connection_lost(None)
+
+        self.assertEqual(_async_run(self._protocol.read_frame(1)), b'{"a": 1}')
+        with self.assertRaises(ChannelUnavailableError):
+            _async_run(self._protocol.read_frame(1))
+
+    def test_flow_control(self):
+        transport = self._protocol._transport
+        self._protocol.data_received(b'{}\r\n' * HEOSProtocol.MAX_BUFFERED_FRAMES)
+        transport.pause_reading.assert_called_once()
+
+        for _ in range(HEOSProtocol.MAX_BUFFERED_FRAMES // 2 + 1):
+            _async_run(self._protocol.read_frame(1))
+        transport.resume_reading.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
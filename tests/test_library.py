@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import pytheos
+from pytheos import models
+from pytheos.api.library import LibraryStore
+from tests.fake_device import FakeHEOSDevice
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _tracks(start: int, count: int, prefix: str='Track') -> list:
+    return [{'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'{prefix} {i}',
+             'artist': 'Artist', 'album': 'Album'} for i in range(start, start + count)]
+
+
+def _items(start: int, count: int, prefix: str='Track') -> list:
+    return [models.Source(track, parent_source_id=1024, parent_container_id='albums')
+            for track in _tracks(start, count, prefix)]
+
+
+class TestLibraryStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'library.db')
+        self._store = LibraryStore(self._path, max_age=60)
+
+    def tearDown(self) -> None:
+        self._store.close()
+        self._directory.cleanup()
+
+    def test_persists_between_stores(self):
+        self._store.put(1024, 'albums', (0, 49), 60, _items(0, 50))
+        self._store.put(1024, 'albums', (50, 99), 60, _items(50, 10))
+        self._store.put(1026, None, None, 1, _items(0, 1))     # History isn't stored
+        self._store.close()
+
+        self._store = LibraryStore(self._path, max_age=60)
+        self.assertEqual(len(self._store), 1)
+        self.assertEqual(self._store.get(1024, 'albums', (50, 99)), (60, _items(50, 10)))
+        self.assertEqual(self._store.get('1024', 'albums', None), (60, _items(0, 50)))
+        self.assertEqual(self._store.get(1024, 'albums', (100, 149)), (60, []))
+        self.assertIsNone(self._store.get(1024, 'artists', None))
+        self.assertEqual((self._store.stats.hits, self._store.stats.misses), (3, 1))
+
+    def test_stale_containers_are_revalidated(self):
+        self._store.put(1024, 'albums', (0, 49), 60, _items(0, 50))
+        self._store.put(1024, 'albums', (50, 99), 60, _items(50, 10))
+
+        later = time.time() + 120
+        with patch('pytheos.api.library.time.time', return_value=later):
+            self.assertIsNone(self._store.get(1024, 'albums', (0, 49)))
+            self.assertIsNotNone(self._store.get(1024, 'albums', (0, 49), stale=True))
+
+            # Nothing changed in the first page, so the whole container is current again
+            self._store.put(1024, 'albums', (0, 49), 60, _items(0, 50))
+            self.assertIsNotNone(self._store.get(1024, 'albums', (50, 99)))
+
+        self._store.expire(1024)
+        self._store.put(1024, 'albums', (0, 49), 60, _items(0, 50, 'Song'))
+        self.assertIsNotNone(self._store.get(1024, 'albums', (0, 49)))
+        self.assertIsNone(self._store.get(1024, 'albums', (50, 99)))
+        self.assertEqual(self._store.stats.invalidations, 1)
+        self.assertEqual(self._store.stats.expirations, 1)
+
+    def test_other_versions_are_discarded(self):
+        self._store.put(1024, 'albums', None, 1, _items(0, 1))
+        self._store.close()
+
+        db = sqlite3.connect(self._path)
+        db.execute('PRAGMA user_version = 1000')
+        db.close()
+
+        self._store = LibraryStore(self._path)
+        self.assertEqual(len(self._store), 0)
+
+    def test_queries_run_off_the_event_loop(self):
+        threads = []
+        get = self._store.get
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return get(*args, **kwargs)
+
+        async def run():
+            await self._store.put_async(1024, 'albums', (0, 49), 60, _items(0, 50))
+            with patch.object(self._store, 'get', side_effect=record):
+                return await self._store.get_async(1024, 'albums', (0, 49))
+
+        self.assertEqual(_async_run(run()), (60, _items(0, 50)))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_reopens_after_closing(self):
+        self._store.put(1024, 'albums', (0, 49), 60, _items(0, 50))
+        self._store.close()
+
+        self.assertIsNone(self._store._db)
+        self.assertEqual(self._store.get(1024, 'albums', (0, 49)), (60, _items(0, 50)))
+
+
+class TestLibraryBrowsing(unittest.TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'library.db')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_restart_and_offline(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.containers[('1024', 'albums')] = _tracks(0, 120)
+                device.page_size = 50
+                browse = lambda: len([command for command, _ in device.commands if command == 'browse/browse'])
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, library_path=self._path)
+                await conn.connect(enable_event_connection=False)
+                await conn.api.browse.browse_source_container(1024, 'albums')
+                conn.close()
+                self.assertEqual(browse(), 3)
+                self.assertIsNone(conn._library._db)
+
+                # A restart is answered entirely from the store
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, library_path=self._path)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    restarted = await conn.api.browse.browse_source_container(1024, 'albums')
+                    self.assertEqual(browse(), 3)
+                finally:
+                    conn.close()
+
+            # As is browsing once the system can't be reached, however old the results are
+            conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, library_path=self._path)
+            conn._library.expire()
+            try:
+                offline = await conn.api.browse.browse_source_container(1024, 'albums')
+            finally:
+                conn.close()
+
+            return restarted, offline
+
+        restarted, offline = _async_run(run())
+        self.assertEqual([item.name for item in restarted], [f'Track {i}' for i in range(120)])
+        self.assertEqual(offline, restarted)
+
+
+if __name__ == '__main__':
+    unittest.main()
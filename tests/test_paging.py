@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from pytheos.networking.connection import Connection
+from tests.fake_device import FakeHEOSDevice
+
+SOURCE_ID, CONTAINER_ID = 1024, 'library'
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _items(count: int, first: int=0) -> list:
+    return [{'container': 'no', 'type': 'song', 'mid': f'track-{i}', 'playable': 'yes', 'name': f'Track {i}',
+             'image_url': ''} for i in range(first, first + count)]
+
+
+async def _browse(device: FakeHEOSDevice, concurrency: int, search: bool=False) -> list:
+    connection = Connection()
+    await connection.connect(device.host, device.port)
+    try:
+        if search:
+            return await connection.browse.search(SOURCE_ID, 'track', 1, concurrency=concurrency)
+
+        return await connection.browse.browse_source_container(SOURCE_ID, CONTAINER_ID, concurrency=concurrency)
+    finally:
+        connection.close()
+
+
+class TestParallelPaging(unittest.TestCase):
+    def _assert_in_order(self, results: list, count: int):
+        self.assertEqual([item.media_id for item in results], [f'track-{i}' for i in range(count)])
+
+    def test_pages_are_reassembled_in_order(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.containers[(str(SOURCE_ID), CONTAINER_ID)] = _items(1234)
+                device.page_size = 50
+                return await _browse(device, 8), device.commands
+
+        results, commands = _async_run(run())
+        self._assert_in_order(results, 1234)
+        self.assertEqual(len(commands), 25)
+        self.assertEqual(commands[1][1]['range'], '50,99')
+        self.assertEqual(commands[-1][1]['range'], '1200,1233')
+
+    def test_short_pages(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.containers[(str(SOURCE_ID), CONTAINER_ID)] = _items(500)
+                device.page_size = 30
+                return await _browse(device, 4)
+
+        self._assert_in_order(_async_run(run()), 500)
+
+    def test_count_changes_while_paging(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                items = device.containers[(str(SOURCE_ID), CONTAINER_ID)] = _items(200)
+                device.page_size = 50
+
+                def grow(params):
+                    response = device._browse(params)
+                    if len(items) == 200:
+                        items.extend(_items(80, 200))
+                    return response
+
+                device.set_handler('browse/browse', grow)
+                grown = await _browse(device, 4)
+
+                del items[150:]
+                device.set_handler('browse/browse', device._browse)
+                device.latency = 0.05
+                task = asyncio.ensure_future(_browse(device, 2))
+                await asyncio.sleep(0.125)    # Between the second and third pages
+                del items[100:]
+
+                return grown, await task
+
+        grown, shrunk = _async_run(run())
+        self._assert_in_order(grown, 280)
+        self._assert_in_order(shrunk, 100)
+
+    def test_search(self):
+        items = _items(321)
+
+        def search(params):
+            start, end = [int(itm) for itm in params.get('range', '0,49').split(',')]
+            page = items[start:min(end, start + 49) + 1]
+            return f'sid={params["sid"]}&returned={len(page)}&count={len(items)}', page
+
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.set_handler('browse/search', search)
+                return await _browse(device, 4, search=True)
+
+        self._assert_in_order(_async_run(run()), 321)
+
+
+class TestIterators(unittest.TestCase):
+    def test_items_are_yielded_as_pages_arrive(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.01) as device:
+                device.containers[(str(SOURCE_ID), CONTAINER_ID)] = _items(275)
+                device.page_size = 50
+
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    results = []
+                    requested = []
+                    async for item in connection.browse.iter_source_container(SOURCE_ID, CONTAINER_ID):
+                        if len(results) == 49:
+                            await asyncio.sleep(0.005)  # Give the prefetch a moment to reach the device
+                        results.append(item)
+                        requested.append(len(device.commands))
+
+                    return results, requested
+                finally:
+                    connection.close()
+
+        results, requested = _async_run(run())
+        self.assertEqual([item.media_id for item in results], [f'track-{i}' for i in range(275)])
+        self.assertEqual(requested[0], 1)
+        self.assertEqual(requested[49], 2)  # The second page was requested while the first was being consumed
+        self.assertEqual(requested[-1], 6)
+
+    def test_stopping_early(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.05) as device:
+                device.containers[(str(SOURCE_ID), CONTAINER_ID)] = _items(1000)
+                device.page_size = 50
+
+                connection = Connection()
+                await connection.connect(device.host, device.port)
+                try:
+                    iterator = connection.browse.iter_source_container(SOURCE_ID, CONTAINER_ID)
+                    async for item in iterator:
+                        if item.media_id == 'track-60':
+                            await asyncio.sleep(0.01)   # Let the prefetch of the third page reach the device
+                            break
+                    await iterator.aclose()
+                    await asyncio.sleep(0)
+                    outstanding = connection.outstanding
+
+                    sources = [source async for source in connection.browse.iter_music_sources()]
+                    return len(device.commands), outstanding, sources
+                finally:
+                    connection.close()
+
+        commands, outstanding, sources = _async_run(run())
+        self.assertEqual(outstanding, 0)    # The prefetch of the next page was cancelled
+        self.assertEqual(commands, 4)   # Three pages of the container, then the music sources
+        self.assertEqual(sources[0].source_id, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.networking.errors import ChannelUnavailableError
+from pytheos.networking.pool import DevicePool, is_read_only
+from tests.fake_device import FakeHEOSDevice
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _volume_handler(params):
+    return f'pid={params["pid"]}&level=10', None
+
+
+class TestDevicePool(unittest.TestCase):
+    def test_is_read_only(self):
+        self.assertTrue(is_read_only('player/get_volume'))
+        self.assertTrue(is_read_only('browse/browse'))
+        self.assertTrue(is_read_only('system/check_account'))
+        self.assertFalse(is_read_only('player/set_volume'))
+        self.assertFalse(is_read_only('browse/add_to_queue'))
+
+    def test_routes_to_the_fastest_device(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.05) as slow, FakeHEOSDevice(latency=0.001) as fast:
+                for device in (slow, fast):
+                    device.set_handler('player/get_volume', _volume_handler)
+
+                pool = DevicePool()
+                await pool.connect(slow.host, slow.port)
+                try:
+                    added = await pool.add_hosts([(fast.host, fast.port), (slow.host, slow.port)])
+                    await pool.probe(pool.members[0])
+
+                    await asyncio.gather(*[pool.player.get_volume(1) for _ in range(20)])
+                    await pool.player.set_volume(1, 20)
+
+                    return added, pool.members, pool.primary
+                finally:
+                    pool.close()
+
+        added, (slow, fast), primary = _async_run(run())
+        self.assertEqual(added, [fast])
+        self.assertLess(fast.rtt, slow.rtt)
+        self.assertGreater(fast.stats.routed, slow.stats.routed)
+        self.assertIs(primary, fast)
+
+    def test_avoids_unreachable_devices(self):
+        async def run():
+            async with FakeHEOSDevice() as first, FakeHEOSDevice() as second:
+                for device in (first, second):
+                    device.set_handler('player/get_volume', _volume_handler)
+
+                pool = DevicePool()
+                await pool.connect(first.host, first.port)
+                try:
+                    await pool.add_hosts([(second.host, second.port)])
+                    await pool.probe(pool.members[0])
+
+                    await second.stop()
+                    await asyncio.sleep(0.01)
+                    volumes = await asyncio.gather(*[pool.player.get_volume(1) for _ in range(10)])
+
+                    await first.stop()
+                    await asyncio.sleep(0.01)
+                    with self.assertRaises(ChannelUnavailableError):
+                        await pool.player.get_volume(1)
+
+                    return volumes
+                finally:
+                    pool.close()
+
+        self.assertEqual(_async_run(run()), [10] * 10)
+
+    def test_pytheos_adds_other_players(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.02) as device:
+                others = [FakeHEOSDevice(host, device.port) for host in ('127.0.0.2', '127.0.0.3')]
+                for index, other in enumerate(others, start=2):
+                    await other.start()
+                    other.set_handler('player/get_volume', _volume_handler)
+                    device.players.append(dict(device.players[0], name=f'Player {index}', pid=index, ip=other.host))
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, device_pool_size=3)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    await asyncio.gather(*[conn.api.player.get_volume(1) for _ in range(20)])
+
+                    members = [(member.host, member.port) for member in conn.api.members]
+                    routed = [other.commands.count(('player/get_volume', {'pid': '1'})) for other in others]
+                    return members, routed
+                finally:
+                    conn.close()
+                    for other in others:
+                        await other.stop()
+
+        members, routed = _async_run(run())
+        port = members[0][1]
+        self.assertEqual(members, [('127.0.0.1', port), ('127.0.0.2', port), ('127.0.0.3', port)])
+        self.assertGreater(sum(routed), 0)      # Reads go to the other players, which answer quicker
+
+
+if __name__ == '__main__':
+    unittest.main()
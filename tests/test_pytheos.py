@@ -17,6 +17,8 @@ from pytheos.api.player import PlayerAPI
 from pytheos.networking.errors import SignInFailedError
 from pytheos.controllers import Group, Player, Source
 from pytheos.api.system import SystemAPI
+from pytheos.models.heos import HEOSEvent
+from tests.fake_device import FakeHEOSDevice, wait_for
 
 
 def _async_run(coro):
@@ -92,6 +94,200 @@ class TestPytheos(unittest.TestCase):
             self.assertGreater(len(sources), 0)
             self.assertIsInstance(sources[list(sources.keys())[0]], Source)
 
+    def test_coalesce_events(self):
+        def _event(command, **kwargs):
+            return 0, HEOSEvent({'heos': {'command': command, 'message': '&'.join(f'{k}={v}' for k, v in kwargs.items())}})
+
+        batch = [
+            _event('event/player_volume_changed', pid=1, level=10),
+            _event('event/player_state_changed', pid=1, state='play'),
+            _event('event/player_volume_changed', pid=2, level=50),
+            _event('event/player_volume_changed', pid=1, level=20),
+        ]
+
+        events = [event for _, event in self._pytheos._coalesce_events(batch)]
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[0].command, 'event/player_state_changed')
+        self.assertEqual(events[1].vars, {'pid': '2', 'level': '50'})
+        self.assertEqual(events[2].vars, {'pid': '1', 'level': '20'})
+
+    def test_events_are_only_coalesced_when_enabled(self):
+        async def run(coalesce_events: bool) -> list:
+            conn = pytheos.Pytheos('127.0.0.1', 1255, coalesce_events=coalesce_events)
+            levels = []
+
+            async def _volume_changed(event):
+                levels.append(event.vars['level'])
+
+            conn.subscribe('event/player_volume_changed', _volume_changed)
+            for level in (10, 20, 30):
+                conn._event_queue.put_nowait((0, HEOSEvent({'heos': {
+                    'command': 'event/player_volume_changed', 'message': f'pid=1&level={level}&mute=off'}})))
+
+            processor = asyncio.ensure_future(conn._process_events())
+            await wait_for(lambda: conn._event_queue.empty() and len(levels) >= 1)
+            await asyncio.sleep(0.01)
+            processor.cancel()
+
+            return levels
+
+        self.assertEqual(_async_run(run(False)), ['10', '20', '30'])
+        self.assertEqual(_async_run(run(True)), ['30'])
+
+
+class TestStartup(unittest.TestCase):
+    NETWORK_LATENCY = 0.05
+
+    def test_connect_overlaps_independent_steps(self):
+        async def run():
+            async with FakeHEOSDevice(network_latency=self.NETWORK_LATENCY) as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    return conn.startup_stats, conn._players, conn._sources
+                finally:
+                    conn.close()
+
+        stats, players, sources = _async_run(run())
+        self.assertEqual(len(players), 1)
+        self.assertEqual(len(sources), 1)
+        self.assertEqual(set(stats.phases),
+                         {'connect', 'register', 'refresh', 'account', 'players', 'groups', 'sources'})
+        self.assertLess(stats.total, self.NETWORK_LATENCY * 3)  # Five round trips if done one after another
+
+
+class TestLazyMode(unittest.TestCase):
+    def test_collections_are_loaded_on_first_access(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.set_handler('player/get_player_info', lambda params: (
+                    f'pid={params["pid"]}', device.players[0]))
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, lazy=True)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    commands = lambda: [command for command, _ in device.commands]
+                    self.assertEqual(commands(), [])
+
+                    player = await conn.get_player(1)
+                    self.assertEqual(commands(), ['player/get_player_info'])
+
+                    players = await conn.get_players()
+                    await conn.get_players()
+                    self.assertIs(players[0], player)
+                    self.assertEqual(commands().count('player/get_players'), 1)
+
+                    await conn.refresh(['players'])
+                    self.assertEqual(commands().count('player/get_players'), 2)
+                    self.assertNotIn('browse/get_music_sources', commands())
+
+                    await conn.resync()
+                    return commands(), player, conn._players
+                finally:
+                    conn.close()
+
+        commands, player, players = _async_run(run())
+        self.assertIs(players[0], player)
+        self.assertEqual(commands.count('player/get_players'), 3)
+        self.assertNotIn('group/get_groups', commands)
+
+    def test_controllers_keep_their_identity(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    player, source = conn._players[0], conn._sources[1024]
+                    await conn.get_players()
+                    await conn.get_sources()
+
+                    return (player, source), (conn._players[0], conn._sources[1024])
+                finally:
+                    conn.close()
+
+        before, after = _async_run(run())
+        self.assertIs(before[0], after[0])
+        self.assertIs(before[1], after[1])
+
+    def test_unknown_refresh_scope(self):
+        with self.assertRaises(ValueError):
+            _async_run(pytheos.Pytheos('127.0.0.1').refresh(['speakers']))
+
+
+class TestTopologyChanges(unittest.TestCase):
+    def test_change_events_update_controllers(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.players.append({'name': 'Kitchen', 'pid': 2, 'model': 'HEOS 1', 'version': '1.0',
+                                       'ip': device.host, 'network': 'wired', 'lineout': 0, 'serial': 'SN0002'})
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    changes = []
+
+                    async def on_change(change):
+                        changes.append(change)
+
+                    conn.subscribe_changes(on_change)
+                    sync_changes = []
+                    conn.subscribe_changes(sync_changes.append)     # Plain functions are called directly
+                    living_room, kitchen = conn._players
+                    device.commands.clear()
+
+                    device.groups = [{'name': 'Downstairs', 'gid': 1, 'players': [
+                        {'name': 'Living Room', 'pid': 1, 'role': 'leader'},
+                        {'name': 'Kitchen', 'pid': 2, 'role': 'member'},
+                    ]}]
+                    device.emit_event('groups_changed')
+                    await wait_for(lambda: len(changes) == 2)
+                    group_changes = list(changes)
+                    self.assertEqual(living_room._player.group_id, 1)
+
+                    del device.players[1]
+                    device.players[0]['name'] = 'Den'
+                    device.emit_event('players_changed')
+                    await wait_for(lambda: len(changes) == 3)
+                    self.assertEqual(sync_changes, changes)
+
+                    return group_changes, changes[2], (living_room, kitchen), conn, device.commands
+                finally:
+                    conn.close()
+
+        group_changes, player_change, (living_room, kitchen), conn, commands = _async_run(run())
+
+        groups, players = group_changes
+        self.assertEqual(groups.scope, 'groups')
+        self.assertEqual([group.id for group in groups.added], [1])
+        self.assertEqual(players.scope, 'players')
+        self.assertEqual(players.changed, [living_room, kitchen])
+
+        self.assertEqual(player_change.changed, [living_room])
+        self.assertEqual(player_change.removed, [kitchen])
+        self.assertEqual(living_room.name, 'Den')
+        self.assertEqual(conn._players, [living_room])
+        self.assertEqual([command for command, _ in commands], ['group/get_groups', 'player/get_players'])
+
+    def test_bursts_of_change_events_are_combined(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    device.commands.clear()
+                    device.latency = 0.02
+                    for _ in range(5):
+                        device.emit_event('sources_changed')
+
+                    await asyncio.sleep(0.01)
+                    await wait_for(lambda: not conn._reloading)
+                    return [command for command, _ in device.commands]
+                finally:
+                    conn.close()
+
+        commands = _async_run(run())
+        self.assertLessEqual(commands.count('browse/get_music_sources'), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import socket
+import unittest
+
+import pytheos
+from pytheos.networking.connection import Connection
+from pytheos.networking.errors import ChannelUnavailableError
+from pytheos.networking.selection import connect_fastest, normalize_candidates
+from pytheos.networking.types import SSDPResponse
+from tests.fake_device import FakeHEOSDevice
+from tests.test_discovery import DISCOVERY_RESPONSE
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestSelection(unittest.TestCase):
+    def test_normalize_candidates(self):
+        candidates = normalize_candidates(
+            ['10.1.0.5', ('10.1.0.6', 1000), SSDPResponse(DISCOVERY_RESPONSE), '10.1.0.5'], 1255)
+
+        self.assertEqual(candidates, [('10.1.0.5', 1255), ('10.1.0.6', 1000), ('10.1.0.7', 1255)])
+
+    def test_keeps_the_fastest_device(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.2) as slow, FakeHEOSDevice(latency=0.001) as fast:
+                created = []
+
+                def factory():
+                    created.append(Connection())
+                    return created[-1]
+
+                candidates = [('127.0.0.1', _unused_port()), (slow.host, slow.port), (fast.host, fast.port)]
+                channel, host, port, elapsed = await connect_fastest(candidates, 1255, factory)
+                try:
+                    await asyncio.sleep(0)
+                    return port, fast.port, channel.connected, [connection.connected for connection in created]
+                finally:
+                    channel.close()
+
+        port, expected_port, winner_connected, connected = _async_run(run())
+        self.assertEqual(port, expected_port)
+        self.assertEqual(connected.count(True), 1)
+        self.assertTrue(winner_connected)
+
+    def test_no_device_answers(self):
+        with self.assertRaises(ChannelUnavailableError):
+            _async_run(connect_fastest([('127.0.0.1', _unused_port())], 1255, timeout=1))
+
+        with self.assertRaises(ValueError):
+            _async_run(connect_fastest([], 1255))
+
+    def test_pytheos_connects_to_the_fastest_device(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.2) as slow, FakeHEOSDevice() as fast:
+                conn = pytheos.Pytheos([(slow.host, slow.port), (fast.host, fast.port)], heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    return conn.port, fast.port, conn._players
+                finally:
+                    conn.close()
+
+        port, expected_port, players = _async_run(run())
+        self.assertEqual(port, expected_port)
+        self.assertEqual(len(players), 1)
+
+    def test_pytheos_accepts_a_single_host_and_port(self):
+        conn = pytheos.Pytheos(('127.0.0.1', 1256))
+        self.assertEqual((conn.server, conn.port), ('127.0.0.1', 1256))
+        self.assertIsNone(conn._candidates)
+
+        conn = pytheos.Pytheos(('10.0.0.1', '10.0.0.2'))
+        self.assertEqual(conn._candidates, ['10.0.0.1', '10.0.0.2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
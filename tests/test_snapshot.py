@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import pytheos
+from pytheos import models
+from pytheos.snapshot import SNAPSHOT_VERSION, Snapshot
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _search_criteria_handler(params):
+    return f'sid={params["sid"]}', [{'name': 'Artist', 'scid': 1, 'wildcard': 'no'}]
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'snapshot.json')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_round_trip(self):
+        device = FakeHEOSDevice()
+        snapshot = Snapshot(
+            players=[models.Player(player) for player in device.players],
+            groups=[models.Group({'name': 'Downstairs', 'gid': 1, 'players': [
+                {'name': 'Living Room', 'pid': 1, 'role': 'leader'},
+                {'name': 'Kitchen', 'pid': 2, 'role': 'member'},
+            ]})],
+            sources=[models.Source(source) for source in device.sources],
+            search_criteria={1024: [models.SearchCriteria({'name': 'Artist', 'scid': 1, 'cid': 'SEARCH:'})]},
+        )
+        snapshot.save(self._path)
+
+        loaded = Snapshot.load(self._path)
+        self.assertEqual(loaded.players, snapshot.players)
+        self.assertEqual(loaded.groups, snapshot.groups)
+        self.assertEqual(loaded.sources, snapshot.sources)
+        self.assertEqual(loaded.search_criteria, snapshot.search_criteria)
+        self.assertEqual(loaded.created, snapshot.created)
+        self.assertEqual(os.listdir(self._directory.name), ['snapshot.json'])
+
+    def test_unusable_snapshots_are_ignored(self):
+        self.assertIsNone(Snapshot.load(self._path))
+
+        with open(self._path, 'w') as f:
+            json.dump(dict(Snapshot().to_dict(), version=SNAPSHOT_VERSION + 1), f)
+        self.assertIsNone(Snapshot.load(self._path))
+
+        with open(self._path, 'w') as f:
+            f.write('{"version": 1, "players": [')
+        self.assertIsNone(Snapshot.load(self._path))
+
+    def test_warm_start(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.set_handler('browse/get_search_criteria', _search_criteria_handler)
+
+                # The first start has nothing to go on, so it refreshes and saves a snapshot
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, snapshot_path=self._path)
+                await conn.connect(enable_event_connection=False)
+                await conn._sources[1024].get_search_criteria()
+                conn.snapshot().save(self._path)
+                conn.close()
+
+                device.players[0]['name'] = 'Den'
+                device.commands.clear()
+                device.latency = 0.05
+
+                # The second start is usable before the system has answered anything
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, snapshot_path=self._path)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    player = conn._players[0]
+                    restored = (player.name, device.commands[:], await conn._sources[1024].get_search_criteria())
+
+                    await wait_for(lambda: conn._revalidate_task.done())
+                    return restored, player, conn._players[0], [command for command, _ in device.commands]
+                finally:
+                    conn.close()
+
+        restored, player, revalidated, commands = _async_run(run())
+        self.assertEqual(restored[0], 'Living Room')
+        self.assertEqual(restored[1], [])
+        self.assertEqual(restored[2][0].name, 'Artist')
+
+        self.assertIs(revalidated, player)
+        self.assertEqual(player.name, 'Den')
+        self.assertIn('browse/get_search_criteria', commands)
+        self.assertEqual(Snapshot.load(self._path).players[0].name, 'Den')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.models.player import PlayState, RepeatMode, ShuffleMode
+from pytheos.state import StateCache
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _set_handlers(device: FakeHEOSDevice):
+    device.set_handler('player/get_volume', lambda params: (f'pid={params["pid"]}&level=10', None))
+    device.set_handler('player/get_play_mode', lambda params: (f'pid={params["pid"]}&repeat=off&shuffle=off', None))
+    device.set_handler('player/get_play_state', lambda params: (f'pid={params["pid"]}&state=stop', None))
+
+
+class TestStateCache(unittest.TestCase):
+    def test_max_age(self):
+        state = StateCache()
+        self.assertIsNone(state.get('volume'))
+
+        state.set('volume', 10)
+        self.assertEqual(state.get('volume'), 10)
+        self.assertEqual(state.get('volume', max_age=60), 10)
+        self.assertIsNone(state.get('volume', max_age=0))
+        self.assertEqual((state.hits, state.misses), (2, 2))
+
+        state.discard('volume')
+        self.assertNotIn('volume', state)
+
+    def test_answers_older_than_a_change_are_dropped(self):
+        state = StateCache()
+        version = state.version
+        state.set('volume', 30)     # e.g. from an event that arrived while the request was under way
+        self.assertFalse(state.set('volume', 10, since=version))
+        self.assertEqual(state.peek('volume'), 30)
+
+        version = state.version
+        state.discard('now_playing')
+        self.assertFalse(state.set('now_playing', 'Song', since=version))
+        self.assertNotIn('now_playing', state)
+
+        version = state.version
+        state.clear()
+        self.assertFalse(state.set('volume', 10, since=version))
+
+        version = state.version
+        state.set('mute', True)     # Changes to other values don't matter
+        self.assertTrue(state.set('volume', 10, since=version))
+
+
+class TestPlayerState(unittest.TestCase):
+    def test_events_keep_state_current(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _set_handlers(device)
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    player = conn._players[0]
+                    commands = lambda: [command for command, _ in device.commands]
+                    self.assertTrue(conn.tracking_state)
+
+                    self.assertEqual(await player.get_volume(), 10)
+                    self.assertEqual(await player.get_volume(), 10)
+                    self.assertEqual(commands().count('player/get_volume'), 1)
+
+                    device.emit_event('player_volume_changed', pid=1, level=30, mute='on')
+                    device.emit_event('player_state_changed', pid=1, state='play')
+                    await wait_for(lambda: player.state.peek('volume') == 30 and 'play_state' in player.state)
+                    self.assertEqual(await player.get_volume(), 30)
+                    self.assertTrue(await player.get_mute())
+                    self.assertTrue(await player.is_playing())
+                    self.assertNotIn('player/get_play_state', commands())
+
+                    self.assertEqual(await player.get_volume(max_age=0), 10)
+                    self.assertEqual(commands().count('player/get_volume'), 2)
+
+                    # Only the first change of play mode needs to know the current one
+                    await player.set_repeat(RepeatMode.All)
+                    await player.set_shuffle(ShuffleMode.On)
+                    device.emit_event('repeat_mode_changed', pid=1, repeat='on_one')
+                    await wait_for(lambda: player.state.peek('play_mode').repeat == RepeatMode.One)
+
+                    return commands(), await player.get_play_mode()
+                finally:
+                    conn.close()
+
+        commands, play_mode = _async_run(run())
+        self.assertEqual(commands.count('player/get_play_mode'), 1)
+        self.assertEqual(commands.count('player/set_play_mode'), 2)
+        self.assertEqual(play_mode, (RepeatMode.One, ShuffleMode.On))
+
+    def test_events_win_over_slower_answers(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.1) as device:
+                _set_handlers(device)
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect()
+                try:
+                    player = conn._players[0]
+
+                    volume = asyncio.ensure_future(player.get_volume())
+                    await asyncio.sleep(0.02)
+                    device.emit_event('player_volume_changed', pid=1, level=30, mute='off')
+
+                    return await volume, player.state.peek('volume')
+                finally:
+                    conn.close()
+
+        self.assertEqual(_async_run(run()), (30, 30))
+
+    def test_state_is_not_trusted_without_events(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                _set_handlers(device)
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    player = conn._players[0]
+                    self.assertFalse(conn.tracking_state)
+
+                    await player.get_play_state()
+                    await player.get_play_state()
+                    state = await player.get_play_state(max_age=60)
+
+                    return [command for command, _ in device.commands].count('player/get_play_state'), state
+                finally:
+                    conn.close()
+
+        count, state = _async_run(run())
+        self.assertEqual(count, 2)
+        self.assertEqual(state, PlayState.Stopped)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import json
+import unittest
+
+from pytheos.networking.streaming import PayloadDecoder, StreamedMessage, StreamedPayload, scan_header
+
+MESSAGE = {
+    'heos': {'command': 'browse/browse', 'result': 'success', 'message': 'sid=1&returned=4&count=4'},
+    'payload': [
+        {'name': 'Braces }] and "quotes"', 'cid': 'a,b', 'type': 'container'},
+        {'name': 'Backslash \\', 'nested': [1, {'two': 2}]},
+        5,
+        'string',
+    ],
+    'options': [{'browse': [{'id': 13, 'name': 'Create New Station'}]}]
+}
+RAW = json.dumps(MESSAGE).encode('utf-8')
+
+
+class TestStreaming(unittest.TestCase):
+    def test_scan_header(self):
+        self.assertEqual(scan_header(RAW), MESSAGE['heos'])
+        self.assertIsNone(scan_header(b'{"payload": []}'))
+        self.assertIsNone(scan_header(RAW[:20]))
+
+    def test_scan_header_brace_in_string(self):
+        header = {'command': 'browse/search', 'result': 'success', 'message': 'search=}{&returned=0'}
+        self.assertEqual(scan_header(json.dumps({'heos': header, 'payload': []}).encode('utf-8')), header)
+
+    def test_payload_decoder(self):
+        for chunk_size in (1, 3, 17, len(RAW)):
+            decoder = PayloadDecoder()
+            entries = []
+            for offset in range(0, len(RAW), chunk_size):
+                entries.extend(decoder.feed(RAW[offset:offset + chunk_size]))
+
+            self.assertEqual(entries, MESSAGE['payload'])
+            self.assertTrue(decoder.finished)
+
+    def test_payload_decoder_empty_list(self):
+        decoder = PayloadDecoder()
+        self.assertEqual(decoder.feed(b'{"heos": {}, "payload": []}'), [])
+        self.assertTrue(decoder.finished)
+
+    def test_payload_decoder_rejects_non_list(self):
+        with self.assertRaises(ValueError):
+            PayloadDecoder().feed(b'{"heos": {}, "payload": {"a": 1}}')
+
+    def test_streamed_message(self):
+        message = StreamedMessage.from_bytes(RAW)
+        self.assertEqual(message['heos'], MESSAGE['heos'])
+        self.assertIsInstance(message['payload'], StreamedPayload)
+        self.assertEqual(list(message['payload']), MESSAGE['payload'])
+        self.assertEqual(message['options'], MESSAGE['options'])
+        self.assertIsNone(message.get('missing'))
+
+    def test_streamed_message_small_payload(self):
+        message = StreamedMessage.from_bytes(RAW, stream_payload_size=len(RAW))
+        self.assertEqual(message['payload'], MESSAGE['payload'])
+
+    def test_streamed_message_dict_payload(self):
+        message = StreamedMessage.from_bytes(b'{"heos": {"command": "x"}, "payload": {"a": 1}}')
+        self.assertEqual(message['payload'], {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.networking.striping import StripedConnection
+from tests.fake_device import FakeHEOSDevice
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class TestStripedConnection(unittest.TestCase):
+    def test_requires_a_connection(self):
+        with self.assertRaises(ValueError):
+            StripedConnection(0)
+
+    def test_ordered_commands_keep_affinity(self):
+        striped = StripedConnection(4)
+
+        for pid in (1, -12345, '987'):
+            connection = striped.route('player/set_volume', {'pid': pid, 'level': 10})
+            self.assertIs(striped.route('player/volume_up', {'pid': pid}), connection)
+            self.assertIs(striped.route('player/move_queue_item', {'pid': pid, 'sqid': 1}), connection)
+
+        self.assertIs(striped.route('system/sign_in', {'un': 'user'}), striped.connections[0])
+
+    def test_bulk_commands_are_striped(self):
+        async def run():
+            async with FakeHEOSDevice(latency=0.002) as device:
+                device.containers[('1024', 'c1')] = [
+                    {'container': 'no', 'type': 'song', 'name': f'Song {index}', 'mid': str(index)}
+                    for index in range(200)
+                ]
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None, command_connections=3)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    pages = await asyncio.gather(*[
+                        conn.api.call('browse', 'browse', sid=1024, cid='c1', range=f'{start},{start + 9}')
+                        for start in range(0, 200, 10)
+                    ])
+                    await conn.api.player.set_volume(1, 10)
+
+                    return pages, conn.api
+                finally:
+                    conn.close()
+
+        pages, striped = _async_run(run())
+        self.assertEqual([item['name'] for page in pages for item in page.payload],
+                         [f'Song {index}' for index in range(200)])
+        for connection in striped.connections:
+            self.assertGreater(connection.admission.stats.admitted, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
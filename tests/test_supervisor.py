@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import pytheos
+from pytheos.supervisor import Backoff
+from tests.fake_device import FakeHEOSDevice, wait_for
+
+
+def _async_run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_delays_grow_and_are_jittered(self):
+        backoff = Backoff(initial=1, maximum=8, factor=2, jitter=0.5)
+
+        for expected in (1, 2, 4, 8, 8):
+            delay = backoff.next()
+            self.assertGreaterEqual(delay, expected * 0.5)
+            self.assertLessEqual(delay, expected)
+
+        backoff.reset()
+        self.assertLessEqual(backoff.next(), 1)
+
+
+class TestConnectionSupervisor(unittest.TestCase):
+    def test_reconnects_and_resyncs(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=0.05)
+                conn.supervisor.backoff = Backoff(initial=0.01, maximum=0.05)
+
+                received = []
+
+                async def on_event(event):
+                    received.append(event)
+
+                conn.subscribe('event/players_changed', on_event)
+
+                await conn.connect()
+                try:
+                    player = conn._players[0]
+                    await wait_for(lambda: conn.supervisor.stats.rtt.count > 0)
+
+                    device.players[0] = dict(device.players[0], name='Kitchen')
+                    device.drop_clients()
+                    await wait_for(lambda: conn.supervisor.stats.reconnects == 1)
+
+                    device.emit_event('players_changed')
+                    await wait_for(lambda: received)
+
+                    registrations = [cmd for cmd, _ in device.commands if cmd == 'system/register_for_change_events']
+                    return conn.supervisor.stats, player, conn._players, registrations
+                finally:
+                    conn.close()
+
+        stats, player, players, registrations = _async_run(run())
+        self.assertEqual(stats.disconnects, 1)
+        self.assertIsNotNone(stats.rtt_average)
+        self.assertIs(players[0], player)
+        self.assertEqual(player.name, 'Kitchen')
+        self.assertEqual(len(registrations), 2)
+
+    def test_reconnects_a_silent_event_channel(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=0.05)
+                conn.supervisor.heartbeat_timeout = 0.2
+
+                received = []
+
+                async def on_event(event):
+                    received.append(event)
+
+                conn.subscribe('event/players_changed', on_event)
+
+                await conn.connect()
+                try:
+                    await wait_for(lambda: len([cmd for cmd, _ in device.commands if cmd == 'system/heart_beat']) > 4)
+
+                    device.silence_event_clients()
+                    await wait_for(lambda: conn.supervisor.stats.event_reconnects == 1)
+
+                    device.emit_event('players_changed')
+                    await wait_for(lambda: received)
+
+                    registrations = [cmd for cmd, _ in device.commands if cmd == 'system/register_for_change_events']
+                    return conn.supervisor.stats, registrations
+                finally:
+                    conn.close()
+
+        stats, registrations = _async_run(run())
+        self.assertEqual(stats.disconnects, 0)     # The command channel was fine, so it was left alone
+        self.assertEqual(stats.heartbeat_failures, 1)
+        self.assertEqual(len(registrations), 2)
+
+    def test_resync_keeps_controllers(self):
+        async def run():
+            async with FakeHEOSDevice() as device:
+                device.groups = [{'name': 'Downstairs', 'gid': 1, 'players': [
+                    {'name': 'Living Room', 'pid': 1, 'role': 'leader'}]}]
+
+                conn = pytheos.Pytheos(device.host, device.port, heartbeat_interval=None)
+                await conn.connect(enable_event_connection=False)
+                try:
+                    player, group = conn._players[0], conn._groups[1]
+                    source = conn._sources[1024]
+
+                    device.players.append(dict(device.players[0], pid=2, name='Kitchen'))
+                    device.groups = []
+                    await conn.resync()
+
+                    return (player, group, source), conn._players, conn._groups, conn._sources
+                finally:
+                    conn.close()
+
+        (player, group, source), players, groups, sources = _async_run(run())
+        self.assertIs(players[0], player)
+        self.assertEqual(players[1].name, 'Kitchen')
+        self.assertNotIn(group.id, groups)
+        self.assertIs(sources[1024], source)
+
+
+if __name__ == '__main__':
+    unittest.main()